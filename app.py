@@ -1,16 +1,162 @@
 # app.py
 # Arquivo principal da aplicação web com Streamlit
 
+import json
+
 import streamlit as st
-from datetime import date, timedelta
+from datetime import date, datetime, time as dt_time, timedelta
 import pytz
+import pandas as pd
+from astropy import units as u
+from astropy.coordinates import EarthLocation
+from astropy.time import Time
 
 # Importar as funções do backend
-from src.config import *
 from src.location import get_location_from_city, set_timezone_for_sao_paulo
-from src.targets import get_target_skycoords, registrar_alvos_sistema_solar, DEEP_SKY_TARGETS_PRESET
-from src.analysis import calculate_nightly_events, analyze_target_visibility_for_night, analyze_year_visibility
-from src.plotting import plot_target_visibility, plot_yearly_visibility, plot_sky_map
+from src.targets import (
+    get_target_skycoords, registrar_alvos_sistema_solar, DEEP_SKY_TARGETS_PRESET, SOLAR_SYSTEM_TARGETS_PRESET
+)
+from src.analysis import (
+    calculate_nightly_events, analyze_targets_visibility_for_night, target_visibility_dataframe,
+    find_observing_windows, compute_sky_positions
+)
+from src.plotting import (
+    plot_yearly_visibility, plot_sky_map, render_target_visibility, render_visibility_small_multiples
+)
+from src.catalog import TargetCatalog
+from src.curves import compute_altitude_curves
+from src.render import figure_to_png
+from src import instrumentation
+
+# --- Funções de Cálculo com Cache ---
+# Cada rerun do Streamlit executa o script inteiro. Os cálculos pesados ficam em funções
+# com cache, cujas chaves são valores simples (local, data, alvos, precisão), e os pedidos
+# de análise ficam no session_state. Assim, mexer no slider do mapa ou na elevação mínima
+# reaproveita as matrizes já calculadas em vez de recalcular a noite.
+
+def site_key(location):
+    """
+    Chave hashável de um local: (lat, lon, altitude em metros).
+    """
+    return (round(float(location.lat.deg), 6), round(float(location.lon.deg), 6),
+            round(float(location.height.to_value(u.m)), 1))
+
+def location_from_key(key):
+    lat, lon, height = key
+    return EarthLocation(lat=lat * u.deg, lon=lon * u.deg, height=height * u.m)
+
+def timezone_for(location):
+    return set_timezone_for_sao_paulo(location) or pytz.UTC
+
+@st.cache_data(show_spinner="Calculando eventos noturnos...")
+def load_night_events(site, analysis_date):
+    location = location_from_key(site)
+    return calculate_nightly_events(analysis_date, location, timezone_for(location))
+
+@st.cache_resource(show_spinner="Buscando coordenadas dos alvos...")
+def load_targets(site, analysis_date, target_names, include_solar_system):
+    """
+    Coordenadas dos alvos (SkyCoords e efemérides), compartilhadas entre sessões sem cópia.
+    """
+    targets = {}
+    if target_names:
+        targets.update(get_target_skycoords(list(target_names)))
+    if include_solar_system:
+        events = load_night_events(site, analysis_date)
+        # Efemérides com folga de 12 h para cobrir qualquer horário do mapa do céu
+        targets.update(registrar_alvos_sistema_solar(events['inicio_noite'] - 12 * u.hour,
+                                                     events['fim_noite'] + 12 * u.hour))
+    return {name: coord for name, coord in targets.items() if coord is not None}
+
+@st.cache_data(show_spinner="Calculando a visibilidade da noite...")
+def compute_night_arrays(site, analysis_date, target_names, include_solar_system, accuracy):
+    """
+    Altitudes e azimutes de todos os alvos na grade da noite, independentes da elevação mínima.
+    """
+    events = load_night_events(site, analysis_date)
+    targets = load_targets(site, analysis_date, target_names, include_solar_system)
+    night = analyze_targets_visibility_for_night(
+        events['inicio_noite'], events['fim_noite'], location_from_key(site), targets, 0 * u.deg,
+        accuracy=accuracy
+    )
+    return {key: night[key] for key in ('names', 'time', 'altitude', 'azimuth', 'never_visible')}
+
+def render_target_plot(site, analysis_date, target_names, include_solar_system, accuracy, target_name,
+                       min_altitude_deg):
+    """
+    PNG do gráfico de um alvo; o cache de renderização (`src/render.py`) evita rasterizar de novo.
+    """
+    night = compute_night_arrays(site, analysis_date, target_names, include_solar_system, accuracy)
+    df_visible = target_visibility_dataframe(night, target_name, min_altitude_deg * u.deg)
+    return render_target_visibility(df_visible, target_name, analysis_date, min_altitude_deg)
+
+def render_small_multiples(site, analysis_date, target_names, include_solar_system, accuracy, visible_names,
+                           min_altitude_deg):
+    """
+    PNG com as curvas de todos os alvos visíveis numa única figura de painéis pequenos.
+    """
+    night = compute_night_arrays(site, analysis_date, target_names, include_solar_system, accuracy)
+    return render_visibility_small_multiples(night, visible_names, min_altitude_deg, analysis_date)
+
+@st.cache_resource(show_spinner=False)
+def load_sky_index(site, analysis_date, target_names, include_solar_system):
+    """
+    Índice espacial dos alvos fixos, montado uma vez por lista de alvos e reaproveitado a cada hora do mapa.
+    """
+    targets = load_targets(site, analysis_date, target_names, include_solar_system)
+    return TargetCatalog.from_skycoords(targets).sky_index()
+
+@st.cache_data(show_spinner=False)
+def load_sky_positions(site, analysis_date, target_names, include_solar_system, accuracy, map_datetime,
+                       min_altitude_deg):
+    """
+    Altitude e azimute dos alvos acima da elevação mínima num instante do mapa do céu.
+    Só os candidatos dentro da calota visível (índice espacial) passam pela transformação.
+    Compartilhado entre o filtro de alvos visíveis e o desenho do mapa.
+    """
+    targets = load_targets(site, analysis_date, target_names, include_solar_system)
+    index = load_sky_index(site, analysis_date, target_names, include_solar_system)
+    return compute_sky_positions(targets, location_from_key(site), Time(map_datetime), accuracy,
+                                 min_altitude=min_altitude_deg * u.deg, index=index)
+
+@st.cache_data(show_spinner=False)
+def render_sky_map(site, analysis_date, target_names, include_solar_system, accuracy, map_datetime,
+                   min_altitude_deg):
+    positions = load_sky_positions(site, analysis_date, target_names, include_solar_system, accuracy, map_datetime,
+                                   min_altitude_deg)
+    return figure_to_png(plot_sky_map(None, location_from_key(site), Time(map_datetime), positions=positions))
+
+@st.cache_data(show_spinner=False)
+def compute_year_curves(site, year, target_name):
+    """
+    Curvas de altitude do alvo em todas as noites do ano, independentes da elevação mínima;
+    retorna None se o alvo não for encontrado.
+    """
+    location = location_from_key(site)
+    solar_system_names = {name.lower() for name in SOLAR_SYSTEM_TARGETS_PRESET}
+    if target_name.strip().lower() in solar_system_names:
+        # Corpos do Sistema Solar usam efemérides interpoladas
+        target_coord = target_name.strip().lower()
+    else:
+        target_coord = get_target_skycoords([target_name]).get(target_name)
+        if target_coord is None:
+            return None
+    return compute_altitude_curves(date(year, 1, 1), date(year, 12, 31), location, timezone_for(location),
+                                   {target_name: target_coord}, lowest_altitude=10 * u.deg)
+
+@st.cache_data(show_spinner=False)
+def compute_year_visibility(site, year, target_name, min_altitude_deg):
+    """
+    Calendário anual de um alvo; mudar a elevação só refaz o limiar sobre as curvas guardadas.
+    """
+    curves = compute_year_curves(site, year, target_name)
+    return curves.windows(target_name, min_altitude_deg * u.deg) if curves is not None else None
+
+@st.cache_data(show_spinner=False)
+def render_year_plot(site, year, target_name, min_altitude_deg):
+    df_year = compute_year_visibility(site, year, target_name, min_altitude_deg)
+    fig = plot_yearly_visibility(df_year, target_name, year)
+    return figure_to_png(fig) if fig else None
 
 # --- Configuração da Página ---
 st.set_page_config(page_title="Analisador Astronômico", page_icon="🔭", layout="wide")
@@ -19,6 +165,17 @@ st.title("🔭 Analisador de Visibilidade Astronômica")
 # --- Barra Lateral de Controles ---
 st.sidebar.header("Configurações da Análise")
 
+# Painel de desempenho: mede as etapas executadas nesta rodada do script (o que vem do
+# cache do Streamlit não aparece). A instrumentação é global no processo, então fica
+# ligada só durante a rodada de quem pediu o painel.
+show_performance = st.sidebar.checkbox(
+    "⏱️ Painel de desempenho", False,
+    help="Tempo de cada etapa (geocodificação, SIMBAD, crepúsculos, transformações, gráficos) e contadores."
+)
+if show_performance:
+    instrumentation.reset()
+    instrumentation.enable()
+
 # 1. Localização
 st.sidebar.subheader("📍 Localização do Observador")
 location_method = st.sidebar.radio("Método de Localização", ('Cidade', 'Coordenadas'))
@@ -52,11 +209,15 @@ else:
 analysis_date = st.sidebar.date_input("Data da Análise Noturna", date.today())
 min_altitude_deg = st.sidebar.slider("Elevação Mínima (°)", 10, 90, 30)
 min_altitude = min_altitude_deg * u.deg
+accuracy_label = st.sidebar.radio(
+    "Precisão do Cálculo", ('Exata', 'Rápida'),
+    help="O modo rápido usa um cálculo analítico (erro abaixo de 0,02°), bem mais veloz para muitos alvos."
+)
+accuracy = 'fast' if accuracy_label == 'Rápida' else 'exact'
 
 # --- Abas para diferentes análises ---
 tab1, tab2 = st.tabs(["🌙 Análise Noturna", "📅 Calendário Anual"])
 
-# ... (Lógica das abas como antes) ...
 with tab1:
     st.header("Análise de Visibilidade para a Noite Selecionada")
     col1, col2 = st.columns(2)
@@ -70,133 +231,131 @@ with tab1:
         if 'observer_location' not in st.session_state:
             st.error("A localização do observador deve ser definida antes de executar a análise.")
         else:
-            observer_location = st.session_state['observer_location']
-            observer_timezone = set_timezone_for_sao_paulo(observer_location) or pytz.UTC
-            
-            with st.spinner("Calculando eventos noturnos..."):
-                night_events = calculate_nightly_events(analysis_date, observer_location, observer_timezone)
-            
-            if not night_events:
-                st.error("Não foi possível calcular os eventos noturnos para esta data e localização.")
+            # Coletar nomes de alvos
+            target_names = []
+            if use_deep_sky:
+                target_names.extend(DEEP_SKY_TARGETS_PRESET)
+            if manual_targets_input.strip():
+                manual_targets = [line.strip() for line in manual_targets_input.split('\\n') if line.strip()]
+                target_names.extend(manual_targets)
+
+            # O pedido fica na sessão: os reruns seguintes (slider, elevação) reutilizam o cache
+            st.session_state['night_request'] = {
+                'site': site_key(st.session_state['observer_location']),
+                'analysis_date': analysis_date,
+                'target_names': tuple(dict.fromkeys(target_names)),
+                'include_solar_system': use_solar_system,
+            }
+
+    request = st.session_state.get('night_request')
+    if request:
+        night_events = load_night_events(request['site'], request['analysis_date'])
+
+        if not night_events or not night_events.get('inicio_noite') or not night_events.get('fim_noite'):
+            st.error("Não foi possível calcular os eventos noturnos para esta data e localização.")
+        else:
+            start_night = night_events['inicio_noite']
+            end_night = night_events['fim_noite']
+            night_date = request['analysis_date']
+
+            # Exibir informações da noite
+            st.info(f"""
+            **Informações da Noite ({night_date.strftime('%d/%m/%Y')})**
+            - 🌅 Pôr do Sol: {night_events['por_do_sol'].to_datetime():%H:%M UTC}
+            - 🌌 Início da Noite (Crepúsculo Astronômico): {start_night.to_datetime():%H:%M UTC}
+            - 🌄 Fim da Noite: {end_night.to_datetime():%H:%M UTC}
+            - ☀️ Nascer do Sol: {night_events['nascer_do_sol'].to_datetime():%H:%M UTC}
+            """)
+
+            night_args = (request['site'], night_date, request['target_names'], request['include_solar_system'],
+                          accuracy)
+            night_visibility = compute_night_arrays(*night_args)
+
+            if not night_visibility['names']:
+                st.warning("Nenhum alvo foi selecionado ou encontrado.")
             else:
-                start_night = night_events['inicio_noite']
-                end_night = night_events['fim_noite']
-                
-                # Exibir informações da noite
-                st.info(f"""
-                **Informações da Noite ({analysis_date.strftime('%d/%m/%Y')})**
-                - 🌅 Pôr do Sol: {night_events['por_do_sol'].to_datetime():%H:%M UTC}
-                - 🌌 Início da Noite (Crepúsculo Astronômico): {start_night.to_datetime():%H:%M UTC}
-                - 🌄 Fim da Noite: {end_night.to_datetime():%H:%M UTC}
-                - ☀️ Nascer do Sol: {night_events['nascer_do_sol'].to_datetime():%H:%M UTC}
-                """)
-                
-                # Coletar nomes de alvos
-                target_names = []
-                if use_deep_sky:
-                    target_names.extend(DEEP_SKY_TARGETS_PRESET)
-                
-                if manual_targets_input.strip():
-                    manual_targets = [line.strip() for line in manual_targets_input.split('\\n') if line.strip()]
-                    target_names.extend(manual_targets)
-                
-                # Buscar coordenadas dos alvos
-                all_targets = {}
-                if target_names:
-                    with st.spinner(f"Buscando coordenadas de {len(target_names)} alvos..."):
-                        all_targets.update(get_target_skycoords(target_names))
-                
-                # Adicionar alvos do sistema solar
-                if use_solar_system:
-                    with st.spinner("Calculando posições do Sistema Solar..."):
-                        all_targets.update(registrar_alvos_sistema_solar(start_night))
-                
-                if not all_targets:
-                    st.warning("Nenhum alvo foi selecionado ou encontrado.")
-                else:
-                    st.success(f"Analisando visibilidade de {len(all_targets)} alvos...")
-                    
-                    # Analisar e plotar cada alvo
-                    for target_name, target_coord in all_targets.items():
-                        if target_coord is not None:
-                            df_visible = analyze_target_visibility_for_night(
-                                start_night, end_night, observer_location, target_coord, min_altitude
-                            )
-                            
-                            if not df_visible.empty:
-                                st.subheader(f"✅ {target_name}")
-                                
-                                # Gerar e exibir o gráfico
-                                fig = plot_target_visibility(df_visible, target_name, analysis_date, min_altitude_deg)
-                                st.pyplot(fig)
-                                plt.close(fig)
-                                
-                                # Informações adicionais
-                                duration = (df_visible['time'].iloc[-1] - df_visible['time'].iloc[0]).total_seconds() / 3600.0
-                                max_alt = df_visible['altitude'].max()
-                                st.write(f"**Duração da Janela de Observação:** {duration:.2f} horas")
-                                st.write(f"**Altitude Máxima:** {max_alt:.1f}°")
-                            else:
-                                st.warning(f"❌ {target_name}: Não visível acima de {min_altitude_deg}° na data selecionada.")
-                    
-                    # Mapa do Céu Noturno
-                    st.markdown("---")
-                    st.subheader("🗺️ Mapa do Céu Noturno")
-                    st.write("Visualize a posição de todos os alvos visíveis no céu em um momento específico.")
-                    
-                    # Seletor de horário com slider
-                    midnight_hour = night_events['meia_noite_real'].to_datetime().hour
-                    
-                    col1, col2 = st.columns([4, 1])
-                    with col1:
-                        selected_hour = st.slider(
-                            "Selecione o horário (UTC)", 
-                            min_value=0, 
-                            max_value=23, 
-                            value=midnight_hour,
-                            step=1,
-                            format="%d:00",
-                            help="Arraste para escolher a hora do mapa do céu"
-                        )
-                    with col2:
-                        st.write("")  # Espaçamento
-                        st.write("")  # Espaçamento
-                        if st.button("Gerar Mapa", key="sky_map_button", type="primary"):
-                            try:
-                                # Converter horário do slider para Time object
-                                hour = selected_hour
-                                map_datetime = analysis_date.replace(hour=hour, minute=0) if hour >= 12 else \
-                                              (analysis_date + timedelta(days=1)).replace(hour=hour, minute=0)
-                                map_time = Time(map_datetime)
-                                
-                                # Filtrar apenas alvos visíveis neste horário
-                                visible_at_time = {}
-                                frame = AltAz(obstime=map_time, location=observer_location)
-                                for name, coord in all_targets.items():
-                                    if coord is not None:
-                                        altaz = coord.transform_to(frame)
-                                        if altaz.alt.deg >= min_altitude_deg:
-                                            visible_at_time[name] = coord
-                                
-                                if visible_at_time:
-                                    st.success(f"🗺️ Mapa do céu com {len(visible_at_time)} alvos visíveis às {hour:02d}:00 UTC")
-                                    
-                                    # Gerar e exibir o mapa
-                                    fig = plot_sky_map(visible_at_time, observer_location, map_time)
-                                    st.pyplot(fig)
-                                    plt.close(fig)
-                                    
-                                    st.info("""
-                                    **Como interpretar o mapa:**
-                                    - O centro representa o zênite (diretamente acima)
-                                    - A borda externa representa o horizonte
-                                    - N, S, L, O indicam as direções cardeais
-                                    - Cada ponto é um alvo visível
-                                    """)
-                                else:
-                                    st.warning(f"Nenhum alvo está visível acima de {min_altitude_deg}° às {hour:02d}:00 UTC")
-                            except Exception as e:
-                                st.error(f"Erro ao gerar mapa: {e}")
+                st.success(f"Analisando visibilidade de {len(night_visibility['names'])} alvos...")
+
+                # As janelas dependem só da elevação mínima: recalculadas a partir das matrizes em cache
+                windows = find_observing_windows(night_visibility['names'], night_visibility['time'],
+                                                 night_visibility['altitude'], min_altitude_deg)
+                windows_by_target = windows.groupby('target')
+                visible_names = [name for name in night_visibility['names'] if name in windows_by_target.groups]
+
+                # Painel único (uma figura para todos os alvos) ou um gráfico por alvo
+                plot_layout = st.radio("Gráficos de altitude", ["Painel único", "Um gráfico por alvo"],
+                                       horizontal=True, key="plot_layout")
+                single_panel = plot_layout == "Painel único"
+                if single_panel and visible_names:
+                    st.image(render_small_multiples(*night_args, visible_names, min_altitude_deg))
+
+                # Resumo de cada alvo
+                for target_name in night_visibility['names']:
+                    if target_name in windows_by_target.groups:
+                        target_windows = windows_by_target.get_group(target_name)
+                        st.subheader(f"✅ {target_name}")
+
+                        # Exibir o gráfico (PNG reaproveitado enquanto os dados não mudarem)
+                        if not single_panel:
+                            st.image(render_target_plot(*night_args, target_name, min_altitude_deg))
+
+                        # Informações adicionais
+                        duration = target_windows['duration_hours'].sum()
+                        max_alt = target_windows['max_altitude'].max()
+                        st.write(f"**Duração da Janela de Observação:** {duration:.2f} horas")
+                        if len(target_windows) > 1:
+                            st.write(f"**Janelas de Observação:** {len(target_windows)}")
+                        st.write(f"**Altitude Máxima:** {max_alt:.1f}°")
+                    elif target_name in night_visibility['never_visible']:
+                        st.warning(f"❌ {target_name}: Nunca nasce nesta latitude (culminação abaixo do horizonte).")
+                    else:
+                        st.warning(f"❌ {target_name}: Não visível acima de {min_altitude_deg}° na data selecionada.")
+
+                # Mapa do Céu Noturno
+                st.markdown("---")
+                st.subheader("🗺️ Mapa do Céu Noturno")
+                st.write("Visualize a posição de todos os alvos visíveis no céu em um momento específico.")
+
+                # Seletor de horário com slider (o mapa é atualizado a cada mudança)
+                midnight_hour = night_events['meia_noite_real'].to_datetime().hour
+                selected_hour = st.slider(
+                    "Selecione o horário (UTC)",
+                    min_value=0,
+                    max_value=23,
+                    value=midnight_hour,
+                    step=1,
+                    format="%d:00",
+                    help="Arraste para escolher a hora do mapa do céu",
+                    key="sky_map_hour"
+                )
+
+                try:
+                    # Horas a partir do meio-dia pertencem à data da análise; as da madrugada, ao dia seguinte
+                    map_day = night_date if selected_hour >= 12 else night_date + timedelta(days=1)
+                    map_datetime = datetime.combine(map_day, dt_time(hour=selected_hour))
+
+                    # Filtrar apenas alvos visíveis neste horário
+                    positions = load_sky_positions(*night_args, map_datetime, min_altitude_deg)
+                    n_visible = len(positions['names'])
+
+                    if n_visible:
+                        st.success(f"🗺️ Mapa do céu com {n_visible} alvos visíveis às {selected_hour:02d}:00 UTC")
+
+                        # Exibir o mapa
+                        st.image(render_sky_map(*night_args, map_datetime, min_altitude_deg))
+
+                        st.info("""
+                        **Como interpretar o mapa:**
+                        - O centro representa o zênite (diretamente acima)
+                        - A borda externa representa o horizonte
+                        - N, S, L, O indicam as direções cardeais
+                        - Cada ponto é um alvo visível
+                        """)
+                    else:
+                        st.warning(f"Nenhum alvo está visível acima de {min_altitude_deg}° às {selected_hour:02d}:00 UTC")
+                except Exception as e:
+                    st.error(f"Erro ao gerar mapa: {e}")
+
 with tab2:
     st.header("Calendário de Visibilidade Anual")
     yearly_target_name = st.text_input("Nome do Alvo", "M31", key="yearly_target")
@@ -206,46 +365,64 @@ with tab2:
         if 'observer_location' not in st.session_state:
             st.error("A localização do observador deve ser definida antes de executar a análise.")
         else:
-            observer_location = st.session_state['observer_location']
-            observer_timezone = set_timezone_for_sao_paulo(observer_location) or pytz.UTC
-            
-            # Buscar coordenadas do alvo
-            with st.spinner(f"Buscando coordenadas de {yearly_target_name}..."):
-                target_coords = get_target_skycoords([yearly_target_name])
-            
-            if yearly_target_name not in target_coords or target_coords[yearly_target_name] is None:
-                st.error(f"Não foi possível encontrar o alvo '{yearly_target_name}'. Verifique o nome e tente novamente.")
-            else:
-                target_coord = target_coords[yearly_target_name]
-                
-                # Realizar análise anual (pode levar alguns minutos)
-                with st.spinner(f"Analisando visibilidade de {yearly_target_name} ao longo de {year}... Isso pode levar alguns minutos."):
-                    df_year = analyze_year_visibility(year, observer_location, observer_timezone, target_coord, min_altitude)
-                
-                if df_year.empty:
-                    st.warning(f"O alvo {yearly_target_name} não foi visível acima de {min_altitude_deg}° em nenhuma noite de {year} nesta localização.")
-                else:
-                    st.success(f"Análise anual concluída! {yearly_target_name} foi visível em {len(df_year)} noites durante {year}.")
-                    
-                    # Gerar e exibir o heatmap
-                    fig = plot_yearly_visibility(df_year, yearly_target_name, year)
-                    if fig:
-                        st.pyplot(fig)
-                        plt.close(fig)
-                    
-                    # Estatísticas adicionais
-                    st.subheader("📊 Estatísticas")
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.metric("Noites Visíveis", len(df_year))
-                    with col2:
-                        avg_duration = df_year['duration_hours'].mean()
-                        st.metric("Duração Média", f"{avg_duration:.2f}h")
-                    with col3:
-                        max_duration = df_year['duration_hours'].max()
-                        st.metric("Duração Máxima", f"{max_duration:.2f}h")
-                    
-                    # Melhor período
-                    best_month = df_year.groupby(pd.to_datetime(df_year['date']).dt.month)['duration_hours'].mean().idxmax()
-                    month_names = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
-                    st.info(f"🌟 **Melhor Período:** {month_names[best_month-1]} de {year}")
+            st.session_state['year_request'] = {
+                'site': site_key(st.session_state['observer_location']),
+                'year': int(year),
+                'target_name': yearly_target_name,
+            }
+
+    year_request = st.session_state.get('year_request')
+    if year_request:
+        yearly_target_name, year = year_request['target_name'], year_request['year']
+        year_args = (year_request['site'], year, yearly_target_name, min_altitude_deg)
+
+        # Realizar análise anual (em cache por local, alvo, ano e elevação)
+        with st.spinner(f"Analisando visibilidade de {yearly_target_name} ao longo de {year}..."):
+            df_year = compute_year_visibility(*year_args)
+
+        if df_year is None:
+            st.error(f"Não foi possível encontrar o alvo '{yearly_target_name}'. Verifique o nome e tente novamente.")
+        elif df_year.empty:
+            st.warning(f"O alvo {yearly_target_name} não foi visível acima de {min_altitude_deg}° em nenhuma noite de {year} nesta localização.")
+        else:
+            st.success(f"Análise anual concluída! {yearly_target_name} foi visível em {len(df_year)} noites durante {year}.")
+
+            # Exibir o heatmap
+            png = render_year_plot(*year_args)
+            if png:
+                st.image(png)
+
+            # Estatísticas adicionais
+            st.subheader("📊 Estatísticas")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Noites Visíveis", len(df_year))
+            with col2:
+                avg_duration = df_year['duration_hours'].mean()
+                st.metric("Duração Média", f"{avg_duration:.2f}h")
+            with col3:
+                max_duration = df_year['duration_hours'].max()
+                st.metric("Duração Máxima", f"{max_duration:.2f}h")
+
+            # Melhor período
+            best_month = df_year.groupby(pd.to_datetime(df_year['date']).dt.month)['duration_hours'].mean().idxmax()
+            month_names = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
+            st.info(f"🌟 **Melhor Período:** {month_names[best_month-1]} de {year}")
+
+# --- Painel de Desempenho ---
+if show_performance:
+    instrumentation.disable()
+    with st.expander("⏱️ Desempenho desta execução", expanded=True):
+        report = instrumentation.timing_report()
+        if report.empty:
+            st.caption("Nada foi calculado nesta execução: os resultados vieram do cache.")
+        else:
+            st.dataframe(report, hide_index=True)
+        st.write(instrumentation.counters())
+        col_json, col_trace = st.columns(2)
+        with col_json:
+            st.download_button("Baixar medições (JSON)", json.dumps(instrumentation.export_json(), default=str),
+                               file_name="desempenho.json", mime="application/json")
+        with col_trace:
+            st.download_button("Baixar trace do Chrome", json.dumps(instrumentation.export_chrome_trace(), default=str),
+                               file_name="trace.json", mime="application/json")
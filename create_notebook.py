@@ -26,11 +26,16 @@ Este notebook permite que você planeje observações astronômicas de forma int
     new_code_cell("""import warnings
 from datetime import date
 import pytz, csv, os
-from src.config import *
-from src.location import *
-from src.targets import *
-from src.analysis import *
-from src.plotting import *
+import matplotlib.pyplot as plt
+from astropy import units as u
+from astropy.coordinates import AltAz
+from astropy.time import Time
+from astropy.utils.exceptions import AstropyWarning
+from src.location import get_location_from_city, set_timezone_for_sao_paulo
+from src.targets import (get_target_skycoords, load_target_catalog, registrar_alvos_sistema_solar,
+                         DEEP_SKY_TARGETS_PRESET)
+from src.analysis import calculate_nightly_events, analyze_target_visibility_for_night, analyze_year_visibility
+from src.plotting import plot_target_visibility, plot_sky_map, plot_yearly_visibility
 warnings.filterwarnings('ignore', category=AstropyWarning)
 print("Módulos carregados com sucesso!")"""),
     
@@ -58,7 +63,7 @@ usar_alvos_sistema_solar = True
 alvos_manuais = ["NGC 5128", "M83"]
 
 # Arquivo de alvos (opcional)
-ARQUIVO_DE_ALVOS = None  # Ou "targets.csv" se tiver um arquivo
+ARQUIVO_DE_ALVOS = None  # Ou "targets.csv"/"targets.fits" (colunas nome, ra, dec) ou "targets.txt" (um nome por linha)
 
 # Configurações para análise anual
 ALVO_ANUAL = "M42"
@@ -94,19 +99,15 @@ if observer_location is not None:
         nomes_alvos.extend(DEEP_SKY_TARGETS_PRESET)
     if alvos_manuais:
         nomes_alvos.extend(alvos_manuais)
-    if ARQUIVO_DE_ALVOS and os.path.exists(ARQUIVO_DE_ALVOS):
-        if ARQUIVO_DE_ALVOS.endswith('.txt'):
-            with open(ARQUIVO_DE_ALVOS, 'r') as f:
-                nomes_alvos.extend([l.strip() for l in f if l.strip() and not l.startswith('#')])
-        elif ARQUIVO_DE_ALVOS.endswith('.csv'):
-            with open(ARQUIVO_DE_ALVOS, 'r') as f:
-                reader = csv.DictReader(f)
-                nomes_alvos.extend([row['alvo'] for row in reader if 'alvo' in row])
-    
     # Buscar coordenadas
     all_targets = {}
     if nomes_alvos:
         all_targets.update(get_target_skycoords(nomes_alvos))
+    if ARQUIVO_DE_ALVOS and os.path.exists(ARQUIVO_DE_ALVOS):
+        # Lido em blocos; linhas sem RA/Dec são resolvidas pelo nome
+        catalogo = load_target_catalog(ARQUIVO_DE_ALVOS)
+        print(f"📄 {len(catalogo)} alvos lidos de {ARQUIVO_DE_ALVOS}")
+        all_targets.update(catalogo)
     if usar_alvos_sistema_solar:
         all_targets.update(registrar_alvos_sistema_solar(start_night))
     
@@ -0,0 +1,154 @@
+# src/almanac.py
+
+"""
+Módulo de Almanaque do Local.
+
+Cache dos eventos noturnos (pôr do sol, crepúsculos, meia-noite e nascer do sol)
+por data e local. Para um local fixo o resultado de uma data nunca muda, então as
+análises noturnas e anuais podem consultá-lo em O(1) em vez de recalcular.
+
+As chaves usam a data, a latitude/longitude arredondadas (0,01° ≈ 1 km, o que
+altera os crepúsculos em poucos segundos), a altitude arredondada e o fuso horário.
+Os valores ficam num LRU em memória e, opcionalmente, num arquivo SQLite.
+
+O preenchimento e a consulta por intervalos de datas estão em `src/analysis.py`
+(`precompute_almanac` e `get_night_events_table`).
+"""
+import os
+import sqlite3
+from collections import OrderedDict
+
+import numpy as np
+
+EVENT_COLUMNS = ['por_do_sol', 'inicio_noite', 'meia_noite_real', 'fim_noite', 'nascer_do_sol']
+LAT_LON_DECIMALS = 2
+HEIGHT_QUANTUM_M = 10
+DEFAULT_MAXSIZE = 20000
+
+def almanac_key(analysis_date, observer_location, observer_timezone=None):
+    """
+    Monta a chave do almanaque: (data ISO, lat, lon, altitude, fuso) com a posição quantizada.
+    """
+    timezone = getattr(observer_timezone, 'zone', None) or (str(observer_timezone) if observer_timezone else 'UTC')
+    height = float(observer_location.height.to_value('m'))
+    return (
+        analysis_date.isoformat(),
+        round(float(observer_location.lat.deg), LAT_LON_DECIMALS),
+        round(float(observer_location.lon.deg), LAT_LON_DECIMALS),
+        int(round(height / HEIGHT_QUANTUM_M) * HEIGHT_QUANTUM_M),
+        timezone,
+    )
+
+def _key_to_text(key):
+    return '|'.join(str(part) for part in key)
+
+class AlmanacCache:
+    """
+    Cache LRU de eventos noturnos, com persistência opcional em SQLite.
+
+    Cada valor é uma tupla com as datas julianas (UTC) de `EVENT_COLUMNS`, com NaN
+    para eventos que não ocorrem (p. ex. sem noite astronômica).
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._conn = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            with self._conn:
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS almanac (key TEXT PRIMARY KEY, "
+                    + ", ".join(f"{column} REAL" for column in EVENT_COLUMNS) + ")"
+                )
+
+    def _remember(self, key, values):
+        self._memory[key] = values
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """
+        Retorna a tupla de datas julianas da chave, ou None se ela não estiver no cache.
+        """
+        values = self._memory.get(key)
+        if values is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return values
+
+        if self._conn is not None:
+            row = self._conn.execute(
+                f"SELECT {', '.join(EVENT_COLUMNS)} FROM almanac WHERE key = ?", (_key_to_text(key),)
+            ).fetchone()
+            if row is not None:
+                values = tuple(np.nan if v is None else v for v in row)
+                self._remember(key, values)
+                self.hits += 1
+                return values
+
+        self.misses += 1
+        return None
+
+    def put_many(self, items):
+        """
+        Armazena vários pares (chave, valores) de uma vez.
+        """
+        items = [(key, tuple(float(v) for v in values)) for key, values in items]
+        for key, values in items:
+            self._remember(key, values)
+        if self._conn is not None and items:
+            placeholders = ', '.join('?' * (len(EVENT_COLUMNS) + 1))
+            with self._conn:
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO almanac VALUES ({placeholders})",
+                    [(_key_to_text(key),) + tuple(None if np.isnan(v) else v for v in values)
+                     for key, values in items]
+                )
+
+    def put(self, key, values):
+        """
+        Armazena os valores de uma chave.
+        """
+        self.put_many([(key, values)])
+
+    def clear(self):
+        """
+        Esvazia o cache em memória (e o arquivo, se houver).
+        """
+        self._memory.clear()
+        self.hits = self.misses = 0
+        if self._conn is not None:
+            with self._conn:
+                self._conn.execute("DELETE FROM almanac")
+
+    def __len__(self):
+        return len(self._memory)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+_default_almanac = None
+
+def get_default_almanac():
+    """
+    Retorna o almanaque padrão do processo (em memória, criado na primeira chamada).
+    """
+    global _default_almanac
+    if _default_almanac is None:
+        _default_almanac = AlmanacCache()
+    return _default_almanac
+
+def set_default_almanac(almanac):
+    """
+    Substitui o almanaque padrão do processo (p. ex. por um com persistência em disco).
+    """
+    global _default_almanac
+    _default_almanac = almanac
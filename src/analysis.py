@@ -4,28 +4,85 @@
 Módulo de Análise Astronômica.
 ... (comentários como antes) ...
 """
-from astroplan import Observer
-from .config import (
-    np, pd, u, AltAz, Time, requests, get_sun, get_body,
-    datetime, timedelta, date, moon_illumination, tqdm, erfa
+from datetime import datetime, timedelta, date
+
+import numpy as np
+import pandas as pd
+from astropy import units as u
+from astropy.coordinates import AltAz, EarthLocation, ITRS, SkyCoord, get_body, get_sun
+from astropy.time import Time
+
+from . import config  # noqa: F401  (filtros de avisos do pacote)
+from . import instrumentation
+from .almanac import EVENT_COLUMNS, almanac_key, get_default_almanac
+from .catalog import TargetCatalog
+from .horizon import (
+    CULMINATION_MARGIN_DEG, J2000_JD, check_accuracy, compute_altaz, culmination_altitudes, fast_altaz_track,
+    times_to_jd
 )
+from .ephemeris import get_body_ephemeris, is_moving_target
+from .moon import (
+    angular_separation, compute_moon_layer, compute_nightly_moon, moon_avoidance_mask,
+    moon_illumination_from_xyz, moon_separation, xyz_to_radec
+)
+from .skyindex import SkyIndex
+
+NIGHT_GRID_FREQ = '5min'
+
+NIGHT_EVENT_KEYS = ["inicio_noite", "fim_noite", "por_do_sol", "nascer_do_sol", "meia_noite_real"]
+
+def _jd_or_nan(event_time):
+    """
+    Data juliana de um evento, ou NaN se ele não ocorrer (tempo mascarado/inválido).
+    """
+    jd = np.ma.filled(np.ma.asarray(event_time.jd, dtype=float), np.nan)
+    return float(jd)
 
-def calculate_nightly_events(analysis_date, observer_location, observer_timezone):
+def _events_from_jd(values):
+    """
+    Converte uma tupla de datas julianas (ordem de EVENT_COLUMNS) no dicionário de eventos.
+    """
+    by_column = dict(zip(EVENT_COLUMNS, values))
+    return {
+        key: Time(by_column[key], format='jd', scale='utc') if np.isfinite(by_column[key]) else None
+        for key in NIGHT_EVENT_KEYS
+    }
+
+@instrumentation.instrumented()
+def calculate_nightly_events(analysis_date, observer_location, observer_timezone, use_almanac=True):
     """
     Calcula os horários do pôr do sol, crepúsculo astronômico e nascer do sol.
+
+    Com use_almanac=True o resultado é consultado/guardado no almanaque do processo
+    (`src/almanac.py`), de modo que a mesma data e local não são recalculados.
     """
+    almanac = get_default_almanac() if use_almanac else None
+    if almanac is not None:
+        key = almanac_key(analysis_date, observer_location, observer_timezone)
+        cached = almanac.get(key)
+        instrumentation.count('almanac_hits' if cached is not None else 'almanac_misses')
+        if cached is not None:
+            return _events_from_jd(cached)
+
     try:
+        from astroplan import Observer
+
         observer = Observer(location=observer_location, timezone=observer_timezone)
-        time_midday = Time(f"{analysis_date.strftime('%Y-%m-%d')} 12:00:00")
+        # A noite da data começa no meio-dia solar médio local, a mesma âncora do núcleo
+        # vetorial (`_compute_sites_night_events_jd`): os dois caminhos gravam a mesma noite
+        # no almanaque. Ancorar no meio-dia UTC pulava a noite em longitudes a leste.
+        time_midday = (Time(f"{analysis_date.strftime('%Y-%m-%d')} 12:00:00")
+                       - observer_location.lon.deg / 360.0 * u.day)
 
-        # CORREÇÃO: Remover a chamada .astimezone(). O Observer já retorna o tempo no fuso correto.
-        sunset_time = observer.sun_set_time(time_midday, which='next')
-        sunrise_time = observer.sun_rise_time(time_midday, which='next')
-        evening_astro_twilight = observer.twilight_evening_astronomical(time_midday, which='next')
-        morning_astro_twilight = observer.twilight_morning_astronomical(time_midday, which='next')
-        midnight_time = observer.midnight(time_midday, which='next')
+        with instrumentation.span('twilight_root_finding', engine='astroplan', days=1):
+            # CORREÇÃO: Remover a chamada .astimezone(). O Observer já retorna o tempo no fuso correto.
+            sunset_time = observer.sun_set_time(time_midday, which='next')
+            sunrise_time = observer.sun_rise_time(time_midday, which='next')
+            evening_astro_twilight = observer.twilight_evening_astronomical(time_midday, which='next')
+            morning_astro_twilight = observer.twilight_morning_astronomical(time_midday, which='next')
+            midnight_time = observer.midnight(time_midday, which='next')
 
-        return {
+        events = {
             "inicio_noite": evening_astro_twilight,
             "fim_noite": morning_astro_twilight,
             "por_do_sol": sunset_time,
@@ -36,40 +93,489 @@ def calculate_nightly_events(analysis_date, observer_location, observer_timezone
         print(f"Aviso: Não foi possível calcular os eventos noturnos para {analysis_date}. Erro: {e}")
         return {}
 
-def analyze_target_visibility_for_night(start_time, end_time, observer_location, target_coord, min_altitude):
+    if almanac is not None:
+        almanac.put(key, [_jd_or_nan(events[column]) for column in EVENT_COLUMNS])
+    return events
+
+def _night_time_grid(start_time, end_time, freq=NIGHT_GRID_FREQ):
+    """
+    Gera a grade de tempos (UTC) usada para amostrar uma noite.
+    """
+    return pd.date_range(start=start_time.to_datetime(), end=end_time.to_datetime(), freq=freq)
+
+def _resolve_moving_target(target, start_time, end_time):
+    """
+    Troca o nome de um corpo do Sistema Solar (p. ex. 'jupiter') por uma efeméride
+    interpolada que cobre o intervalo; SkyCoords e efemérides passam inalterados.
+    """
+    if isinstance(target, str):
+        return get_body_ephemeris(target, start_time, end_time)
+    return target
+
+@instrumentation.instrumented()
+def analyze_target_visibility_for_night(start_time, end_time, observer_location, target_coord, min_altitude,
+                                        accuracy='exact'):
     """
     Calcula a altitude de um alvo ao longo de uma noite.
+
+    `accuracy='fast'` usa o núcleo analítico de `src/horizon.py` no lugar da
+    transformação completa do astropy (erro até `FAST_ALTAZ_MAX_ERROR_DEG`).
+    O alvo também pode ser uma efeméride (`src/ephemeris.py`) ou o nome de um
+    corpo do Sistema Solar, cuja posição acompanha o movimento durante a noite.
     """
-    time_range = pd.date_range(start=start_time.to_datetime(), end=end_time.to_datetime(), freq='5min')
+    check_accuracy(accuracy)
+    target_coord = _resolve_moving_target(target_coord, start_time, end_time)
+    time_range = _night_time_grid(start_time, end_time)
     if time_range.empty:
         return pd.DataFrame()
+    if not is_moving_target(target_coord):
+        if not _reachable(target_coord, observer_location, min_altitude.to_value(u.deg), time_range)[0]:
+            return pd.DataFrame({'time': time_range[:0], 'altitude': np.empty(0)})
 
-    times_astro = Time(time_range)
-    frame = AltAz(obstime=times_astro, location=observer_location)
-    target_altaz = target_coord.transform_to(frame)
+    if is_moving_target(target_coord):
+        altitude = target_coord.altaz(time_range, observer_location, accuracy)[0]
+    elif accuracy == 'fast':
+        altitude = compute_altaz(target_coord, time_range, observer_location, accuracy)[0][0]
+    else:
+        times_astro = Time(time_range)
+        frame = AltAz(obstime=times_astro, location=observer_location)
+        with instrumentation.span('altaz_transform', accuracy='exact', points=len(time_range)):
+            altitude = target_coord.transform_to(frame).alt.deg
+        instrumentation.count('altaz_transforms')
+        instrumentation.count('altaz_points', len(time_range))
 
-    df = pd.DataFrame({'time': time_range, 'altitude': target_altaz.alt.deg})
+    df = pd.DataFrame({'time': time_range, 'altitude': altitude})
     df_visible = df[df['altitude'] >= min_altitude.value].copy()
     return df_visible
 
-def check_hemisphere_visibility(observer_location, target_coord):
+def _as_target_arrays(targets):
+    """
+    Normaliza um conjunto de alvos para (nomes, SkyCoord vetorial em ICRS).
+
+    Aceita um dicionário nome -> SkyCoord (formato de `get_target_skycoords`),
+    um `TargetCatalog` (`src/catalog.py`) ou uma tupla (nomes, ra_graus, dec_graus)
+    com arrays de mesmo tamanho. Efemérides de alvos em movimento são ignoradas
+    (ver `_split_moving_targets`).
+    """
+    if isinstance(targets, TargetCatalog):
+        return targets.names.tolist(), targets.to_skycoord()
+    if isinstance(targets, dict):
+        names, ras, decs = [], [], []
+        for name, coord in targets.items():
+            if coord is None or is_moving_target(coord):
+                continue
+            icrs = coord.icrs
+            names.append(name)
+            ras.append(icrs.ra.deg)
+            decs.append(icrs.dec.deg)
+    else:
+        names, ras, decs = targets
+        names = list(names)
+
+    ra = np.asarray(ras, dtype=float).reshape(-1)
+    dec = np.asarray(decs, dtype=float).reshape(-1)
+    if not (len(names) == ra.size == dec.size):
+        raise ValueError("Os arrays de nomes, RA e Dec devem ter o mesmo tamanho.")
+    return names, SkyCoord(ra=ra * u.deg, dec=dec * u.deg, frame='icrs')
+
+def _split_moving_targets(targets):
+    """
+    Separa as efemérides (alvos em movimento) de um dicionário de alvos, mantendo a ordem.
+    """
+    if not isinstance(targets, dict):
+        return {}
+    return {name: target for name, target in targets.items() if is_moving_target(target)}
+
+def find_observing_windows(names, time_range, altitude, min_altitude_deg):
+    """
+    Encontra, de forma vetorial, todas as janelas contínuas em que cada alvo fica
+    acima da elevação mínima. Um mesmo alvo pode ter mais de uma janela na noite.
+
+    `altitude` é uma matriz alvos x tempos (graus) amostrada em `time_range`.
+    Retorna um DataFrame com uma linha por janela.
+    """
+    columns = ['target', 'start_time', 'end_time', 'duration_hours', 'max_altitude']
+    altitude = np.asarray(altitude, dtype=float)
+    if altitude.size == 0:
+        return pd.DataFrame(columns=columns)
+
+    n_targets, n_times = altitude.shape
+    above = np.zeros((n_targets, n_times + 2), dtype=np.int8)
+    above[:, 1:-1] = altitude >= min_altitude_deg
+    edges = np.diff(above, axis=1)
+
+    # np.nonzero percorre a matriz linha a linha, então inícios e fins ficam pareados.
+    rows, start_idx = np.nonzero(edges == 1)
+    _, stop_idx = np.nonzero(edges == -1)
+    end_idx = stop_idx - 1
+
+    flat = np.append(altitude.reshape(-1), -np.inf)
+    bounds = np.empty(2 * rows.size, dtype=np.intp)
+    bounds[0::2] = rows * n_times + start_idx
+    bounds[1::2] = rows * n_times + stop_idx
+    max_alt = np.maximum.reduceat(flat, bounds)[0::2] if rows.size else np.array([])
+
+    times = pd.DatetimeIndex(time_range)
+    start_times = times[start_idx]
+    end_times = times[end_idx]
+    return pd.DataFrame({
+        'target': np.asarray(names, dtype=object)[rows],
+        'start_time': start_times,
+        'end_time': end_times,
+        'duration_hours': (end_times - start_times).total_seconds() / 3600.0,
+        'max_altitude': max_alt,
+    }, columns=columns)
+
+def _targets_altaz(names, coords, moving, times, observer_location, accuracy):
+    """
+    Matrizes alvos x tempos de altitude e azimute para alvos fixos e em movimento.
+
+    Alvos fixos numa única transformação; alvos em movimento, um por um, com a
+    posição interpolada em cada instante. As linhas seguem a ordem de `names`.
+    """
+    if not moving:
+        return compute_altaz(coords, times, observer_location, accuracy)
+
+    n_times = 1 if isinstance(times, Time) and times.isscalar else len(times)
+    altitude = np.empty((len(names), n_times))
+    azimuth = np.empty_like(altitude)
+    is_moving = np.array([name in moving for name in names])
+    if not is_moving.all():
+        altitude[~is_moving], azimuth[~is_moving] = compute_altaz(coords, times, observer_location, accuracy)
+    for row in np.nonzero(is_moving)[0]:
+        altitude[row], azimuth[row] = moving[names[row]].altaz(times, observer_location, accuracy)
+        instrumentation.count('ephemeris_altaz')
+    return altitude, azimuth
+
+@instrumentation.instrumented()
+def analyze_targets_visibility_for_night(start_time, end_time, observer_location, targets, min_altitude,
+                                         freq=NIGHT_GRID_FREQ, accuracy='exact', min_moon_separation=None):
+    """
+    Calcula a altitude e o azimute de vários alvos ao longo de uma noite de uma só vez.
+
+    A grade de tempos e o referencial AltAz são construídos uma única vez e todos os
+    alvos são transformados numa única chamada vetorial (alvos x tempos). Com
+    `accuracy='fast'` a transformação é feita pelo núcleo analítico de `src/horizon.py`.
+
+    Retorna um dicionário com:
+        - 'names': lista com os nomes dos alvos (ordem das linhas das matrizes);
+        - 'time': DatetimeIndex (UTC) com a grade da noite;
+        - 'altitude' / 'azimuth': matrizes alvos x tempos, em graus;
+        - 'windows': DataFrame com todas as janelas de observação (ver `find_observing_windows`);
+        - 'never_visible': nomes dos alvos fixos cuja culminação superior nunca alcança
+          `min_altitude` (pré-filtro analítico); as linhas deles nas matrizes ficam NaN,
+          sem nenhuma transformação.
+
+    Com `min_moon_separation` (Quantity angular) a Lua é calculada uma única vez na
+    mesma grade (`src/moon.py`) e o resultado ganha também:
+        - 'moon': dicionário com 'altitude', 'azimuth' e 'illumination' da Lua na grade;
+        - 'moon_separation': matriz alvos x tempos da separação até a Lua, em graus.
+    As janelas passam então a excluir os instantes em que a Lua está acima do
+    horizonte e a menos de `min_moon_separation` do alvo.
+    """
+    check_accuracy(accuracy)
+    names, coords = _as_target_arrays(targets)
+    moving = _split_moving_targets(targets)
+    time_range = _night_time_grid(start_time, end_time, freq)
+
+    fixed_names = names
+    if moving:
+        fixed = set(names)
+        names = [name for name in targets if name in moving or name in fixed]
+
+    never_visible = []
+    if time_range.empty or not names:
+        altitude = np.empty((len(names), len(time_range)))
+        azimuth = altitude.copy()
+    else:
+        # Alvos fixos cuja culminação não alcança a elevação mínima não são transformados.
+        reachable = _reachable(coords, observer_location, min_altitude.to_value(u.deg), time_range)
+        never_visible = [name for name, ok in zip(fixed_names, reachable) if not ok]
+        fixed_rows = np.array([row for row, name in enumerate(names) if name not in moving], dtype=int)
+        keep = np.ones(len(names), dtype=bool)
+        keep[fixed_rows[~reachable]] = False
+
+        altitude = np.full((len(names), len(time_range)), np.nan)
+        azimuth = altitude.copy()
+        if keep.any():
+            altitude[keep], azimuth[keep] = _targets_altaz([name for name, ok in zip(names, keep) if ok],
+                                                           coords[reachable], moving, time_range,
+                                                           observer_location, accuracy)
+
+    result = {
+        'names': names,
+        'time': time_range,
+        'altitude': altitude,
+        'azimuth': azimuth,
+        'never_visible': never_visible,
+    }
+    usable_altitude = altitude
+    if min_moon_separation is not None:
+        moon = compute_moon_layer(time_range, observer_location, accuracy)
+        separation = moon_separation(altitude, azimuth, moon['altitude'], moon['azimuth'])
+        clear = moon_avoidance_mask(separation, moon['altitude'], min_moon_separation.to_value(u.deg))
+        usable_altitude = np.where(clear, altitude, -90.0)
+        result['moon'] = moon
+        result['moon_separation'] = separation
+    result['windows'] = find_observing_windows(names, time_range, usable_altitude, min_altitude.to_value(u.deg))
+    return result
+
+@instrumentation.instrumented()
+def compute_sky_positions(targets, observer_location, time, accuracy='exact', min_altitude=None, index=None):
+    """
+    Altitude e azimute de todos os alvos num único instante (mapa do céu).
+
+    Aceita os mesmos formatos de alvos de `analyze_targets_visibility_for_night`,
+    inclusive um `TargetCatalog` ou colunas (nomes, ra_graus, dec_graus), e faz uma
+    única transformação para todos os alvos fixos. Retorna um dicionário com 'names'
+    (lista) e 'altitude' / 'azimuth' (arrays 1D, em graus), pronto para o filtro de
+    visibilidade e para `plot_sky_map(..., positions=...)`.
+
+    Com `min_altitude` (Quantity angular), só os alvos acima dela são devolvidos, e
+    só os alvos fixos dentro da calota visível (`src/skyindex.py`) são transformados.
+    `index` é um `SkyIndex` dos alvos fixos, na ordem de `_as_target_arrays(targets)`;
+    sem ele, um `TargetCatalog` usa o seu índice guardado e os demais formatos montam
+    um na hora.
+    """
+    check_accuracy(accuracy)
+    names, coords = _as_target_arrays(targets)
+    moving = _split_moving_targets(targets)
+    time = time if isinstance(time, Time) else Time(time)
+
+    if min_altitude is not None and names:
+        if index is None and isinstance(targets, TargetCatalog):
+            index = targets.sky_index()
+        elif index is None:
+            index = SkyIndex(coords.ra.deg, coords.dec.deg)
+        candidates = index.query_visible(observer_location, time, min_altitude.to_value(u.deg))
+        names = [names[row] for row in candidates]
+        coords = coords[candidates]
+
+    if moving:
+        fixed = set(names)
+        names = [name for name in targets if name in moving or name in fixed]
+    if not names:
+        return {'names': [], 'altitude': np.empty(0), 'azimuth': np.empty(0)}
+
+    altitude, azimuth = _targets_altaz(names, coords, moving, time, observer_location, accuracy)
+    altitude, azimuth = altitude[:, 0], azimuth[:, 0]
+    if min_altitude is not None:
+        visible = altitude >= min_altitude.to_value(u.deg)
+        names = [name for name, keep in zip(names, visible) if keep]
+        altitude, azimuth = altitude[visible], azimuth[visible]
+    return {'names': names, 'altitude': altitude, 'azimuth': azimuth}
+
+def target_visibility_dataframe(night_visibility, target_name, min_altitude):
+    """
+    Extrai de um resultado de `analyze_targets_visibility_for_night` o DataFrame
+    (time, altitude) com as amostras visíveis de um alvo, no mesmo formato de
+    `analyze_target_visibility_for_night`.
+    """
+    row = night_visibility['names'].index(target_name)
+    df = pd.DataFrame({'time': night_visibility['time'], 'altitude': night_visibility['altitude'][row]})
+    return df[df['altitude'] >= min_altitude.to_value(u.deg)].copy()
+
+ADAPTIVE_COARSE_STEP_MINUTES = 30
+ADAPTIVE_TOLERANCE_SECONDS = 1.0
+ADAPTIVE_MAX_ITERATIONS = 20
+
+class _AltitudeSampler:
+    """
+    Avalia a altitude de um alvo em lotes de datas julianas e conta as avaliações.
+    """
+
+    def __init__(self, observer_location, target_coord, accuracy):
+        self.observer_location = observer_location
+        self.target_coord = target_coord
+        self.accuracy = accuracy
+        self.n_evaluations = 0
+
+    def __call__(self, jd):
+        jd = np.asarray(jd, dtype=float).reshape(-1)
+        if jd.size == 0:
+            return jd.copy()
+        self.n_evaluations += jd.size
+        times = Time(jd, format='jd', scale='utc')
+        if is_moving_target(self.target_coord):
+            return self.target_coord.altaz(times, self.observer_location, self.accuracy)[0]
+        return compute_altaz(self.target_coord, times, self.observer_location, self.accuracy)[0][0]
+
+def _refine_extrema(sampler, jd, alt, step):
+    """
+    Refina os extremos locais (culminações) da grade grossa com duas iterações do vértice
+    de uma parábola por três pontos. Retorna (datas julianas, altitudes) dos extremos.
+    """
+    slope = np.diff(alt)
+    idx = np.nonzero(slope[:-1] * slope[1:] <= 0)[0] + 1
+    centers = jd[idx]
+    h = step / 2
+    for _ in range(2):
+        values = sampler(np.concatenate([centers - h, centers, centers + h]))
+        before, center, after = np.split(values, 3)
+        curvature = before - 2 * center + after
+        with np.errstate(divide='ignore', invalid='ignore'):
+            shift = np.where(curvature != 0, h * (before - after) / (2 * curvature), 0.0)
+        centers = centers + np.clip(shift, -h, h)
+        h /= 8
+    centers = np.clip(centers, jd[0], jd[-1])
+    return centers, sampler(centers)
+
+def _refine_threshold_crossings(sampler, threshold, jd_lo, jd_hi, f_lo, f_hi, tolerance_days):
+    """
+    Refina todas as travessias do limiar ao mesmo tempo pelo método de Illinois
+    (falsa posição modificada), até que cada intervalo fique menor que a tolerância.
+    """
+    for _ in range(ADAPTIVE_MAX_ITERATIONS):
+        if jd_lo.size == 0 or np.all(np.abs(jd_hi - jd_lo) < tolerance_days):
+            break
+        jd_new = (jd_lo * f_hi - jd_hi * f_lo) / (f_hi - f_lo)
+        f_new = sampler(jd_new) - threshold
+        crossed = np.sign(f_new) != np.sign(f_hi)
+        jd_lo, f_lo = np.where(crossed, jd_hi, jd_lo), np.where(crossed, f_hi, f_lo / 2)
+        jd_hi, f_hi = jd_new, f_new
+    return (jd_lo * f_hi - jd_hi * f_lo) / (f_hi - f_lo)
+
+def analyze_target_visibility_adaptive(start_time, end_time, observer_location, target_coord, min_altitude,
+                                       coarse_step_minutes=ADAPTIVE_COARSE_STEP_MINUTES,
+                                       tolerance_seconds=ADAPTIVE_TOLERANCE_SECONDS, accuracy='exact'):
     """
-    Verifica se um alvo é potencialmente visível do hemisfério do observador.
+    Versão adaptativa de `analyze_target_visibility_for_night`.
+
+    Avalia a altitude numa grade grossa (`coarse_step_minutes`), refina as culminações
+    com parábolas e, por busca de raiz, apenas as travessias da elevação mínima. Janelas
+    curtas perto da culminação, que cairiam entre dois pontos da grade, também são
+    encontradas porque a culminação refinada entra na busca pelas travessias.
+
+    Retorna um dicionário com:
+        - 'windows': DataFrame com start_time, end_time, duration_hours e max_altitude,
+          com horários exatos (dentro de `tolerance_seconds`);
+        - 'peak_altitude' / 'peak_time': a maior altitude do alvo na noite;
+        - 'transit_time': a culminação superior, se ocorrer durante a noite (senão None);
+        - 'n_evaluations': quantas altitudes foram calculadas, para comparar com a grade fixa.
+    """
+    check_accuracy(accuracy)
+    target_coord = _resolve_moving_target(target_coord, start_time, end_time)
+    sampler = _AltitudeSampler(observer_location, target_coord, accuracy)
+    threshold = min_altitude.to_value(u.deg)
+
+    start_jd, end_jd = start_time.utc.jd, end_time.utc.jd
+    step = coarse_step_minutes / (24 * 60)
+    n_steps = max(int(np.ceil((end_jd - start_jd) / step)), 2)
+    jd = np.linspace(start_jd, end_jd, n_steps + 1)
+    alt = sampler(jd)
+
+    extrema_jd, extrema_alt = _refine_extrema(sampler, jd, alt, jd[1] - jd[0])
+    order = np.argsort(np.concatenate([jd, extrema_jd]), kind='stable')
+    jd = np.concatenate([jd, extrema_jd])[order]
+    alt = np.concatenate([alt, extrema_alt])[order]
+
+    f = alt - threshold
+    idx = np.nonzero(np.sign(f[:-1]) * np.sign(f[1:]) < 0)[0]
+    crossings = _refine_threshold_crossings(sampler, threshold, jd[idx], jd[idx + 1], f[idx], f[idx + 1],
+                                            tolerance_seconds / 86400.0)
+
+    # Limites das janelas: travessias refinadas mais o início/fim da noite se o alvo já estiver acima.
+    rising = f[idx + 1] > 0
+    starts = list(crossings[rising])
+    ends = list(crossings[~rising])
+    if f[0] >= 0:
+        starts.insert(0, start_jd)
+    if f[-1] >= 0:
+        ends.append(end_jd)
+
+    windows = []
+    for window_start, window_end in zip(starts, ends):
+        inside = (jd >= window_start) & (jd <= window_end)
+        peak = max(alt[inside].max() if inside.any() else threshold, threshold)
+        windows.append((window_start, window_end, peak))
+
+    peak_index = int(np.argmax(alt))
+    is_transit = (extrema_alt >= alt.max() - 1e-9) & (extrema_jd > start_jd) & (extrema_jd < end_jd)
+    upper_culminations = extrema_jd[is_transit]
+
+    columns = ['start_time', 'end_time', 'duration_hours', 'max_altitude']
+    if windows:
+        window_jd = np.array(windows)
+        start_times = pd.DatetimeIndex(Time(window_jd[:, 0], format='jd', scale='utc').datetime64).round('ms')
+        end_times = pd.DatetimeIndex(Time(window_jd[:, 1], format='jd', scale='utc').datetime64).round('ms')
+        df_windows = pd.DataFrame({
+            'start_time': start_times,
+            'end_time': end_times,
+            'duration_hours': (window_jd[:, 1] - window_jd[:, 0]) * 24.0,
+            'max_altitude': window_jd[:, 2],
+        }, columns=columns)
+    else:
+        df_windows = pd.DataFrame(columns=columns)
+
+    return {
+        'windows': df_windows,
+        'peak_altitude': float(alt[peak_index]),
+        'peak_time': Time(jd[peak_index], format='jd', scale='utc'),
+        'transit_time': Time(upper_culminations[0], format='jd', scale='utc') if upper_culminations.size else None,
+        'n_evaluations': sampler.n_evaluations,
+    }
+
+def _culminations(coords, observer_location, times):
+    """
+    Culminações superior e inferior (graus) de alvos fixos vistos de um local, com a
+    declinação precessada para os extremos de `times` (ver `culmination_altitudes`).
+    """
+    jd = times_to_jd(times)
+    icrs = coords.icrs
+    return culmination_altitudes(icrs.ra.deg, icrs.dec.deg, observer_location.lat.deg, jd[[0, -1]])
+
+def _reachable(coords, observer_location, min_altitude_deg, times):
+    """
+    Máscara dos alvos fixos cuja culminação superior alcança `min_altitude_deg` (com folga).
+    """
+    upper = _culminations(coords, observer_location, times)[0]
+    return upper + CULMINATION_MARGIN_DEG >= min_altitude_deg
+
+def check_hemisphere_visibility(observer_location, target_coord, min_altitude=0 * u.deg, time=None):
+    """
+    Verifica se um alvo fixo pode ficar acima de `min_altitude` vista do local.
+
+    Usa a culminação superior analítica, 90° − |lat − dec| (declinação da data `time`,
+    por padrão agora), com a folga de `CULMINATION_MARGIN_DEG`. Aceita um SkyCoord
+    escalar (retorna bool) ou vetorial (retorna um array de bool).
+    """
+    time = Time.now() if time is None else (time if isinstance(time, Time) else Time(time))
+    reachable = _reachable(target_coord, observer_location, min_altitude.to_value(u.deg), time)
+    return bool(reachable[0]) if target_coord.isscalar else reachable.reshape(target_coord.shape)
+
+def classify_targets_by_culmination(targets, observer_location, min_altitude, time=None):
+    """
+    Classifica alvos fixos pelas culminações analíticas, sem nenhuma transformação.
+
+    Aceita os formatos de alvos de `analyze_targets_visibility_for_night` e `time`
+    (instante ou intervalo; por padrão agora). Retorna um DataFrame com as colunas
+    'target', 'max_altitude' e 'min_altitude' (culminações superior e inferior, em
+    graus) e 'status': 'never' (nunca alcança `min_altitude`), 'circumpolar' (nunca
+    desce abaixo dela) ou 'rises_and_sets'.
     """
-    observer_lat = observer_location.lat.deg
-    target_dec = target_coord.dec.deg
-    if (observer_lat > 0 and target_dec < -30) or (observer_lat < 0 and target_dec > 30):
-        return False
-    return True
+    names, coords = _as_target_arrays(targets)
+    time = Time.now() if time is None else (time if isinstance(time, Time) else Time(time))
+    upper, lower = _culminations(coords, observer_location, time)
+    threshold = min_altitude.to_value(u.deg)
+    status = np.where(upper + CULMINATION_MARGIN_DEG < threshold, 'never',
+                      np.where(lower >= threshold, 'circumpolar', 'rises_and_sets'))
+    return pd.DataFrame({'target': names, 'max_altitude': upper, 'min_altitude': lower, 'status': status})
 
 def analyze_moon_impact(time, observer_location, target_coord):
     """
     Calcula a iluminação da Lua e sua separação angular de um alvo.
+
+    Aceita um instante ou um array de tempos (`Time`); nesse caso a Lua e o Sol são
+    obtidos numa única chamada cada. Para muitos alvos ao longo de uma noite, prefira
+    `analyze_targets_visibility_for_night(..., min_moon_separation=...)`.
     """
     moon = get_body("moon", time, location=observer_location)
-    frame = AltAz(obstime=time, location=observer_location)
+    geocentric_xyz = get_body("moon", time).cartesian.xyz.to_value(u.km)
+    sun_xyz = get_body("sun", time).cartesian.xyz.to_value(u.km)
 
-    illum = moon_illumination(time) * 100
+    illum = moon_illumination_from_xyz(geocentric_xyz.reshape(3, -1).T, sun_xyz.reshape(3, -1).T) * 100
+    if time.isscalar:
+        illum = float(illum[0])
     separation = moon.separation(target_coord)
 
     return {
@@ -77,45 +583,426 @@ def analyze_moon_impact(time, observer_location, target_coord):
         "moon_separation": separation
     }
 
-def get_weather_forecast(lat, lon):
-    """
-    Obtém a previsão do tempo para 7 dias usando a API Open-Meteo.
+def get_weather_forecast(lat, lon, start_time=None, end_time=None, client=None, observer_timezone=None):
     """
-    try:
-        url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&hourly=cloudcover&forecast_days=2"
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
+    Cobertura de nuvens média prevista para a noite, formatada como texto ("42.0%" ou "N/A").
 
-        hourly_data = pd.DataFrame(data['hourly'])
-        hourly_data['time'] = pd.to_datetime(hourly_data['time'])
+    Sem `start_time`/`end_time`, usa a noite astronômica de hoje no local: "hoje" é a
+    data no fuso `observer_timezone` (por padrão o de `set_timezone_for_sao_paulo`, ou
+    UTC). A série horária vem do cliente de `src/weather.py` (sessão reaproveitada,
+    prazos e cache) e é interpolada na mesma grade de tempos da análise de visibilidade.
+    """
+    import pytz
+    from .weather import get_default_weather_client
 
-        now = datetime.now()
-        start_night = datetime(now.year, now.month, now.day, 18)
-        if now.hour > 18: start_night += timedelta(days=1)
-        end_night = start_night + timedelta(hours=12)
+    client = client if client is not None else get_default_weather_client()
+    try:
+        if start_time is None or end_time is None:
+            location = EarthLocation(lat=lat * u.deg, lon=lon * u.deg)
+            if observer_timezone is None:
+                from .location import set_timezone_for_sao_paulo
 
-        night_forecast = hourly_data[(hourly_data['time'] >= start_night) & (hourly_data['time'] <= end_night)]
+                observer_timezone = set_timezone_for_sao_paulo(location) or pytz.UTC
+            today = datetime.now(observer_timezone).date()
+            events = calculate_nightly_events(today, location, observer_timezone)
+            if not events or events['inicio_noite'] is None or events['fim_noite'] is None:
+                return "N/A"
+            start_time, end_time = events['inicio_noite'], events['fim_noite']
 
-        if not night_forecast.empty:
-            avg_cloud_cover = night_forecast['cloudcover'].mean()
-            return f"{avg_cloud_cover:.1f}%"
+        cloud_cover = client.cloud_cover_on_grid(lat, lon, _night_time_grid(start_time, end_time))
+        if np.isfinite(cloud_cover).any():
+            return f"{np.nanmean(cloud_cover):.1f}%"
     except Exception:
         return "N/A"
     return "N/A"
 
-def analyze_year_visibility(year, observer_location, observer_timezone, target_coord, min_altitude):
+SUN_GRID_STEP_MINUTES = 60
+SUN_REFINE_ITERATIONS = 6
+SUNSET_HORIZON_DEG = 0.0
+ASTRONOMICAL_TWILIGHT_DEG = -18.0
+
+def _zenith_vectors(observer_location):
     """
-    Analisa a visibilidade de um alvo para cada noite de um ano inteiro.
+    Vetores unitários da vertical local (normal geodésica) em ITRS, forma local.shape + (3,).
     """
-    start_date = date(year, 1, 1)
-    end_date = date(year, 12, 31)
-    results = []
+    lat, lon = observer_location.lat.rad, observer_location.lon.rad
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+def _topocentric(sun_itrs_km, observer_location):
+    site = np.stack([observer_location.x, observer_location.y, observer_location.z], axis=-1).to_value(u.km)
+    return sun_itrs_km - site
 
-    for day_offset in tqdm(range((end_date - start_date).days + 1), desc=f"Analisando {year}", unit="dia"):
+def _topocentric_altitude(sun_itrs_km, observer_location):
+    """
+    Altitude (graus) de posições ITRS (..., 3) em km vistas de `observer_location` (com broadcasting).
+    """
+    topocentric = _topocentric(sun_itrs_km, observer_location)
+    up = (_zenith_vectors(observer_location) * topocentric).sum(axis=-1)
+    return np.degrees(np.arcsin(np.clip(up / np.sqrt((topocentric ** 2).sum(axis=-1)), -1.0, 1.0)))
+
+def _antitransit_offset(sun_itrs_km, observer_location):
+    """
+    Ângulo horário topocêntrico do Sol menos 180 graus, em [-180, 180): cresce com o tempo
+    e passa por zero na passagem meridiana inferior (a meia-noite verdadeira).
+    """
+    topocentric = _topocentric(sun_itrs_km, observer_location)
+    sun_longitude = np.degrees(np.arctan2(topocentric[..., 1], topocentric[..., 0]))
+    return np.mod(observer_location.lon.deg - sun_longitude, 360.0) - 180.0
+
+def _sun_itrs_km(jd):
+    """
+    Posição aparente do Sol no referencial terrestre (ITRS), em km, forma jd.shape + (3,).
+    """
+    times = Time(jd, format='jd', scale='utc')
+    return np.moveaxis(get_sun(times).transform_to(ITRS(obstime=times)).cartesian.xyz.to_value(u.km), 0, -1)
+
+def _earth_rotation_angle(jd):
+    return 2 * np.pi * np.mod(0.7790572732640 + 1.00273781191135448 * (jd - J2000_JD), 1.0)
+
+class _SunTrack:
+    """
+    Posição do Sol em ITRS amostrada numa grade regular e interpolada entre as amostras.
+
+    A interpolação é feita num referencial que acompanha a rotação da Terra (onde o Sol
+    anda menos de 0,05 graus por hora), de modo que o erro fica em milésimos de segundo
+    de arco e o refinamento dos eventos de todos os locais não volta ao astropy.
+    """
+
+    def __init__(self, grid_jd):
+        self.grid_jd = grid_jd
+        self.step = grid_jd[1] - grid_jd[0]
+        self.itrs_km = _sun_itrs_km(grid_jd)
+        self._corotating = self._rotate(self.itrs_km, _earth_rotation_angle(grid_jd))
+
+    @staticmethod
+    def _rotate(xyz, angle):
+        c, s = np.cos(angle), np.sin(angle)
+        x, y, z = np.moveaxis(xyz, -1, 0)
+        return np.stack([c * x - s * y, s * x + c * y, z], axis=-1)
+
+    def position(self, jd):
+        """
+        Posição ITRS (km) do Sol em datas julianas quaisquer dentro da grade, forma jd.shape + (3,).
+        """
+        # Interpolação cúbica de Catmull-Rom: contínua na derivada, para que as raízes
+        # refinadas não dependam da fase da grade.
+        position = (jd - self.grid_jd[0]) / self.step
+        index = np.clip(np.floor(position).astype(int), 1, self.grid_jd.size - 3)
+        t = (position - index)[:, np.newaxis]
+        p0, p1, p2, p3 = (self._corotating[index + offset] for offset in (-1, 0, 1, 2))
+        corotating = p1 + 0.5 * t * (p2 - p0 + t * (2 * p0 - 5 * p1 + 4 * p2 - p3 + t * (3 * (p1 - p2) + p3 - p0)))
+        return self._rotate(corotating, -_earth_rotation_angle(jd))
+
+def _refine_crossings(jd_lo, jd_hi, f_lo, f_hi, thresholds, evaluate):
+    """
+    Refina, todas ao mesmo tempo, as travessias de uma função do Sol por seus limiares
+    usando falsa posição (variante de Illinois) sobre intervalos que já contêm a raiz.
+    `evaluate(jd)` avalia a função no local de cada travessia.
+    """
+    f_lo, f_hi = f_lo - thresholds, f_hi - thresholds
+    last_kept = np.zeros(np.shape(jd_lo))
+    for _ in range(SUN_REFINE_ITERATIONS):
+        jd_mid = jd_lo - f_lo * (jd_hi - jd_lo) / (f_hi - f_lo)
+        f_mid = evaluate(jd_mid) - thresholds
+        same_side = np.sign(f_mid) == np.sign(f_lo)
+        jd_lo, f_lo = np.where(same_side, jd_mid, jd_lo), np.where(same_side, f_mid, f_lo)
+        jd_hi, f_hi = np.where(same_side, jd_hi, jd_mid), np.where(same_side, f_hi, f_mid)
+        # Se a mesma extremidade sobrevive duas vezes seguidas, seu valor é reduzido à
+        # metade; isso evita a convergência lenta da falsa posição nas travessias rasantes.
+        f_hi = np.where(same_side & (last_kept > 0), f_hi / 2, f_hi)
+        f_lo = np.where(~same_side & (last_kept < 0), f_lo / 2, f_lo)
+        last_kept = np.where(same_side, 1.0, -1.0)
+    return jd_lo - f_lo * (jd_hi - jd_lo) / (f_hi - f_lo)
+
+@instrumentation.instrumented('twilight_root_finding')
+def _compute_sites_night_events_jd(start_date, end_date, locations):
+    """
+    Núcleo vetorial dos eventos noturnos para S locais (EarthLocation vetorial).
+
+    A posição do Sol é calculada uma única vez numa grade UTC que cobre todos os locais
+    (`_SunTrack`), a altitude vira uma matriz locais x tempos, e todas as travessias e
+    meias-noites de todos os locais são refinadas juntas sobre a posição interpolada.
+    Retorna (datas, array locais x dias x EVENT_COLUMNS de datas julianas UTC, com NaN
+    para eventos que não ocorrem).
+    """
+    n_sites = len(locations)
+    n_days = (end_date - start_date).days + 1
+    dates = pd.date_range(start=start_date, periods=n_days, freq='D')
+    site_start_jd = Time(dates[0].to_pydatetime(), scale='utc').jd + 0.5 - locations.lon.deg / 360.0
+
+    step = SUN_GRID_STEP_MINUTES / (24 * 60)
+    first_jd = site_start_jd.min()
+    span_days = n_days + site_start_jd.max() - first_jd
+    grid_jd = first_jd + np.arange(int(np.ceil(span_days / step)) + 2) * step
+    sun = _SunTrack(grid_jd)
+    alt = _topocentric_altitude(sun.itrs_km, locations[:, np.newaxis])
+    hour_angle = _antitransit_offset(sun.itrs_km, locations[:, np.newaxis])
+
+    # (coluna, limiar, sentido da travessia: -1 descendo, +1 subindo)
+    crossings = [
+        ('por_do_sol', SUNSET_HORIZON_DEG, -1),
+        ('inicio_noite', ASTRONOMICAL_TWILIGHT_DEG, -1),
+        ('fim_noite', ASTRONOMICAL_TWILIGHT_DEG, 1),
+        ('nascer_do_sol', SUNSET_HORIZON_DEG, 1),
+    ]
+    sites, brackets, owners = [], [], []
+    for column, threshold, direction in crossings:
+        below = alt < threshold
+        if direction < 0:
+            site, idx = np.nonzero(~below[:, :-1] & below[:, 1:])
+        else:
+            site, idx = np.nonzero(below[:, :-1] & ~below[:, 1:])
+        sites.append(site)
+        brackets.append((idx, np.full(idx.size, threshold)))
+        owners.append(np.full(idx.size, column, dtype=object))
+
+    site = np.concatenate(sites)
+    idx = np.concatenate([b[0] for b in brackets])
+    thresholds = np.concatenate([b[1] for b in brackets])
+    event_jd = _refine_crossings(grid_jd[idx], grid_jd[idx + 1], alt[site, idx], alt[site, idx + 1],
+                                 thresholds, lambda jd: _topocentric_altitude(sun.position(jd), locations[site]))
+    event_column = np.concatenate(owners)
+
+    # Meia-noite verdadeira: passagem meridiana inferior do Sol (ângulo horário de 180
+    # graus), como o `Observer.midnight` do astroplan. Ao contrário do mínimo da altitude,
+    # é uma raiz bem condicionada mesmo com o Sol passando perto do nadir.
+    mid_site, mid_idx = np.nonzero((hour_angle[:, :-1] < 0) & (hour_angle[:, 1:] >= 0))
+    midnight_jd = _refine_crossings(grid_jd[mid_idx], grid_jd[mid_idx + 1], hour_angle[mid_site, mid_idx],
+                                    hour_angle[mid_site, mid_idx + 1], 0.0,
+                                    lambda jd: _antitransit_offset(sun.position(jd), locations[mid_site]))
+    event_jd = np.concatenate([event_jd, midnight_jd])
+    event_column = np.concatenate([event_column, np.full(mid_idx.size, 'meia_noite_real', dtype=object)])
+    site = np.concatenate([site, mid_site])
+
+    day_index = np.floor(event_jd - site_start_jd[site]).astype(int)
+    in_range = (day_index >= 0) & (day_index < n_days)
+    events = pd.DataFrame({'site': site[in_range], 'day': day_index[in_range],
+                           'column': event_column[in_range], 'jd': event_jd[in_range]})
+    # Se houver mais de uma travessia do mesmo tipo num dia, vale a primeira (como 'next').
+    table = events.sort_values('jd').groupby(['site', 'day', 'column'])['jd'].first().unstack('column')
+    table = table.reindex(index=pd.MultiIndex.from_product([np.arange(n_sites), np.arange(n_days)]),
+                          columns=EVENT_COLUMNS)
+    return dates, table.to_numpy(dtype=float).reshape(n_sites, n_days, len(EVENT_COLUMNS))
+
+def _compute_night_events_jd(start_date, end_date, observer_location):
+    """
+    Núcleo de `compute_night_events_table`: retorna (datas, matriz dias x EVENT_COLUMNS de
+    datas julianas UTC, com NaN para eventos que não ocorrem).
+    """
+    dates, jd = _compute_sites_night_events_jd(start_date, end_date, observer_location.reshape((1,)))
+    return dates, jd[0]
+
+def _jd_matrix_to_table(dates, jd_matrix):
+    """
+    Converte a matriz de datas julianas de eventos num DataFrame indexado por data (datetime64 UTC).
+    """
+    result = pd.DataFrame(index=pd.Index(dates, name='date'))
+    for column, jd in zip(EVENT_COLUMNS, np.asarray(jd_matrix, dtype=float).T):
+        valid = ~np.isnan(jd)
+        values = np.full(jd.size, np.datetime64('NaT'), dtype='datetime64[ns]')
+        if valid.any():
+            values[valid] = Time(jd[valid], format='jd', scale='utc').datetime64
+        result[column] = values
+    return result
+
+def compute_night_events_table(start_date, end_date, observer_location):
+    """
+    Calcula os eventos noturnos de todas as datas de um intervalo de uma só vez.
+
+    A altitude do Sol é avaliada numa única grade densa que cobre todo o intervalo, e
+    todas as travessias (pôr/nascer do sol e crepúsculos astronômicos) e meias-noites
+    são encontradas e refinadas vetorialmente, em vez de uma busca por dia.
+
+    A noite de uma data começa no fim da tarde desse dia: os eventos são os primeiros
+    após o meio-dia solar médio local, a mesma âncora de `calculate_nightly_events`, de
+    modo que os dois caminhos gravam a mesma noite no almanaque em qualquer longitude.
+
+    Retorna um DataFrame indexado por data com as colunas de `calculate_nightly_events`
+    ('por_do_sol', 'inicio_noite', 'meia_noite_real', 'fim_noite', 'nascer_do_sol') em
+    UTC (NaT quando o evento não ocorre, p. ex. sem noite astronômica).
+    """
+    return _jd_matrix_to_table(*_compute_night_events_jd(start_date, end_date, observer_location))
+
+def get_night_events_table(start_date, end_date, observer_location, observer_timezone=None, almanac=None):
+    """
+    Igual a `compute_night_events_table`, mas consultando o almanaque do local primeiro.
+
+    Só as datas que faltarem no almanaque são calculadas (numa única passada vetorial
+    sobre o trecho faltante) e o resultado é guardado para as próximas consultas.
+    """
+    almanac = almanac if almanac is not None else get_default_almanac()
+    n_days = (end_date - start_date).days + 1
+    dates = [start_date + timedelta(days=offset) for offset in range(n_days)]
+    keys = [almanac_key(day, observer_location, observer_timezone) for day in dates]
+    values = [almanac.get(key) for key in keys]
+
+    missing = [index for index, value in enumerate(values) if value is None]
+    instrumentation.count('almanac_hits', n_days - len(missing))
+    instrumentation.count('almanac_misses', len(missing))
+    if missing:
+        first, last = missing[0], missing[-1]
+        with np.errstate(all='ignore'):
+            _, computed = _compute_night_events_jd(dates[first], dates[last], observer_location)
+        almanac.put_many(zip(keys[first:last + 1], computed))
+        values[first:last + 1] = [tuple(row) for row in computed]
+
+    return _jd_matrix_to_table(pd.date_range(start=start_date, periods=n_days, freq='D'), values)
+
+def precompute_almanac(start_year, end_year, observer_location, observer_timezone=None, almanac=None):
+    """
+    Preenche o almanaque do local com todas as noites dos anos start_year..end_year
+    (inclusive). Retorna o número de noites disponíveis no intervalo.
+    """
+    total = 0
+    for year in range(start_year, end_year + 1):
+        table = get_night_events_table(date(year, 1, 1), date(year, 12, 31), observer_location,
+                                       observer_timezone, almanac)
+        total += len(table)
+    return total
+
+def _night_sample_grid(nights):
+    """
+    Grade concatenada de todas as noites: começa no início de cada noite e avança em
+    passos de `NIGHT_GRID_FREQ` até o fim. Retorna (inícios, fins, noite de cada
+    amostra, primeira amostra de cada noite, instantes das amostras).
+    """
+    step = pd.Timedelta(NIGHT_GRID_FREQ).to_timedelta64()
+    starts = nights['inicio_noite'].to_numpy(dtype='datetime64[us]')
+    ends = nights['fim_noite'].to_numpy(dtype='datetime64[us]')
+    n_samples = ((ends - starts) // step).astype(int) + 1
+
+    night_id = np.repeat(np.arange(len(nights)), n_samples)
+    night_start = np.cumsum(n_samples) - n_samples
+    offsets = np.arange(n_samples.sum()) - np.repeat(night_start, n_samples)
+    return starts, ends, night_id, night_start, starts[night_id] + offsets * step
+
+def _nightly_first_last(above, night_start):
+    """
+    Primeira e última amostra acima do limiar em cada noite (último eixo de `above`),
+    com -1 em `last` nas noites sem nenhuma. Vale para um alvo ou para matrizes de
+    alvos (e de limiares), com uma redução por noite.
+    """
+    index = np.arange(above.shape[-1])
+    first = np.minimum.reduceat(np.where(above, index, above.shape[-1]), night_start, axis=-1)
+    last = np.maximum.reduceat(np.where(above, index, -1), night_start, axis=-1)
+    return first, last
+
+def _nightly_windows_frame(nights, sample_times, first, last, columns, moon_columns=None):
+    """
+    DataFrame de `analyze_visibility_over_dates` a partir da primeira/última amostra de cada noite.
+    """
+    visible_nights = np.nonzero(last >= 0)[0]
+    if visible_nights.size == 0:
+        return pd.DataFrame(columns=columns)
+    start_times = pd.DatetimeIndex(sample_times[first[visible_nights]])
+    end_times = pd.DatetimeIndex(sample_times[last[visible_nights]])
+
+    data = {
+        'date': nights.index[visible_nights],
+        'start_time': start_times,
+        'end_time': end_times,
+        'duration_hours': (end_times - start_times).total_seconds() / 3600.0,
+    }
+    for column, values in (moon_columns or {}).items():
+        data[column] = values[visible_nights]
+    return pd.DataFrame(data, columns=columns)
+
+def _nightly_moon_layer(starts, ends, sample_times, night_id, observer_location):
+    """
+    Lua das análises de muitas noites: uma posição por noite (no meio da noite) e a
+    altitude da Lua em cada amostra. Retorna (Lua por noite, meios das noites, altitude).
+    """
+    midpoints = starts + (ends - starts) // 2
+    moon = compute_nightly_moon(midpoints)
+    moon_altitude, _ = fast_altaz_track(
+        moon['ra'][night_id], moon['dec'][night_id], times_to_jd(sample_times),
+        observer_location.lat.deg, observer_location.lon.deg, observer_location.height.to_value(u.km),
+        moon['distance'][night_id],
+    )
+    return moon, midpoints, moon_altitude
+
+def _nightly_moon_separation(target_coord, moon, midpoints):
+    """
+    Separação geocêntrica alvo-Lua (graus) em cada noite; um SkyCoord vetorial dá uma
+    matriz alvos x noites.
+    """
+    if is_moving_target(target_coord):
+        target_ra, target_dec, _ = xyz_to_radec(target_coord.gcrs_xyz(Time(midpoints)))
+    else:
+        icrs = target_coord.icrs
+        target_ra, target_dec = np.asarray(icrs.ra.deg)[..., np.newaxis], np.asarray(icrs.dec.deg)[..., np.newaxis]
+    return angular_separation(target_ra, target_dec, moon['ra'], moon['dec'])
+
+def _nightly_moon_clearance(starts, ends, sample_times, night_id, observer_location, target_coord,
+                            min_moon_separation):
+    """
+    Camada lunar de um alvo em muitas noites (ver `_nightly_moon_layer`).
+
+    Retorna (máscara das amostras livres da Lua, iluminação por noite, separação por noite).
+    """
+    moon, midpoints, moon_altitude = _nightly_moon_layer(starts, ends, sample_times, night_id,
+                                                         observer_location)
+    separation = _nightly_moon_separation(target_coord, moon, midpoints).reshape(-1)
+    clear = moon_avoidance_mask(separation[night_id], moon_altitude, min_moon_separation.to_value(u.deg))
+    return clear, moon['illumination'], separation
+
+def _evaluate_target_on_nights(night_events, observer_location, target_coord, min_altitude,
+                               min_moon_separation=None):
+    """
+    Avalia um alvo nas grades de todas as noites concatenadas, numa única transformação.
+
+    As grades seguem a de `analyze_target_visibility_for_night`: começam no início da
+    noite e avançam em passos de 5 minutos até o fim da noite. Com `min_moon_separation`
+    as amostras com a Lua acima do horizonte e próxima do alvo são descartadas e o
+    resultado ganha as colunas 'moon_illumination' (%) e 'moon_separation' (graus).
+    """
+    columns = ['date', 'start_time', 'end_time', 'duration_hours']
+    if min_moon_separation is not None:
+        columns += ['moon_illumination', 'moon_separation']
+    nights = night_events.dropna(subset=['inicio_noite', 'fim_noite'])
+    nights = nights[nights['inicio_noite'] < nights['fim_noite']]
+    if nights.empty:
+        return pd.DataFrame(columns=columns)
+    if not is_moving_target(target_coord):
+        span = nights['inicio_noite'].iloc[[0, -1]]
+        if not _reachable(target_coord, observer_location, min_altitude.to_value(u.deg), span)[0]:
+            return pd.DataFrame(columns=columns)
+
+    starts, ends, night_id, night_start, sample_times = _night_sample_grid(nights)
+    if is_moving_target(target_coord):
+        altitude = target_coord.altaz(Time(sample_times), observer_location)[0]
+        instrumentation.count('ephemeris_altaz')
+    else:
+        frame = AltAz(obstime=Time(sample_times), location=observer_location)
+        with instrumentation.span('altaz_transform', accuracy='exact', points=sample_times.size):
+            altitude = target_coord.transform_to(frame).alt.deg
+        instrumentation.count('altaz_transforms')
+        instrumentation.count('altaz_points', sample_times.size)
+
+    above = altitude >= min_altitude.to_value(u.deg)
+    moon_columns = None
+    if min_moon_separation is not None:
+        clear, illumination, separation = _nightly_moon_clearance(
+            starts, ends, sample_times, night_id, observer_location, target_coord, min_moon_separation)
+        above &= clear
+        moon_columns = {'moon_illumination': illumination * 100, 'moon_separation': separation}
+
+    first, last = _nightly_first_last(above, night_start)
+    return _nightly_windows_frame(nights, sample_times, first, last, columns, moon_columns)
+
+def _analyze_dates_with_observer(start_date, end_date, observer_location, observer_timezone, target_coord, min_altitude):
+    """
+    Caminho original: uma busca de eventos com o Observer do astroplan e uma
+    transformação por noite.
+    """
+    from tqdm.auto import tqdm
+
+    results = []
+    for day_offset in tqdm(range((end_date - start_date).days + 1), desc=f"Analisando {start_date.year}", unit="dia"):
         current_date = start_date + timedelta(days=day_offset)
         with np.errstate(all='ignore'):
-            night_events = calculate_nightly_events(current_date, observer_location, observer_timezone)
+            night_events = calculate_nightly_events(current_date, observer_location, observer_timezone,
+                                                    use_almanac=False)
 
         if not night_events or not night_events.get("inicio_noite") or not night_events.get("fim_noite"): continue
         start_night, end_night = night_events["inicio_noite"], night_events["fim_noite"]
@@ -133,4 +1020,47 @@ def analyze_year_visibility(year, observer_location, observer_timezone, target_c
             })
     return pd.DataFrame(results)
 
-print("Módulo de Análise (src/analysis.py) carregado e aprimorado.")
+@instrumentation.instrumented()
+def analyze_visibility_over_dates(start_date, end_date, observer_location, observer_timezone, target_coord,
+                                  min_altitude, engine='vectorized', min_moon_separation=None):
+    """
+    Analisa a visibilidade de um alvo para cada noite de um intervalo de datas (inclusivo).
+
+    engine='vectorized' (padrão) calcula todos os crepúsculos numa única grade do Sol e
+    avalia o alvo em todas as noites numa única transformação (ver
+    `compute_night_events_table`). engine='observer' usa o caminho original, dia a dia.
+
+    `target_coord` pode ser um SkyCoord fixo, uma efeméride (`src/ephemeris.py`) ou o nome
+    de um corpo do Sistema Solar; nesse caso a efeméride do período é montada uma única vez.
+
+    Retorna um DataFrame com as colunas 'date', 'start_time', 'end_time' e 'duration_hours'.
+    Com `min_moon_separation` (só no engine vetorizado) as noites são filtradas também
+    pela distância à Lua, calculada uma vez por noite (ver `_evaluate_target_on_nights`).
+    """
+    if isinstance(target_coord, str):
+        span = Time([start_date.isoformat(), (end_date + timedelta(days=2)).isoformat()], scale='utc')
+        target_coord = get_body_ephemeris(target_coord, span[0], span[1])
+
+    if engine == 'observer':
+        if min_moon_separation is not None:
+            raise ValueError("min_moon_separation só está disponível com engine='vectorized'.")
+        return _analyze_dates_with_observer(start_date, end_date, observer_location, observer_timezone,
+                                            target_coord, min_altitude)
+    if engine != 'vectorized':
+        raise ValueError(f"Engine desconhecido: '{engine}'. Use 'vectorized' ou 'observer'.")
+
+    night_events = get_night_events_table(start_date, end_date, observer_location, observer_timezone)
+    return _evaluate_target_on_nights(night_events, observer_location, target_coord, min_altitude,
+                                      min_moon_separation)
+
+def analyze_year_visibility(year, observer_location, observer_timezone, target_coord, min_altitude,
+                            engine='vectorized', min_moon_separation=None):
+    """
+    Analisa a visibilidade de um alvo para cada noite de um ano inteiro.
+
+    Para avaliar o mesmo ano em várias elevações mínimas, `compute_altitude_curves`
+    (`src/curves.py`) calcula as curvas uma vez e refaz só o limiar.
+    """
+    return analyze_visibility_over_dates(date(year, 1, 1), date(year, 12, 31), observer_location,
+                                         observer_timezone, target_coord, min_altitude, engine=engine,
+                                         min_moon_separation=min_moon_separation)
@@ -0,0 +1,354 @@
+# src/benchmark.py
+
+"""
+Módulo de Benchmarks.
+
+Mede, em vários tamanhos, os caminhos mais pesados do projeto — eventos noturnos,
+visibilidade de uma noite (1 a 10 mil alvos), calendário anual, resolução de nomes
+e os três gráficos principais — sempre com o mesmo local, as mesmas datas e alvos
+sintéticos de semente fixa, sem acesso à rede (o SIMBAD é substituído por um
+stand-in local e o fallback `SkyCoord.from_name` por uma função que falha).
+
+Cada caso roda `BENCHMARK_REPEATS` vezes por tamanho, após um aquecimento, e guarda
+o melhor tempo e a mediana. Os resultados são gravados em JSON e comparados com uma
+linha de base: um caso é regressão quando o melhor tempo fica mais de `tolerance_pct`
+por cento (e mais de `BENCHMARK_MIN_SECONDS`) acima do da linha de base.
+
+Uso:
+    python -m src.benchmark                       # compara com benchmarks/baseline.json
+    python -m src.benchmark --quick               # só os tamanhos menores
+    python -m src.benchmark --output resultados.json --tolerance 30
+    python -m src.benchmark --update-baseline     # grava a linha de base desta máquina
+
+A linha de base depende da máquina; gere a sua com `--update-baseline` antes de comparar.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+BENCHMARK_REPEATS = 3
+BENCHMARK_TOLERANCE_PCT = 25.0
+# Diferenças absolutas menores que isto são ruído de medição e nunca contam como regressão.
+BENCHMARK_MIN_SECONDS = 0.01
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             'benchmarks', 'baseline.json')
+
+# Local, datas e semente fixos: São Paulo, equinócio de março de 2024.
+BENCHMARK_SITE = {'lat_deg': -23.55, 'lon_deg': -46.63, 'height_m': 760.0, 'timezone': 'America/Sao_Paulo'}
+BENCHMARK_DATE = date(2024, 3, 20)
+BENCHMARK_SEED = 2024
+
+BenchmarkCase = namedtuple('BenchmarkCase', ['name', 'sizes', 'quick_sizes', 'setup', 'run'])
+
+def _site():
+    import pytz
+    from astropy import units as u
+    from astropy.coordinates import EarthLocation
+
+    location = EarthLocation(lat=BENCHMARK_SITE['lat_deg'] * u.deg, lon=BENCHMARK_SITE['lon_deg'] * u.deg,
+                             height=BENCHMARK_SITE['height_m'] * u.m)
+    return location, pytz.timezone(BENCHMARK_SITE['timezone'])
+
+def _random_targets(size):
+    """Alvos sintéticos uniformes na esfera, em colunas (nomes, RA, Dec)."""
+    rng = np.random.default_rng(BENCHMARK_SEED)
+    return ([f"Alvo {i}" for i in range(size)], rng.uniform(0, 360, size),
+            np.degrees(np.arcsin(rng.uniform(-1, 1, size))))
+
+def _night():
+    from .analysis import calculate_nightly_events
+
+    location, timezone = _site()
+    events = calculate_nightly_events(BENCHMARK_DATE, location, timezone, use_almanac=False)
+    return location, timezone, events['inicio_noite'], events['fim_noite']
+
+def _sirius():
+    from astropy import units as u
+    from astropy.coordinates import SkyCoord
+
+    return SkyCoord(ra=101.2872 * u.deg, dec=-16.7161 * u.deg)
+
+@contextlib.contextmanager
+def _fresh_almanac():
+    """Almanaque vazio durante o caso, para medir o cálculo dos crepúsculos e não o cache."""
+    from .almanac import AlmanacCache, get_default_almanac, set_default_almanac
+
+    previous = get_default_almanac()
+    set_default_almanac(AlmanacCache())
+    try:
+        yield
+    finally:
+        set_default_almanac(previous)
+
+# --- Casos ---
+
+def _setup_nightly_events(size):
+    location, timezone = _site()
+    return location, timezone, [BENCHMARK_DATE + timedelta(days=offset) for offset in range(size)]
+
+def _run_nightly_events(state):
+    from .analysis import calculate_nightly_events
+
+    location, timezone, dates = state
+    for day in dates:
+        calculate_nightly_events(day, location, timezone, use_almanac=False)
+
+def _setup_single_night(size):
+    location, _, start, end = _night()
+    return start, end, location, _sirius()
+
+def _run_single_night(state):
+    from astropy import units as u
+    from .analysis import analyze_target_visibility_for_night
+
+    start, end, location, target = state
+    analyze_target_visibility_for_night(start, end, location, target, 30 * u.deg)
+
+def _setup_many_targets(size):
+    location, _, start, end = _night()
+    return start, end, location, _random_targets(size)
+
+def _run_many_targets(state):
+    from astropy import units as u
+    from .analysis import analyze_targets_visibility_for_night
+
+    start, end, location, targets = state
+    analyze_targets_visibility_for_night(start, end, location, targets, 30 * u.deg)
+
+def _setup_over_dates(size):
+    location, timezone = _site()
+    return location, timezone, date(2024, 1, 1), date(2024, 1, 1) + timedelta(days=size - 1)
+
+def _run_over_dates(state):
+    from astropy import units as u
+    from .analysis import analyze_visibility_over_dates
+
+    location, timezone, start, end = state
+    with _fresh_almanac():
+        analyze_visibility_over_dates(start, end, location, timezone, _sirius(), 30 * u.deg)
+
+class StandInSimbad:
+    """
+    Substituto local do `astroquery.simbad.Simbad`: `query_objects` devolve uma tabela
+    como a do SIMBAD, com coordenadas determinísticas para qualquer nome.
+    """
+
+    def query_objects(self, names):
+        from astropy.table import Table
+
+        names = list(names)
+        index = np.arange(len(names))
+        return Table({
+            'main_id': names,
+            'ra': (index * 7.31) % 360.0,
+            'dec': ((index * 3.17) % 180.0) - 90.0,
+            'user_specified_id': names,
+        })
+
+def _no_network_fallback(name):
+    raise ValueError(f"benchmark sem rede: {name}")
+
+def _setup_resolution(size):
+    return [f"Alvo Benchmark {i:05d}" for i in range(size)]
+
+def _run_resolution(names):
+    from .resolver import TargetCache
+    from .targets import get_target_skycoords
+
+    # Cache novo a cada repetição: todos os nomes passam pela consulta em lote.
+    with tempfile.TemporaryDirectory() as directory, contextlib.redirect_stdout(io.StringIO()):
+        cache = TargetCache(os.path.join(directory, 'benchmark.sqlite'))
+        get_target_skycoords(names, cache=cache, simbad=StandInSimbad(), fallback=_no_network_fallback)
+        cache.close()
+
+def _setup_target_plot(size):
+    from astropy import units as u
+    from .analysis import analyze_target_visibility_for_night
+
+    location, _, start, end = _night()
+    return analyze_target_visibility_for_night(start, end, location, _sirius(), 30 * u.deg)
+
+def _run_target_plot(df_visible):
+    from .plotting import plot_target_visibility
+    from .render import figure_to_png
+
+    figure_to_png(plot_target_visibility(df_visible, 'Sirius', BENCHMARK_DATE, 30))
+
+def _setup_sky_map(size):
+    from .analysis import compute_sky_positions
+
+    location, _, start, _ = _night()
+    return location, start, compute_sky_positions(_random_targets(size), location, start)
+
+def _run_sky_map(state):
+    from .plotting import plot_sky_map
+    from .render import figure_to_png
+
+    location, start, positions = state
+    figure_to_png(plot_sky_map(None, location, start, positions=positions))
+
+def _setup_yearly_plot(size):
+    from astropy import units as u
+    from .analysis import analyze_year_visibility
+
+    location, timezone = _site()
+    return analyze_year_visibility(2024, location, timezone, _sirius(), 30 * u.deg)
+
+def _run_yearly_plot(df_year):
+    from .plotting import plot_yearly_visibility
+    from .render import figure_to_png
+
+    figure_to_png(plot_yearly_visibility(df_year, 'Sirius', 2024))
+
+BENCHMARK_CASES = [
+    BenchmarkCase('calculate_nightly_events', [1, 7], [1], _setup_nightly_events, _run_nightly_events),
+    BenchmarkCase('analyze_target_visibility_for_night', [1], [1], _setup_single_night, _run_single_night),
+    BenchmarkCase('analyze_targets_visibility_for_night', [1, 100, 1000, 10000], [1, 100],
+                  _setup_many_targets, _run_many_targets),
+    # 366 noites = `analyze_year_visibility` de 2024.
+    BenchmarkCase('analyze_visibility_over_dates', [31, 366], [31], _setup_over_dates, _run_over_dates),
+    BenchmarkCase('get_target_skycoords', [10, 100, 1000], [10, 100], _setup_resolution, _run_resolution),
+    BenchmarkCase('plot_target_visibility', [1], [1], _setup_target_plot, _run_target_plot),
+    BenchmarkCase('plot_sky_map', [100, 10000], [100], _setup_sky_map, _run_sky_map),
+    BenchmarkCase('plot_yearly_visibility', [1], [1], _setup_yearly_plot, _run_yearly_plot),
+]
+
+# --- Execução e comparação ---
+
+def time_case(case, size, repeats=BENCHMARK_REPEATS):
+    """
+    Executa um caso num tamanho: `setup` uma vez e uma execução de aquecimento (imports
+    preguiçosos, efemérides), ambos fora da medição, e então `run` `repeats` vezes.
+    Retorna um dicionário com 'best_s', 'median_s' e 'repeats'.
+    """
+    state = case.setup(size)
+    case.run(state)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        case.run(state)
+        timings.append(time.perf_counter() - start)
+    return {'best_s': min(timings), 'median_s': statistics.median(timings), 'repeats': repeats}
+
+def _environment():
+    import astropy
+    import pandas as pd
+
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'astropy': astropy.__version__,
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+        'created': datetime.now().isoformat(timespec='seconds'),
+    }
+
+def run_benchmarks(cases=None, quick=False, repeats=BENCHMARK_REPEATS, progress=None):
+    """
+    Roda os casos (todos, por padrão; ou só os nomes em `cases`) e devolve o resultado
+    no formato gravado em JSON: {'environment': {...}, 'results': {caso: {tamanho: {...}}}}.
+
+    `progress(caso, tamanho, medição)` é chamado após cada medição.
+    """
+    selected = [case for case in BENCHMARK_CASES if cases is None or case.name in cases]
+    unknown = set(cases or ()) - {case.name for case in BENCHMARK_CASES}
+    if unknown:
+        raise ValueError(f"Casos desconhecidos: {sorted(unknown)}.")
+
+    results = {}
+    for case in selected:
+        results[case.name] = {}
+        for size in (case.quick_sizes if quick else case.sizes):
+            measurement = time_case(case, size, repeats)
+            results[case.name][str(size)] = measurement
+            if progress:
+                progress(case.name, size, measurement)
+    return {'environment': _environment(), 'results': results}
+
+def save_results(results, path):
+    """Grava os resultados (ou uma linha de base) em JSON."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(results, handle, indent=2, ensure_ascii=False)
+        handle.write('\n')
+    return path
+
+def load_results(path):
+    """Lê resultados gravados por `save_results`."""
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)
+
+def compare_to_baseline(results, baseline, tolerance_pct=BENCHMARK_TOLERANCE_PCT,
+                        min_seconds=BENCHMARK_MIN_SECONDS):
+    """
+    Compara os melhores tempos com os da linha de base, caso a caso e tamanho a tamanho.
+
+    Retorna um DataFrame com 'case', 'size', 'baseline_s', 'current_s', 'change_pct' e
+    'regression'; casos que não existem nos dois lados ficam de fora.
+    """
+    import pandas as pd
+
+    rows = []
+    for name, sizes in results['results'].items():
+        for size, measurement in sizes.items():
+            reference = baseline.get('results', {}).get(name, {}).get(size)
+            if reference is None:
+                continue
+            current, before = measurement['best_s'], reference['best_s']
+            change = (current / before - 1.0) * 100.0 if before > 0 else 0.0
+            rows.append((name, int(size), before, current, change,
+                         change > tolerance_pct and current - before > min_seconds))
+    return pd.DataFrame(rows, columns=['case', 'size', 'baseline_s', 'current_s', 'change_pct', 'regression'])
+
+def main(argv=None):
+    """
+    Linha de comando; retorna 1 se houver regressão em relação à linha de base, senão 0.
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks offline do Analisador Astronômico.")
+    parser.add_argument('--quick', action='store_true', help="só os tamanhos menores de cada caso")
+    parser.add_argument('--case', action='append', dest='cases', help="roda só este caso (pode repetir)")
+    parser.add_argument('--repeats', type=int, default=BENCHMARK_REPEATS)
+    parser.add_argument('--output', help="grava os resultados neste JSON")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="linha de base para a comparação")
+    parser.add_argument('--tolerance', type=float, default=BENCHMARK_TOLERANCE_PCT,
+                        help="regressão máxima aceita, em %% do melhor tempo da linha de base")
+    parser.add_argument('--update-baseline', action='store_true', help="grava os resultados como linha de base")
+    args = parser.parse_args(argv)
+
+    def progress(name, size, measurement):
+        print(f"{name:<40} {size:>6}  melhor {measurement['best_s']:8.3f} s  "
+              f"mediana {measurement['median_s']:8.3f} s")
+
+    results = run_benchmarks(args.cases, args.quick, args.repeats, progress)
+    if args.output:
+        save_results(results, args.output)
+    if args.update_baseline:
+        save_results(results, args.baseline)
+        print(f"Linha de base gravada em {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"  AVISO: linha de base {args.baseline} não encontrada; nada a comparar.")
+        return 0
+
+    comparison = compare_to_baseline(results, load_results(args.baseline), args.tolerance)
+    for row in comparison.itertuples():
+        flag = 'REGRESSÃO' if row.regression else 'ok'
+        print(f"{row.case:<40} {row.size:>6}  {row.baseline_s:8.3f} s -> {row.current_s:8.3f} s "
+              f"({row.change_pct:+6.1f}%)  {flag}")
+    return 1 if comparison['regression'].any() else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,310 @@
+# src/catalog.py
+
+"""
+Módulo de Catálogo de Alvos.
+
+Guarda uma lista de alvos fixos em arrays NumPy (nomes, RA, Dec, magnitude e tipo)
+em vez de um dicionário de SkyCoords individuais, o que torna barato montar,
+fatiar e transformar listas grandes:
+    - `TargetCatalog.to_skycoord()` devolve um único SkyCoord vetorial (calculado uma vez)
+      e `sky_index()` o índice espacial do catálogo (`src/skyindex.py`);
+    - o catálogo entra direto nas funções de análise e de gráficos que aceitam vários
+      alvos (`analyze_targets_visibility_for_night`, `compute_sky_positions`,
+      `plot_sky_map`, `src/sites.py`, `src/scheduler.py`);
+    - arquivos grandes (CSV, FITS ou uma lista de nomes em .txt) são lidos em blocos
+      de `CATALOG_CHUNK_ROWS` linhas (`read_target_chunks`), sem carregar a tabela
+      inteira de uma vez.
+
+Como também expõe `keys()` e `catalog[nome]`, o catálogo pode ser misturado a um
+dicionário de alvos com `dict.update`.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+from astropy import units as u
+from astropy.coordinates import Angle, SkyCoord
+
+from .skyindex import SkyIndex
+
+CATALOG_CHUNK_ROWS = 100_000
+CATALOG_COLUMNS = ['name', 'ra_deg', 'dec_deg', 'magnitude', 'type']
+
+# Nomes de coluna aceitos nos arquivos (comparados em minúsculas), por ordem de preferência.
+COLUMN_ALIASES = {
+    'name': ('name', 'nome', 'alvo', 'target', 'main_id', 'object', 'id'),
+    'ra_deg': ('ra_deg', 'ra', 'raj2000', 'ra_icrs', '_raj2000'),
+    'dec_deg': ('dec_deg', 'dec', 'dej2000', 'decj2000', 'de_icrs', '_dej2000'),
+    'magnitude': ('magnitude', 'mag', 'vmag', 'flux_v', 'v'),
+    'type': ('type', 'tipo', 'otype', 'kind'),
+}
+
+FITS_EXTENSIONS = ('.fits', '.fit', '.fts', '.fits.gz', '.fit.gz')
+
+class TargetCatalog:
+    """
+    Catálogo de alvos fixos (ICRS) em arrays NumPy de mesmo tamanho.
+
+    `magnitude` ausente vira NaN e `kind` ausente vira ''. Índices inteiros, fatias e
+    máscaras booleanas devolvem um novo catálogo; um nome devolve o SkyCoord do alvo.
+    """
+
+    def __init__(self, names, ra_deg, dec_deg, magnitude=None, kind=None):
+        self.names = np.asarray(names, dtype=object).reshape(-1)
+        self.ra_deg = np.mod(np.asarray(ra_deg, dtype=float).reshape(-1), 360.0)
+        self.dec_deg = np.asarray(dec_deg, dtype=float).reshape(-1)
+        size = self.names.size
+        self.magnitude = (np.full(size, np.nan) if magnitude is None
+                          else np.asarray(magnitude, dtype=float).reshape(-1))
+        self.kind = (np.full(size, '', dtype=object) if kind is None
+                     else np.asarray(kind, dtype=object).reshape(-1))
+
+        if not (size == self.ra_deg.size == self.dec_deg.size == self.magnitude.size == self.kind.size):
+            raise ValueError("Os arrays de nomes, RA, Dec, magnitude e tipo devem ter o mesmo tamanho.")
+        if not (np.isfinite(self.ra_deg).all() and np.isfinite(self.dec_deg).all()):
+            raise ValueError("O catálogo só aceita alvos com RA e Dec definidos.")
+        if np.abs(self.dec_deg).max(initial=0.0) > 90.0:
+            raise ValueError("Dec deve estar entre -90 e +90 graus.")
+        self._coord = None
+        self._index = None
+        self._rows = None
+
+    def __len__(self):
+        return self.names.size
+
+    def __repr__(self):
+        return f"<TargetCatalog com {len(self)} alvos>"
+
+    def _row_of(self):
+        if self._rows is None:
+            self._rows = {}
+            for row, name in enumerate(self.names):
+                self._rows.setdefault(name, row)
+        return self._rows
+
+    def __contains__(self, name):
+        return name in self._row_of()
+
+    def keys(self):
+        """
+        Nomes dos alvos, em ordem (permite `dict.update(catalogo)`).
+        """
+        return self.names.tolist()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            row = self._row_of()[key]
+            return SkyCoord(ra=self.ra_deg[row] * u.deg, dec=self.dec_deg[row] * u.deg, frame='icrs')
+        if np.ndim(key) == 0 and not isinstance(key, slice):
+            key = [key]
+        return TargetCatalog(self.names[key], self.ra_deg[key], self.dec_deg[key],
+                             self.magnitude[key], self.kind[key])
+
+    def items(self):
+        """
+        Pares (nome, SkyCoord escalar), criados sob demanda.
+        """
+        for row, name in enumerate(self.names):
+            yield name, SkyCoord(ra=self.ra_deg[row] * u.deg, dec=self.dec_deg[row] * u.deg, frame='icrs')
+
+    def to_skycoord(self):
+        """
+        Todos os alvos num único SkyCoord vetorial (ICRS), guardado após a primeira chamada.
+        """
+        if self._coord is None:
+            self._coord = SkyCoord(ra=self.ra_deg * u.deg, dec=self.dec_deg * u.deg, frame='icrs')
+        return self._coord
+
+    def sky_index(self):
+        """
+        Índice espacial (`SkyIndex`) do catálogo, montado na primeira chamada.
+        """
+        if self._index is None:
+            self._index = SkyIndex(self.ra_deg, self.dec_deg)
+        return self._index
+
+    def to_frame(self):
+        """
+        DataFrame com as colunas de CATALOG_COLUMNS.
+        """
+        return pd.DataFrame({'name': self.names, 'ra_deg': self.ra_deg, 'dec_deg': self.dec_deg,
+                             'magnitude': self.magnitude, 'type': self.kind}, columns=CATALOG_COLUMNS)
+
+    @classmethod
+    def from_frame(cls, frame):
+        """
+        Cria um catálogo a partir de um DataFrame com as colunas de CATALOG_COLUMNS
+        (as opcionais podem faltar).
+        """
+        return cls(frame['name'].to_numpy(dtype=object), frame['ra_deg'].to_numpy(dtype=float),
+                   frame['dec_deg'].to_numpy(dtype=float),
+                   frame['magnitude'].to_numpy(dtype=float) if 'magnitude' in frame else None,
+                   frame['type'].to_numpy(dtype=object) if 'type' in frame else None)
+
+    @classmethod
+    def from_skycoords(cls, targets):
+        """
+        Cria um catálogo a partir de um dicionário nome -> SkyCoord (formato de
+        `get_target_skycoords`); entradas None e alvos em movimento são ignorados.
+        """
+        from .ephemeris import is_moving_target
+
+        names, ras, decs = [], [], []
+        for name, coord in targets.items():
+            if coord is None or is_moving_target(coord):
+                continue
+            icrs = coord.icrs
+            names.append(name)
+            ras.append(icrs.ra.deg)
+            decs.append(icrs.dec.deg)
+        return cls(names, ras, decs)
+
+    @classmethod
+    def concatenate(cls, catalogs):
+        """
+        Junta vários catálogos, na ordem dada.
+        """
+        catalogs = list(catalogs)
+        if not catalogs:
+            return cls([], [], [])
+        return cls(np.concatenate([c.names for c in catalogs]), np.concatenate([c.ra_deg for c in catalogs]),
+                   np.concatenate([c.dec_deg for c in catalogs]),
+                   np.concatenate([c.magnitude for c in catalogs]), np.concatenate([c.kind for c in catalogs]))
+
+    @classmethod
+    def from_file(cls, path, chunk_rows=CATALOG_CHUNK_ROWS, resolver=None):
+        """
+        Lê um catálogo de um arquivo CSV, FITS ou .txt, bloco a bloco (ver `read_target_chunks`).
+
+        Linhas só com o nome (sem RA/Dec, como numa lista de nomes) são passadas em lote
+        para `resolver(nomes) -> {nome: (ra_graus, dec_graus)}`; sem `resolver`, ou se o
+        nome não for resolvido, a linha é descartada com um aviso. Use
+        `src.targets.load_target_catalog` para resolver os nomes como `get_target_skycoords`.
+        """
+        chunks, unresolved = [], 0
+        for frame in read_target_chunks(path, chunk_rows):
+            missing = ~(np.isfinite(frame['ra_deg']) & np.isfinite(frame['dec_deg']))
+            if missing.any() and resolver is not None:
+                found = resolver(list(dict.fromkeys(frame.loc[missing, 'name'])))
+                radec = frame.loc[missing, 'name'].map(found)
+                known = radec.notna()
+                frame.loc[radec.index[known], 'ra_deg'] = [ra for ra, _ in radec[known]]
+                frame.loc[radec.index[known], 'dec_deg'] = [dec for _, dec in radec[known]]
+                missing = ~(np.isfinite(frame['ra_deg']) & np.isfinite(frame['dec_deg']))
+            unresolved += int(missing.sum())
+            chunks.append(cls.from_frame(frame[~missing]))
+        if unresolved:
+            print(f"  AVISO: {unresolved} alvos de '{path}' ficaram sem coordenadas e foram ignorados.")
+        return cls.concatenate(chunks)
+
+def _pick_column(columns, field):
+    """
+    Nome original da primeira coluna que corresponde a um campo de CATALOG_COLUMNS, ou None.
+    """
+    lower = {str(column).strip().lower(): column for column in columns}
+    for alias in COLUMN_ALIASES[field]:
+        if alias in lower:
+            return lower[alias]
+    return None
+
+def _angles_to_degrees(values, unit):
+    """
+    Converte uma coluna de RA/Dec para graus: números já são graus; textos sexagesimais
+    ("05 35 17.3", "5h35m17s") são interpretados em `unit`. Vazios viram NaN.
+    """
+    values = np.asarray(values)
+    if values.dtype.kind in 'iuf':
+        return values.astype(float)
+    values = pd.Series(values, dtype=object)
+    numeric = pd.to_numeric(values, errors='coerce').to_numpy(dtype=float, copy=True)
+    text = values.notna() & np.isnan(numeric) & (values.astype(str).str.strip() != '')
+    if text.any():
+        numeric[text.to_numpy()] = Angle(values[text].astype(str).str.strip().tolist(), unit=unit).deg
+    return numeric
+
+def _standardize(frame, columns):
+    """
+    Leva um bloco lido do arquivo para as colunas de CATALOG_COLUMNS.
+    """
+    names = frame[columns['name']] if columns['name'] is not None else pd.Series([''] * len(frame))
+    out = pd.DataFrame({'name': names.astype(str).str.strip().to_numpy(dtype=object)})
+    out['ra_deg'] = (_angles_to_degrees(frame[columns['ra_deg']].to_numpy(), u.hourangle)
+                     if columns['ra_deg'] is not None else np.nan)
+    out['dec_deg'] = (_angles_to_degrees(frame[columns['dec_deg']].to_numpy(), u.deg)
+                      if columns['dec_deg'] is not None else np.nan)
+    out['magnitude'] = (pd.to_numeric(frame[columns['magnitude']], errors='coerce').to_numpy(dtype=float)
+                        if columns['magnitude'] is not None else np.nan)
+    out['type'] = (frame[columns['type']].fillna('').astype(str).str.strip().to_numpy(dtype=object)
+                   if columns['type'] is not None else '')
+    return out[out['name'] != ''].reset_index(drop=True)
+
+def _csv_chunks(path, chunk_rows):
+    options = dict(comment='#', skipinitialspace=True)
+    header = pd.read_csv(path, nrows=0, **options).columns
+    columns = {field: _pick_column(header, field) for field in CATALOG_COLUMNS}
+    if columns['name'] is None:
+        raise ValueError(f"'{path}' não tem uma coluna de nomes ({', '.join(COLUMN_ALIASES['name'])}).")
+    # Só nomes e tipos são lidos como texto; RA/Dec numéricos saem direto do parser em C.
+    text = {columns[field]: str for field in ('name', 'type') if columns[field] is not None}
+    wanted = [column for column in columns.values() if column is not None]
+    for frame in pd.read_csv(path, chunksize=chunk_rows, usecols=wanted, dtype=text, **options):
+        yield _standardize(frame, columns)
+
+def _txt_chunks(path, chunk_rows):
+    names_only = {field: ('name' if field == 'name' else None) for field in CATALOG_COLUMNS}
+    with open(path, encoding='utf-8') as f:
+        names = []
+        for line in f:
+            name = line.strip()
+            if name and not name.startswith('#'):
+                names.append(name)
+            if len(names) == chunk_rows:
+                yield _standardize(pd.DataFrame({'name': names}), names_only)
+                names = []
+        if names:
+            yield _standardize(pd.DataFrame({'name': names}), names_only)
+
+def _fits_chunks(path, chunk_rows):
+    from astropy.io import fits
+
+    with fits.open(path, memmap=True) as hdus:
+        table = next((hdu for hdu in hdus if isinstance(hdu, (fits.BinTableHDU, fits.TableHDU))), None)
+        if table is None:
+            raise ValueError(f"'{path}' não tem nenhuma extensão de tabela.")
+        names = table.columns.names
+        columns = {field: _pick_column(names, field) for field in CATALOG_COLUMNS}
+        if columns['name'] is None:
+            raise ValueError(f"'{path}' não tem uma coluna de nomes ({', '.join(COLUMN_ALIASES['name'])}).")
+
+        data = table.data
+        wanted = [column for column in columns.values() if column is not None]
+        for first in range(0, len(data), chunk_rows):
+            rows = data[first:first + chunk_rows]
+            frame = pd.DataFrame({column: _fits_column(rows[column]) for column in wanted})
+            yield _standardize(frame, columns)
+
+def _fits_column(values):
+    values = np.asarray(values)
+    if values.dtype.kind == 'S':
+        return np.char.decode(values, 'utf-8')
+    return values.astype(float) if values.dtype.kind in 'iuf' else values
+
+def read_target_chunks(path, chunk_rows=CATALOG_CHUNK_ROWS):
+    """
+    Lê um arquivo de alvos em blocos de até `chunk_rows` linhas.
+
+    Formatos: CSV (colunas reconhecidas por COLUMN_ALIASES, p. ex. 'nome'/'alvo', 'ra',
+    'dec', 'mag', 'tipo'; linhas iniciadas por '#' são comentários), FITS (primeira
+    extensão de tabela, lida via memmap) e .txt (um nome por linha). RA numérico está
+    em graus; RA em texto sexagesimal está em horas. Cada bloco é um DataFrame com as
+    colunas de CATALOG_COLUMNS, com NaN onde o arquivo não traz RA/Dec.
+    """
+    lower = str(path).lower()
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Arquivo de alvos não encontrado: '{path}'.")
+    if lower.endswith(FITS_EXTENSIONS):
+        yield from _fits_chunks(path, chunk_rows)
+    elif lower.endswith('.txt'):
+        yield from _txt_chunks(path, chunk_rows)
+    else:
+        yield from _csv_chunks(path, chunk_rows)
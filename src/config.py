@@ -3,36 +3,22 @@
 """
 Módulo de Configuração.
 
-Este arquivo centraliza a importação de bibliotecas de uso comum e a
-configuração de parâmetros globais para a ferramenta. As dependências
-específicas de cada módulo (como geopy ou astroquery) devem ser importadas
-diretamente nos módulos que as utilizam.
+Centraliza a configuração global da ferramenta: filtros de avisos e constantes.
+Importar este módulo é barato: ele não carrega bibliotecas pesadas. Cada módulo
+importa diretamente o que usa, e dependências pesadas ou opcionais (matplotlib,
+seaborn, astroplan, astroquery, geopy, requests, tqdm) só são carregadas no
+primeiro uso, dentro das funções que precisam delas.
+
+Por compatibilidade, os nomes que este módulo exportava (`np`, `pd`, `u`, `Time`,
+`plt`, `requests`...) continuam acessíveis como atributos (`config.plt`), mas são
+importados apenas quando acessados.
 """
-
-# --- Bibliotecas Padrão ---
+import importlib
 import warnings
-from datetime import datetime, timedelta, date
-
-# --- Bibliotecas de Análise de Dados ---
-import numpy as np
-import pandas as pd
 
-# --- Bibliotecas Astronômicas ---
 import astropy.units as u
-from astropy.coordinates import EarthLocation, SkyCoord, AltAz, get_body
-from astropy.coordinates.funcs import get_sun
-from astropy.time import Time
-from astroplan import Observer
-from astroplan.moon import moon_illumination
 from astropy.utils.exceptions import AstropyWarning
-import erfa
-
-# --- Bibliotecas de Visualização ---
-import matplotlib.pyplot as plt
-
-# --- Outras ---
-import requests
-from tqdm.auto import tqdm
+import erfa  # já carregado pelo astropy.time; necessário para o filtro abaixo
 
 # --- Configurações Globais ---
 warnings.filterwarnings('ignore', category=AstropyWarning)
@@ -41,4 +27,35 @@ warnings.filterwarnings('ignore', category=erfa.ErfaWarning)
 # Constantes e Parâmetros
 MIN_ALTITUDE_DEFAULT = 30 * u.deg
 
-print("Módulo de Configuração (src/config.py) carregado com sucesso.")
+# Nomes exportados antigamente, resolvidos sob demanda: nome -> (módulo, atributo).
+_LAZY_ATTRIBUTES = {
+    'datetime': ('datetime', 'datetime'),
+    'timedelta': ('datetime', 'timedelta'),
+    'date': ('datetime', 'date'),
+    'np': ('numpy', None),
+    'pd': ('pandas', None),
+    'EarthLocation': ('astropy.coordinates', 'EarthLocation'),
+    'SkyCoord': ('astropy.coordinates', 'SkyCoord'),
+    'AltAz': ('astropy.coordinates', 'AltAz'),
+    'get_body': ('astropy.coordinates', 'get_body'),
+    'get_sun': ('astropy.coordinates', 'get_sun'),
+    'Time': ('astropy.time', 'Time'),
+    'Observer': ('astroplan', 'Observer'),
+    'moon_illumination': ('astroplan.moon', 'moon_illumination'),
+    'plt': ('matplotlib.pyplot', None),
+    'requests': ('requests', None),
+    'tqdm': ('tqdm.auto', 'tqdm'),
+}
+
+def __getattr__(name):
+    """
+    Importa, no primeiro acesso, um dos nomes de compatibilidade de `_LAZY_ATTRIBUTES`.
+    """
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = _LAZY_ATTRIBUTES[name]
+    value = importlib.import_module(module_name)
+    if attribute is not None:
+        value = getattr(value, attribute)
+    globals()[name] = value
+    return value
@@ -0,0 +1,216 @@
+# src/curves.py
+
+"""
+Módulo de Curvas de Altitude.
+
+Guarda a curva de altitude completa de cada alvo em todas as noites de um período
+(float32, na grade concatenada das noites usada por `analyze_year_visibility`),
+em vez de aplicar a elevação mínima durante o cálculo e descartar o resto. Assim
+as transformações são feitas uma única vez e qualquer limiar, ou vários de uma vez,
+vira só uma comparação vetorial sobre arrays já calculados:
+    - `AltitudeCurves.windows` devolve o mesmo DataFrame de `analyze_year_visibility`
+      para qualquer `min_altitude` (e `min_moon_separation`, se a Lua foi guardada);
+    - `AltitudeCurves.nightly_durations` dá a duração por noite de todos os alvos para
+      uma lista de limiares, numa única redução;
+    - `AltitudeCurves.to_year_store` monta um `YearStore` (`src/yearstore.py`).
+
+Os alvos fixos que nunca alcançam `lowest_altitude` não são transformados (ficam
+NaN) e limiares abaixo dela não são aceitos.
+
+Os limiares são arredondados para float32 antes da comparação, então uma amostra
+guardada exatamente no limiar conta como visível. Em relação à análise direta
+(float64), só as amostras a menos de `CURVE_ALTITUDE_TOLERANCE_DEG` do limiar (o
+arredondamento float32 de uma altitude) podem cair do outro lado do corte.
+"""
+import numpy as np
+import pandas as pd
+from astropy import units as u
+from astropy.time import Time
+
+from .analysis import (
+    _as_target_arrays, _night_sample_grid, _nightly_first_last, _nightly_moon_layer, _nightly_moon_separation,
+    _nightly_windows_frame, _reachable, _split_moving_targets, get_night_events_table
+)
+from .ephemeris import get_body_ephemeris
+from .horizon import check_accuracy, compute_altaz
+from .moon import moon_avoidance_mask
+from .yearstore import YearStore
+
+# Máximo de elementos alvos x amostras por transformação (limita a memória do modo 'exact').
+CURVE_CHUNK_ELEMENTS = 2_000_000
+# Espaçamento float32 em 180°: limita o arredondamento de qualquer altitude ou separação.
+CURVE_ALTITUDE_TOLERANCE_DEG = float(np.spacing(np.float32(180.0)))
+
+RESULT_COLUMNS = ['date', 'start_time', 'end_time', 'duration_hours']
+MOON_RESULT_COLUMNS = ['moon_illumination', 'moon_separation']
+
+class AltitudeCurves:
+    """
+    Curvas de altitude (alvos x amostras, float32) de todas as noites de um período.
+
+    `moon`, quando presente, traz 'altitude' da Lua por amostra, 'illumination' (0 a 1)
+    por noite e 'separation' alvos x noites, como em `_evaluate_target_on_nights`.
+    """
+
+    def __init__(self, names, dates, sample_times, night_start, altitude, lowest_altitude_deg=-90.0, moon=None):
+        self.names = list(names)
+        self.dates = pd.DatetimeIndex(dates)
+        self.sample_times = np.asarray(sample_times, dtype='datetime64[us]')
+        self.night_start = np.asarray(night_start, dtype=np.intp)
+        self.altitude = np.asarray(altitude, dtype=np.float32).reshape(len(self.names), self.sample_times.size)
+        self.lowest_altitude_deg = float(lowest_altitude_deg)
+        self.moon = moon
+        self._rows = {name: row for row, name in enumerate(self.names)}
+
+    def __len__(self):
+        return len(self.names)
+
+    def __repr__(self):
+        return f"AltitudeCurves({len(self.names)} alvos, {len(self.dates)} noites, {self.sample_times.size} amostras)"
+
+    def __contains__(self, name):
+        return name in self._rows
+
+    @property
+    def nbytes(self):
+        """Memória ocupada pelas curvas (e pela camada lunar), em bytes."""
+        moon = sum(values.nbytes for values in self.moon.values()) if self.moon else 0
+        return self.altitude.nbytes + self.sample_times.nbytes + moon
+
+    @property
+    def night_id(self):
+        """Noite de cada amostra."""
+        counts = np.diff(np.append(self.night_start, self.sample_times.size))
+        return np.repeat(np.arange(self.night_start.size), counts)
+
+    def _check(self, min_altitude_deg, min_moon_separation):
+        if np.min(min_altitude_deg) < self.lowest_altitude_deg:
+            raise ValueError(f"As curvas só valem para elevações a partir de {self.lowest_altitude_deg}° "
+                             f"(`lowest_altitude` de `compute_altitude_curves`).")
+        if min_moon_separation is not None and self.moon is None:
+            raise ValueError("min_moon_separation requer curvas calculadas com with_moon=True.")
+
+    def _above(self, rows, min_altitude_deg, min_moon_separation):
+        """Máscara (limiares x alvos x amostras) das amostras acima do limiar e livres da Lua."""
+        # Limiares em float32, como as curvas: comparar com float64 tornaria o corte
+        # dependente do arredondamento de cada amostra.
+        thresholds = np.asarray(min_altitude_deg, dtype=np.float32).reshape(-1, 1, 1)
+        above = self.altitude[rows] >= thresholds
+        if min_moon_separation is not None:
+            night_id = self.night_id
+            above &= moon_avoidance_mask(self.moon['separation'][rows][:, night_id], self.moon['altitude'],
+                                         np.float32(min_moon_separation.to_value(u.deg)))
+        return above
+
+    def windows(self, target_name, min_altitude, min_moon_separation=None):
+        """
+        Janela de cada noite do alvo acima de `min_altitude`, no formato de
+        `analyze_year_visibility` (com as colunas da Lua quando `min_moon_separation` é dado).
+
+        Igual à análise direta, exceto por amostras a menos de `CURVE_ALTITUDE_TOLERANCE_DEG`
+        do limiar (ver o cabeçalho do módulo).
+        """
+        min_altitude_deg = min_altitude.to_value(u.deg)
+        self._check(min_altitude_deg, min_moon_separation)
+        row = self._rows[target_name]
+        above = self._above([row], min_altitude_deg, min_moon_separation)[0, 0]
+        first, last = _nightly_first_last(above, self.night_start)
+
+        columns, moon_columns = list(RESULT_COLUMNS), None
+        if min_moon_separation is not None:
+            columns += MOON_RESULT_COLUMNS
+            moon_columns = {'moon_illumination': self.moon['illumination'].astype(float) * 100,
+                            'moon_separation': self.moon['separation'][row].astype(float)}
+        return _nightly_windows_frame(pd.DataFrame(index=self.dates), self.sample_times, first, last, columns,
+                                      moon_columns)
+
+    def nightly_durations(self, min_altitudes, targets=None, min_moon_separation=None):
+        """
+        Horas entre a primeira e a última amostra acima de cada limiar, por noite.
+
+        `min_altitudes` é uma Quantity (escalar ou lista). Retorna um array float32
+        limiares x alvos x noites, com NaN nas noites sem visibilidade; `targets`
+        restringe (e ordena) os alvos.
+        """
+        thresholds = np.atleast_1d(min_altitudes.to_value(u.deg))
+        self._check(thresholds, min_moon_separation)
+        rows = [self._rows[name] for name in (self.names if targets is None else targets)]
+        first, last = _nightly_first_last(self._above(rows, thresholds, min_moon_separation), self.night_start)
+
+        visible = last >= 0
+        elapsed = self.sample_times[np.where(visible, last, 0)] - self.sample_times[np.where(visible, first, 0)]
+        hours = (elapsed / np.timedelta64(1, 's') / 3600.0).astype(np.float32)
+        return np.where(visible, hours, np.float32(np.nan))
+
+    def to_year_store(self, min_altitude, min_moon_separation=None, store=None):
+        """
+        Acrescenta as janelas de todos os alvos num `YearStore` (novo, se `store` for None).
+        """
+        store = store if store is not None else YearStore(min_altitude.to_value(u.deg))
+        for name in self.names:
+            store.append(name, self.windows(name, min_altitude, min_moon_separation))
+        return store
+
+def _resolve_body_names(targets, start_time, end_time):
+    """Troca nomes de corpos do Sistema Solar (str) por efemérides do período."""
+    if not isinstance(targets, dict):
+        return targets
+    return {name: get_body_ephemeris(coord, start_time, end_time) if isinstance(coord, str) else coord
+            for name, coord in targets.items() if coord is not None}
+
+def compute_altitude_curves(start_date, end_date, observer_location, observer_timezone, targets,
+                            accuracy='exact', lowest_altitude=0 * u.deg, with_moon=False):
+    """
+    Calcula uma vez as curvas de altitude de vários alvos em todas as noites de um intervalo.
+
+    `targets` aceita os formatos de `analyze_targets_visibility_for_night` (dicionário de
+    SkyCoords/efemérides, `TargetCatalog` ou colunas); num dicionário, um nome de corpo do
+    Sistema Solar (str) vira a efeméride do período. Os alvos fixos são transformados em
+    blocos de até `CURVE_CHUNK_ELEMENTS` elementos. Com `with_moon=True` a Lua é guardada
+    como em `analyze_year_visibility(..., min_moon_separation=...)`.
+    """
+    check_accuracy(accuracy)
+    night_events = get_night_events_table(start_date, end_date, observer_location, observer_timezone)
+    nights = night_events.dropna(subset=['inicio_noite', 'fim_noite'])
+    nights = nights[nights['inicio_noite'] < nights['fim_noite']]
+    starts, ends, night_id, night_start, sample_times = _night_sample_grid(nights)
+
+    if not nights.empty:
+        targets = _resolve_body_names(targets, Time(starts[0]) - 1 * u.day, Time(ends[-1]) + 1 * u.day)
+    names, coords = _as_target_arrays(targets)
+    moving = _split_moving_targets(targets)
+    fixed_rows = np.arange(len(names))
+    if moving:
+        fixed = set(names)
+        names = [name for name in targets if name in moving or name in fixed]
+        fixed_rows = np.array([row for row, name in enumerate(names) if name not in moving], dtype=int)
+
+    lowest_altitude_deg = lowest_altitude.to_value(u.deg)
+    altitude = np.full((len(names), sample_times.size), np.nan, dtype=np.float32)
+    if sample_times.size and fixed_rows.size:
+        # Alvos fixos que nunca alcançam a menor elevação de interesse não são transformados.
+        reachable = np.nonzero(_reachable(coords, observer_location, lowest_altitude_deg, sample_times))[0]
+        block = max(1, CURVE_CHUNK_ELEMENTS // sample_times.size)
+        for first in range(0, reachable.size, block):
+            rows = reachable[first:first + block]
+            altitude[fixed_rows[rows]] = compute_altaz(coords[rows], sample_times, observer_location, accuracy)[0]
+    if sample_times.size:
+        for row, name in enumerate(names):
+            if name in moving:
+                altitude[row] = moving[name].altaz(Time(sample_times), observer_location, accuracy)[0]
+
+    moon = None
+    if with_moon and sample_times.size:
+        layer, midpoints, moon_altitude = _nightly_moon_layer(starts, ends, sample_times, night_id,
+                                                              observer_location)
+        separation = np.full((len(names), len(nights)), np.nan, dtype=np.float32)
+        if fixed_rows.size:
+            separation[fixed_rows] = _nightly_moon_separation(coords, layer, midpoints)
+        for row, name in enumerate(names):
+            if name in moving:
+                separation[row] = _nightly_moon_separation(moving[name], layer, midpoints)
+        moon = {'altitude': moon_altitude.astype(np.float32),
+                'illumination': np.asarray(layer['illumination'], dtype=np.float32),
+                'separation': separation}
+
+    return AltitudeCurves(names, nights.index, sample_times, night_start, altitude, lowest_altitude_deg, moon)
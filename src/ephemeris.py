@@ -0,0 +1,144 @@
+# src/ephemeris.py
+
+"""
+Módulo de Efemérides Interpoladas.
+
+Alvos do Sistema Solar mudam de posição ao longo da noite (a Lua anda ~0,5° por
+hora) e ao longo do ano. Em vez de chamar `get_body` para cada instante, este módulo
+amostra `get_body` numa grade grossa (de hora em hora para a Lua, diária para os
+planetas), ajusta polinômios de Chebyshev por trechos (apenas NumPy) à posição
+geocêntrica GCRS e avalia esses polinômios em qualquer array de tempos.
+
+Como a distância também é interpolada, a transformação para AltAz mantém a
+paralaxe topocêntrica da Lua. Com as configurações padrão o erro de interpolação
+fica abaixo de 1" para qualquer corpo (para a Lua, abaixo de 1 m).
+"""
+from collections import OrderedDict
+
+import numpy as np
+from numpy.polynomial import chebyshev
+from astropy import units as u
+from astropy.coordinates import AltAz, CartesianRepresentation, GCRS, SkyCoord, get_body
+from astropy.time import Time
+
+from .horizon import check_accuracy, fast_altaz_track, times_to_jd
+
+# (passo da amostragem em dias, dias por trecho, grau do polinômio)
+SAMPLING = {
+    'moon': (1 / 24, 1.0, 12),
+}
+DEFAULT_SAMPLING = (1.0, 16.0, 12)
+EPHEMERIS_CACHE_SIZE = 32
+
+class BodyEphemeris:
+    """
+    Efeméride interpolada de um corpo do Sistema Solar num intervalo de tempo.
+
+    A posição geocêntrica (GCRS, em km) é ajustada por polinômios de Chebyshev em
+    trechos de tamanho fixo, todos de uma vez com uma única pseudo-inversa.
+    """
+
+    def __init__(self, body, start_time, end_time, step_days=None, segment_days=None, degree=None):
+        self.body = body.lower()
+        default_step, default_segment, default_degree = SAMPLING.get(self.body, DEFAULT_SAMPLING)
+        self.step_days = step_days or default_step
+        self.segment_days = segment_days or default_segment
+        self.degree = degree or default_degree
+
+        start_jd = float(np.min(times_to_jd(start_time)))
+        end_jd = float(np.max(times_to_jd(end_time)))
+        nodes_per_segment = int(round(self.segment_days / self.step_days))
+        if nodes_per_segment < self.degree:
+            raise ValueError("Cada trecho precisa de pelo menos tantas amostras quanto o grau do polinômio.")
+        n_segments = max(int(np.ceil((end_jd - start_jd) / self.segment_days)), 1)
+
+        self.start_jd = start_jd
+        self.end_jd = start_jd + n_segments * self.segment_days
+        sample_jd = start_jd + np.arange(n_segments * nodes_per_segment + 1) * self.step_days
+        samples = get_body(self.body, Time(sample_jd, format='jd', scale='utc'))
+        xyz = samples.cartesian.xyz.to_value(u.km).T
+
+        # Cada trecho usa as suas amostras e a primeira do trecho seguinte (nós compartilhados).
+        index = np.arange(n_segments)[:, None] * nodes_per_segment + np.arange(nodes_per_segment + 1)
+        local_x = np.linspace(-1.0, 1.0, nodes_per_segment + 1)
+        fit = np.linalg.pinv(chebyshev.chebvander(local_x, self.degree))
+        self.n_samples = sample_jd.size
+        self._coefficients = np.einsum('kn,snc->skc', fit, xyz[index])
+
+    def covers(self, start_time, end_time):
+        """
+        Indica se o intervalo [start_time, end_time] está dentro da efeméride.
+        """
+        return self.start_jd <= float(np.min(times_to_jd(start_time))) and \
+            float(np.max(times_to_jd(end_time))) <= self.end_jd
+
+    def gcrs_xyz(self, times):
+        """
+        Posição geocêntrica GCRS (km) interpolada, como matriz T x 3.
+        """
+        return self._xyz_at_jd(times_to_jd(times))
+
+    def _xyz_at_jd(self, jd):
+        if jd.size and (jd.min() < self.start_jd - 1e-9 or jd.max() > self.end_jd + 1e-9):
+            raise ValueError(f"Tempos fora do intervalo da efeméride de '{self.body}'.")
+        position = (jd - self.start_jd) / self.segment_days
+        segment = np.clip(np.floor(position).astype(int), 0, len(self._coefficients) - 1)
+        local_x = 2.0 * (position - segment) - 1.0
+        basis = chebyshev.chebvander(local_x, self.degree)
+        return np.einsum('tk,tkc->tc', basis, self._coefficients[segment])
+
+    def skycoord(self, times):
+        """
+        SkyCoord GCRS (com distância) do corpo em cada tempo.
+        """
+        obstime = times if isinstance(times, Time) else Time(times_to_jd(times), format='jd', scale='utc')
+        xyz = self.gcrs_xyz(obstime)
+        if obstime.isscalar:
+            xyz = xyz[0]
+        return SkyCoord(CartesianRepresentation(xyz.T * u.km), frame=GCRS(obstime=obstime))
+
+    def altaz(self, times, observer_location, accuracy='exact'):
+        """
+        Altitude e azimute (graus) do corpo ao longo de `times`, como arrays 1D.
+        """
+        check_accuracy(accuracy)
+        if accuracy == 'fast':
+            jd = times_to_jd(times)
+            x, y, z = self._xyz_at_jd(jd).T
+            distance = np.sqrt(x * x + y * y + z * z)
+            return fast_altaz_track(np.degrees(np.arctan2(y, x)), np.degrees(np.arcsin(z / distance)), jd,
+                                    observer_location.lat.deg, observer_location.lon.deg,
+                                    observer_location.height.to_value(u.km), distance)
+
+        coord = self.skycoord(times)
+        if coord.isscalar:
+            coord = coord.reshape((1,))
+        altaz = coord.transform_to(AltAz(obstime=coord.obstime, location=observer_location))
+        return altaz.alt.deg, altaz.az.deg
+
+    def __repr__(self):
+        start, end = Time([self.start_jd, self.end_jd], format='jd', scale='utc').iso
+        return f"BodyEphemeris('{self.body}', {start} -> {end}, {self.n_samples} amostras)"
+
+_ephemeris_cache = OrderedDict()
+
+def get_body_ephemeris(body, start_time, end_time):
+    """
+    Retorna uma efeméride do corpo cobrindo o intervalo, reaproveitando uma já calculada.
+    """
+    for key, ephemeris in _ephemeris_cache.items():
+        if ephemeris.body == body.lower() and ephemeris.covers(start_time, end_time):
+            _ephemeris_cache.move_to_end(key)
+            return ephemeris
+
+    ephemeris = BodyEphemeris(body, start_time, end_time)
+    _ephemeris_cache[(ephemeris.body, ephemeris.start_jd, ephemeris.end_jd)] = ephemeris
+    if len(_ephemeris_cache) > EPHEMERIS_CACHE_SIZE:
+        _ephemeris_cache.popitem(last=False)
+    return ephemeris
+
+def is_moving_target(target):
+    """
+    Indica se o alvo é uma efeméride (posição variável) em vez de um SkyCoord fixo.
+    """
+    return isinstance(target, BodyEphemeris)
@@ -0,0 +1,263 @@
+# src/gazetteer.py
+
+"""
+Módulo de Gazetteer Offline.
+
+Transforma nomes de cidades em coordenadas sem acesso à rede, a partir de um
+gazetteer compacto de localidades povoadas empacotado com o projeto
+(`src/data/gazetteer.csv.gz`, dados do GeoNames).
+
+Os nomes são normalizados (sem acentos, minúsculos, só letras, dígitos e espaços),
+de modo que "Sao Paulo", "SÃO PAULO" e "são-paulo" são a mesma chave. As chaves
+ficam numa lista ordenada e as buscas usam `bisect`: a busca exata e a busca por
+prefixo custam O(log n), alguns microssegundos. Consultas no formato
+"Cidade, País" usam o país para desempatar cidades homônimas; entre as restantes
+vence a mais populosa. O gazetteer não traz estados, então um estado ("Paris, Texas",
+"Uberaba, MG") só restringe o país e precisa deixar um único candidato; consultas
+com qualificadores que não podem ser conferidos retornam None e seguem para o cache
+e a rede.
+
+As cidades resolvidas pela rede (Nominatim, ver `src/location.py`) ficam num cache
+persistente em SQLite (`PlaceCache`), no mesmo diretório dos demais caches.
+"""
+import csv
+import gzip
+import heapq
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from functools import lru_cache
+
+from .resolver import get_cache_dir, DEFAULT_TTL_SECONDS
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(__file__), 'data', 'gazetteer.csv.gz')
+SEARCH_LIMIT = 10
+
+Place = namedtuple('Place', ['name', 'country_code', 'country', 'lat_deg', 'lon_deg', 'population', 'timezone'])
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+# Nomes de países usados nas consultas que diferem do nome do GeoNames (já normalizados).
+COUNTRY_ALIASES = {
+    'usa': 'US', 'eua': 'US', 'estados unidos': 'US', 'united states of america': 'US',
+    'uk': 'GB', 'reino unido': 'GB', 'great britain': 'GB', 'gra bretanha': 'GB', 'england': 'GB',
+    'inglaterra': 'GB', 'scotland': 'GB', 'escocia': 'GB', 'wales': 'GB', 'pais de gales': 'GB',
+    'brasil': 'BR', 'alemanha': 'DE', 'franca': 'FR', 'espanha': 'ES', 'italia': 'IT', 'japao': 'JP',
+    'holanda': 'NL', 'netherlands': 'NL', 'paises baixos': 'NL', 'belgica': 'BE', 'suica': 'CH',
+    'suecia': 'SE', 'noruega': 'NO', 'dinamarca': 'DK', 'grecia': 'GR', 'russia': 'RU', 'china': 'CN',
+    'coreia do sul': 'KR', 'africa do sul': 'ZA', 'mexico': 'MX', 'peru': 'PE', 'uruguai': 'UY',
+    'paraguai': 'PY', 'bolivia': 'BO', 'colombia': 'CO', 'equador': 'EC', 'australia': 'AU',
+    'nova zelandia': 'NZ', 'canada': 'CA', 'irlanda': 'IE', 'austria': 'AT', 'polonia': 'PL',
+    'tchequia': 'CZ', 'czech republic': 'CZ', 'turquia': 'TR', 'egito': 'EG', 'marrocos': 'MA',
+}
+
+_US_STATES = {
+    'AL': 'Alabama', 'AK': 'Alaska', 'AZ': 'Arizona', 'AR': 'Arkansas', 'CA': 'California', 'CO': 'Colorado',
+    'CT': 'Connecticut', 'DE': 'Delaware', 'DC': 'District of Columbia', 'FL': 'Florida', 'GA': 'Georgia',
+    'HI': 'Hawaii', 'ID': 'Idaho', 'IL': 'Illinois', 'IN': 'Indiana', 'IA': 'Iowa', 'KS': 'Kansas',
+    'KY': 'Kentucky', 'LA': 'Louisiana', 'ME': 'Maine', 'MD': 'Maryland', 'MA': 'Massachusetts',
+    'MI': 'Michigan', 'MN': 'Minnesota', 'MS': 'Mississippi', 'MO': 'Missouri', 'MT': 'Montana',
+    'NE': 'Nebraska', 'NV': 'Nevada', 'NH': 'New Hampshire', 'NJ': 'New Jersey', 'NM': 'New Mexico',
+    'NY': 'New York', 'NC': 'North Carolina', 'ND': 'North Dakota', 'OH': 'Ohio', 'OK': 'Oklahoma',
+    'OR': 'Oregon', 'PA': 'Pennsylvania', 'RI': 'Rhode Island', 'SC': 'South Carolina', 'SD': 'South Dakota',
+    'TN': 'Tennessee', 'TX': 'Texas', 'UT': 'Utah', 'VT': 'Vermont', 'VA': 'Virginia', 'WA': 'Washington',
+    'WV': 'West Virginia', 'WI': 'Wisconsin', 'WY': 'Wyoming',
+}
+_BR_STATES = {
+    'AC': 'Acre', 'AL': 'Alagoas', 'AP': 'Amapá', 'AM': 'Amazonas', 'BA': 'Bahia', 'CE': 'Ceará',
+    'DF': 'Distrito Federal', 'ES': 'Espírito Santo', 'GO': 'Goiás', 'MA': 'Maranhão', 'MT': 'Mato Grosso',
+    'MS': 'Mato Grosso do Sul', 'MG': 'Minas Gerais', 'PA': 'Pará', 'PB': 'Paraíba', 'PR': 'Paraná',
+    'PE': 'Pernambuco', 'PI': 'Piauí', 'RJ': 'Rio de Janeiro', 'RN': 'Rio Grande do Norte',
+    'RS': 'Rio Grande do Sul', 'RO': 'Rondônia', 'RR': 'Roraima', 'SC': 'Santa Catarina', 'SP': 'São Paulo',
+    'SE': 'Sergipe', 'TO': 'Tocantins',
+}
+
+def normalize_place_name(name):
+    """
+    Normaliza um nome de lugar: sem acentos, minúsculo e com separadores trocados por um espaço.
+    """
+    text = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode('ascii')
+    return _NON_ALNUM.sub(' ', text.lower()).strip()
+
+def _region_countries():
+    """Estado (sigla ou nome normalizado) -> códigos dos países que têm um estado com esse nome."""
+    regions = {}
+    for country_code, states in (('US', _US_STATES), ('BR', _BR_STATES)):
+        for code, name in states.items():
+            for alias in (code, name):
+                regions.setdefault(normalize_place_name(alias), set()).add(country_code)
+    return regions
+
+REGION_COUNTRIES = _region_countries()
+
+class Gazetteer:
+    """
+    Índice de localidades por nome normalizado, com busca exata e por prefixo via `bisect`.
+
+    As linhas do arquivo estão em ordem decrescente de população, então o número da
+    linha já serve de ranking: entre vários candidatos vence o de menor índice.
+    """
+
+    def __init__(self, path=GAZETTEER_PATH):
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            reader = csv.DictReader(line for line in f if not line.startswith('#'))
+            self.places = [
+                Place(row['name'], row['country_code'], row['country'], float(row['lat_deg']),
+                      float(row['lon_deg']), int(row['population']), row['timezone'])
+                for row in reader
+            ]
+
+        index = sorted((normalize_place_name(place.name), row) for row, place in enumerate(self.places))
+        self._keys = [key for key, _ in index]
+        self._rows = [row for _, row in index]
+        self._countries = {}
+        for place in self.places:
+            for alias in (place.country_code, place.country):
+                self._countries.setdefault(normalize_place_name(alias), set()).add(place.country_code)
+        for alias, code in COUNTRY_ALIASES.items():
+            self._countries.setdefault(alias, set()).add(code)
+
+    def __len__(self):
+        return len(self.places)
+
+    def _exact_rows(self, key):
+        return self._rows[bisect_left(self._keys, key):bisect_right(self._keys, key)]
+
+    def lookup(self, query):
+        """
+        Localidade mais provável para "Cidade" ou "Cidade, [Estado,] País"; None se não houver.
+
+        O último qualificador após a vírgula deve ser um país (nome, apelido ou código
+        ISO) com candidatos, ou um estado dos EUA ou do Brasil (sigla ou nome). Estados e
+        qualificadores intermediários não podem ser conferidos no gazetteer: o estado só
+        restringe o país, e a consulta só é aceita se sobrar um único candidato
+        ("Uberaba, MG" sim; "Springfield, Illinois" não, há várias nos EUA). Um último
+        qualificador desconhecido também dá None, para a busca seguir para a rede.
+        """
+        city, *qualifiers = [normalize_place_name(part) for part in str(query).split(',')]
+        rows = self._exact_rows(city)
+        if not qualifiers or not rows:
+            return self.places[min(rows)] if rows else None
+
+        def within(codes):
+            return [row for row in rows if self.places[row].country_code in codes]
+
+        *unverified, last = qualifiers
+        in_country = within(self._countries.get(last, ()))
+        if in_country:
+            rows = in_country
+        elif last in REGION_COUNTRIES:
+            rows = within(REGION_COUNTRIES[last])
+            unverified.append(last)
+        else:
+            return None
+        for qualifier in unverified:
+            if qualifier in REGION_COUNTRIES:
+                rows = within(REGION_COUNTRIES[qualifier])
+        if unverified and len(rows) != 1:
+            return None
+        return self.places[min(rows)] if rows else None
+
+    def search(self, prefix, limit=SEARCH_LIMIT):
+        """
+        Até `limit` localidades cujo nome começa com `prefix`, das mais populosas para as menos.
+        """
+        key = normalize_place_name(prefix)
+        if not key:
+            return []
+        start = bisect_left(self._keys, key)
+        end = bisect_left(self._keys, key + '\x7f', start)
+        return [self.places[row] for row in heapq.nsmallest(limit, self._rows[start:end])]
+
+@lru_cache(maxsize=1)
+def load_gazetteer(path=GAZETTEER_PATH):
+    """
+    Carrega (uma única vez por processo) o gazetteer empacotado.
+    """
+    return Gazetteer(path)
+
+def lookup_place(query):
+    """
+    Procura uma cidade no gazetteer offline. Retorna um `Place` ou None.
+    """
+    return load_gazetteer().lookup(query)
+
+def search_places(prefix, limit=SEARCH_LIMIT):
+    """
+    Sugestões de cidades por prefixo no gazetteer offline (ver `Gazetteer.search`).
+    """
+    return load_gazetteer().search(prefix, limit)
+
+class PlaceCache:
+    """
+    Cache persistente (SQLite) das cidades resolvidas pela rede.
+
+    As entradas são indexadas pela consulta normalizada e expiram após `ttl_seconds`.
+    Se o arquivo não puder ser criado, o cache passa a funcionar apenas em memória.
+    """
+
+    def __init__(self, path=None, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.path = path or os.path.join(get_cache_dir(), 'places.sqlite')
+        self.ttl_seconds = ttl_seconds
+        try:
+            if self.path != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._create_table()
+        except (OSError, sqlite3.Error) as e:
+            print(f"  AVISO: Cache de cidades indisponível em '{self.path}', usando memória. Erro: {e}")
+            self.path = ':memory:'
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._create_table()
+
+    def _create_table(self):
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS places ("
+                " key TEXT PRIMARY KEY, query TEXT, lat_deg REAL, lon_deg REAL, resolved_at REAL)"
+            )
+
+    def get(self, query, now=None):
+        """
+        Retorna (lat_graus, lon_graus) se a consulta estiver no cache e não tiver expirado; senão None.
+        """
+        now = time.time() if now is None else now
+        row = self._conn.execute(
+            "SELECT lat_deg, lon_deg, resolved_at FROM places WHERE key = ?", (normalize_place_name(query),)
+        ).fetchone()
+        if row is None or now - row[2] > self.ttl_seconds:
+            return None
+        return row[0], row[1]
+
+    def put(self, query, lat_deg, lon_deg, now=None):
+        """
+        Armazena (ou atualiza) as coordenadas de uma consulta.
+        """
+        now = time.time() if now is None else now
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO places (key, query, lat_deg, lon_deg, resolved_at) VALUES (?, ?, ?, ?, ?)",
+                (normalize_place_name(query), query, float(lat_deg), float(lon_deg), now)
+            )
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM places").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+_default_place_cache = None
+
+def get_default_place_cache():
+    """
+    Retorna o cache de cidades padrão do processo (criado na primeira chamada).
+    """
+    global _default_place_cache
+    if _default_place_cache is None:
+        _default_place_cache = PlaceCache()
+    return _default_place_cache
@@ -0,0 +1,224 @@
+# src/horizon.py
+
+"""
+Módulo de Coordenadas Horizontais.
+
+Converte alvos fixos (ICRS) em altitude/azimute para matrizes alvos x tempos, em
+dois modos de precisão:
+    - 'exact' (padrão): a cadeia completa do astropy (`AltAz`), com precessão,
+      nutação, aberração e dados do IERS;
+    - 'fast': um núcleo analítico em NumPy puro (tempo sidéreo médio, precessão
+      IAU 1976 e ângulo horário), ordens de grandeza mais rápido.
+
+O modo 'fast' ignora nutação, aberração anual e diurna, UT1-UTC, movimento do polo
+e o viés do referencial ICRS. Somados, esses termos ficam abaixo de
+`FAST_ALTAZ_MAX_ERROR_DEG` em altitude (e em azimute multiplicado por cos(alt))
+entre 1900 e 2100, o que é irrelevante para planejamento com grades de minutos.
+Como o modo 'exact' sem pressão atmosférica também não aplica refração, os dois
+modos são diretamente comparáveis.
+"""
+import numpy as np
+import pandas as pd
+from astropy.coordinates import AltAz
+from astropy.time import Time
+
+from . import instrumentation
+
+ACCURACY_MODES = ('exact', 'fast')
+FAST_ALTAZ_MAX_ERROR_DEG = 0.02  # 72 segundos de arco
+# Folga das culminações analíticas: nutação (9") + aberração anual (21") + viés do ICRS.
+CULMINATION_MARGIN_DEG = 0.02
+
+J2000_JD = 2451545.0
+UNIX_EPOCH_JD = 2440587.5
+_UNIX_EPOCH = pd.Timestamp('1970-01-01')
+_ARCSEC = np.pi / (180.0 * 3600.0)
+WGS84_A_KM = 6378.137
+WGS84_E2 = 6.69437999014e-3
+
+def check_accuracy(accuracy):
+    """
+    Valida o modo de precisão ('exact' ou 'fast').
+    """
+    if accuracy not in ACCURACY_MODES:
+        raise ValueError(f"Modo de precisão inválido: {accuracy!r}. Use um de {ACCURACY_MODES}.")
+    return accuracy
+
+def times_to_jd(times):
+    """
+    Converte tempos (Time, DatetimeIndex, datetime64 ou datetime, em UTC) em datas julianas (array 1D).
+    """
+    if isinstance(times, Time):
+        return np.atleast_1d(times.utc.jd).astype(float).reshape(-1)
+    index = pd.DatetimeIndex(np.atleast_1d(pd.to_datetime(times)))
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return UNIX_EPOCH_JD + np.asarray((index - _UNIX_EPOCH) / pd.Timedelta(days=1), dtype=float)
+
+def _rot_z(angle):
+    """
+    Matrizes de rotação em torno do eixo z (convenção do ERFA), uma por ângulo.
+    """
+    c, s = np.cos(angle), np.sin(angle)
+    m = np.zeros(angle.shape + (3, 3))
+    m[..., 0, 0], m[..., 0, 1] = c, s
+    m[..., 1, 0], m[..., 1, 1] = -s, c
+    m[..., 2, 2] = 1.0
+    return m
+
+def _rot_y(angle):
+    """
+    Matrizes de rotação em torno do eixo y (convenção do ERFA), uma por ângulo.
+    """
+    c, s = np.cos(angle), np.sin(angle)
+    m = np.zeros(angle.shape + (3, 3))
+    m[..., 0, 0], m[..., 0, 2] = c, -s
+    m[..., 1, 1] = 1.0
+    m[..., 2, 0], m[..., 2, 2] = s, c
+    return m
+
+def _horizon_matrix(lat):
+    """
+    Rotação do equador local para o horizonte (linhas Norte, Leste, Zênite); uma matriz
+    3x3 por latitude (forma lat.shape + (3, 3)).
+    """
+    s, c = np.sin(lat), np.cos(lat)
+    m = np.zeros(np.shape(lat) + (3, 3))
+    m[..., 0, 0], m[..., 0, 2] = -s, c      # Norte
+    m[..., 1, 1] = 1.0                      # Leste
+    m[..., 2, 0], m[..., 2, 2] = c, s       # Zênite
+    return m
+
+def precession_matrix(jd):
+    """
+    Matrizes de precessão IAU 1976 (J2000 -> equador médio da data), uma por data juliana.
+    """
+    t = (np.asarray(jd, dtype=float) - J2000_JD) / 36525.0
+    zeta = (2306.2181 + (0.30188 + 0.017998 * t) * t) * t * _ARCSEC
+    z = (2306.2181 + (1.09468 + 0.018203 * t) * t) * t * _ARCSEC
+    theta = (2004.3109 - (0.42665 + 0.041833 * t) * t) * t * _ARCSEC
+    return _rot_z(-z) @ _rot_y(theta) @ _rot_z(-zeta)
+
+def greenwich_mean_sidereal_time(jd):
+    """
+    Tempo sidéreo médio de Greenwich (radianos), tomando UT1 = UTC.
+    """
+    d = np.asarray(jd, dtype=float) - J2000_JD
+    t = d / 36525.0
+    gmst_deg = 280.46061837 + 360.98564736629 * d + (0.000387933 - t / 38710000.0) * t * t
+    return np.radians(np.mod(gmst_deg, 360.0))
+
+def fast_altaz(ra_deg, dec_deg, jd, lat_deg, lon_deg):
+    """
+    Núcleo analítico: altitude e azimute (graus) de N alvos ICRS em T datas julianas UTC.
+
+    Para cada tempo monta uma única matriz 3x3 (precessão, tempo sidéreo local e
+    rotação para o horizonte) e aplica-a a todos os alvos com produtos matriciais.
+    `lat_deg`/`lon_deg` são escalares ou arrays de tamanho T (um local por instante,
+    como nas grades concatenadas de vários locais). Retorna duas matrizes N x T
+    (azimute medido do Norte para Leste).
+    """
+    ra = np.radians(np.asarray(ra_deg, dtype=float).reshape(-1))
+    dec = np.radians(np.asarray(dec_deg, dtype=float).reshape(-1))
+    jd = np.asarray(jd, dtype=float).reshape(-1)
+    lat = np.radians(lat_deg)
+
+    vectors = np.stack([np.cos(dec) * np.cos(ra), np.cos(dec) * np.sin(ra), np.sin(dec)], axis=1)
+
+    local_sidereal_time = greenwich_mean_sidereal_time(jd) + np.radians(lon_deg)
+    rotation = _horizon_matrix(lat) @ _rot_z(local_sidereal_time) @ precession_matrix(jd)
+
+    north = vectors @ rotation[:, 0, :].T
+    east = vectors @ rotation[:, 1, :].T
+    up = vectors @ rotation[:, 2, :].T
+
+    altitude = np.degrees(np.arcsin(np.clip(up, -1.0, 1.0)))
+    azimuth = np.mod(np.degrees(np.arctan2(east, north)), 360.0)
+    return altitude, azimuth
+
+def _observer_offset_km(lat_deg, height_km):
+    """
+    Posição geocêntrica do observador (WGS84) nos eixos Norte/Leste/Zênite locais, em km.
+    """
+    lat = np.radians(lat_deg)
+    n = WGS84_A_KM / np.sqrt(1.0 - WGS84_E2 * np.sin(lat) ** 2)
+    p = (n + height_km) * np.cos(lat)
+    z = (n * (1.0 - WGS84_E2) + height_km) * np.sin(lat)
+    radius, geocentric_lat = np.hypot(p, z), np.arctan2(z, p)
+    return np.array([radius * np.sin(geocentric_lat - lat), 0.0, radius * np.cos(geocentric_lat - lat)])
+
+def fast_altaz_track(ra_deg, dec_deg, jd, lat_deg, lon_deg, height_km=0.0, distance_km=None):
+    """
+    Variante de `fast_altaz` para um alvo em movimento: uma posição (RA/Dec geocêntricos)
+    por tempo, todos arrays de tamanho T. Com `distance_km` a origem é deslocada para o
+    observador (paralaxe topocêntrica, essencial para a Lua). Retorna dois arrays 1D.
+    """
+    ra = np.radians(np.asarray(ra_deg, dtype=float).reshape(-1))
+    dec = np.radians(np.asarray(dec_deg, dtype=float).reshape(-1))
+    jd = np.asarray(jd, dtype=float).reshape(-1)
+    lat = np.radians(lat_deg)
+
+    vectors = np.stack([np.cos(dec) * np.cos(ra), np.cos(dec) * np.sin(ra), np.sin(dec)], axis=1)
+    local_sidereal_time = greenwich_mean_sidereal_time(jd) + np.radians(lon_deg)
+    rotation = _horizon_matrix(lat) @ _rot_z(local_sidereal_time) @ precession_matrix(jd)
+    north, east, up = np.einsum('tij,tj->it', rotation, vectors)
+
+    if distance_km is not None:
+        distance = np.asarray(distance_km, dtype=float).reshape(-1)
+        offset = _observer_offset_km(lat_deg, height_km)
+        north, east, up = north * distance - offset[0], east * distance, up * distance - offset[2]
+        norm = np.sqrt(north ** 2 + east ** 2 + up ** 2)
+        north, east, up = north / norm, east / norm, up / norm
+
+    altitude = np.degrees(np.arcsin(np.clip(up, -1.0, 1.0)))
+    azimuth = np.mod(np.degrees(np.arctan2(east, north)), 360.0)
+    return altitude, azimuth
+
+def culmination_altitudes(ra_deg, dec_deg, lat_deg, jd=J2000_JD):
+    """
+    Altitudes geométricas (graus) das culminações superior, 90° − |lat − dec|, e
+    inferior, |lat + dec| − 90°, de alvos ICRS, com a declinação precessada para `jd`.
+
+    `jd` pode ser um array com as datas extremas de um intervalo: a culminação
+    superior volta como o máximo entre elas e a inferior como o mínimo. `lat_deg`
+    (geodésica) é um escalar ou um array que é combinado com os alvos por broadcasting
+    (p. ex. `lat[:, np.newaxis]` dá matrizes locais x alvos).
+    """
+    ra = np.radians(np.asarray(ra_deg, dtype=float).reshape(-1))
+    dec = np.radians(np.asarray(dec_deg, dtype=float).reshape(-1))
+    jd = np.atleast_1d(np.asarray(jd, dtype=float))
+
+    vectors = np.stack([np.cos(dec) * np.cos(ra), np.cos(dec) * np.sin(ra), np.sin(dec)], axis=1)
+    sin_dec = vectors @ precession_matrix(jd)[:, 2, :].T
+    dec_of_date = np.degrees(np.arcsin(np.clip(sin_dec, -1.0, 1.0)))
+
+    lat = np.expand_dims(np.asarray(lat_deg, dtype=float), -1)
+    upper = (90.0 - np.abs(lat - dec_of_date)).max(axis=-1)
+    lower = (np.abs(lat + dec_of_date) - 90.0).min(axis=-1)
+    return upper, lower
+
+def compute_altaz(coords, times, observer_location, accuracy='exact'):
+    """
+    Altitude e azimute (graus) de alvos ao longo de tempos, no modo de precisão escolhido.
+
+    `coords` é um SkyCoord (escalar ou vetorial) e `times` qualquer conjunto de tempos
+    aceito por `times_to_jd` (ou um `Time`). `observer_location` pode ser vetorial,
+    com um local por tempo. Retorna duas matrizes N x T.
+    """
+    check_accuracy(accuracy)
+    coords = coords.reshape(-1) if not coords.isscalar else coords.reshape((1,))
+    if instrumentation.is_enabled():
+        n_times = 1 if isinstance(times, Time) and times.isscalar else np.size(times)
+        instrumentation.count('altaz_transforms')
+        instrumentation.count('altaz_points', coords.size * n_times)
+    with instrumentation.span('altaz_transform', accuracy=accuracy, targets=coords.size):
+        if accuracy == 'fast':
+            icrs = coords.icrs
+            return fast_altaz(icrs.ra.deg, icrs.dec.deg, times_to_jd(times),
+                              observer_location.lat.deg, observer_location.lon.deg)
+
+        obstime = times if isinstance(times, Time) else Time(times_to_jd(times), format='jd', scale='utc')
+        obstime = obstime.reshape(-1) if not obstime.isscalar else obstime.reshape((1,))
+        frame = AltAz(obstime=obstime[np.newaxis, :], location=observer_location)
+        altaz = coords[:, np.newaxis].transform_to(frame)
+        return altaz.alt.deg, altaz.az.deg
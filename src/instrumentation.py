@@ -0,0 +1,215 @@
+# src/instrumentation.py
+
+"""
+Módulo de Instrumentação.
+
+Intervalos de tempo aninhados ("spans") e contadores para os caminhos quentes do
+projeto: geocodificação, resolução de nomes (SIMBAD e fallback), crepúsculos,
+transformações de coordenadas e gráficos. Por padrão fica desligada: `span()`
+devolve um contexto vazio compartilhado e `count()` retorna depois de testar uma
+flag, de modo que o custo desligado é o de uma chamada de função.
+
+Uso:
+    with instrumentation.recording():
+        analyze_targets_visibility_for_night(...)
+    instrumentation.timing_report()                      # DataFrame por etapa
+    instrumentation.export_json('medicoes.json')
+    instrumentation.export_chrome_trace('trace.json')    # chrome://tracing ou Perfetto
+
+Os spans guardam a thread em que rodaram (as resoluções do fallback usam um pool de
+threads); o que roda em outros processos (`src/parallel.py`) não é registrado.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+_enabled = False
+_lock = threading.Lock()
+_local = threading.local()
+_spans = []
+_counters = {}
+_origin_ns = time.perf_counter_ns()
+
+class _NullSpan:
+    """Contexto vazio devolvido por `span()` com a instrumentação desligada."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **args):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ('name', 'args', 'start', 'depth')
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.depth = getattr(_local, 'depth', 0)
+        _local.depth = self.depth + 1
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter_ns()
+        _local.depth = self.depth
+        # list.append é atômico; não precisa de trava mesmo com várias threads.
+        _spans.append((self.name, self.start, end - self.start, threading.get_ident(), self.depth, self.args))
+        return False
+
+    def set(self, **args):
+        """Acrescenta argumentos ao span (aparecem no JSON e no trace)."""
+        self.args.update(args)
+
+def enable():
+    """Liga a instrumentação (os registros anteriores são mantidos)."""
+    global _enabled
+    _enabled = True
+
+def disable():
+    """Desliga a instrumentação."""
+    global _enabled
+    _enabled = False
+
+def is_enabled():
+    return _enabled
+
+def reset():
+    """Apaga spans e contadores e reinicia a origem dos tempos."""
+    global _origin_ns
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+        _origin_ns = time.perf_counter_ns()
+
+@contextmanager
+def recording():
+    """
+    Liga a instrumentação num bloco, a partir de registros vazios, e restaura o estado anterior.
+    """
+    global _enabled
+    previous = _enabled
+    reset()
+    _enabled = True
+    try:
+        yield
+    finally:
+        _enabled = previous
+
+def span(name, /, **args):
+    """
+    Contexto que mede um trecho: `with span('simbad_query', names=10): ...`.
+    """
+    return _Span(name, args) if _enabled else _NULL_SPAN
+
+def instrumented(name=None):
+    """
+    Decorador que mede cada chamada da função num span (por padrão com o nome da função).
+    """
+    def decorator(func):
+        label = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(label, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def count(name, value=1):
+    """Soma `value` ao contador `name` (transformações, chamadas de rede, acertos de cache...)."""
+    if _enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + value
+
+def counters():
+    """Cópia dos contadores."""
+    with _lock:
+        return dict(_counters)
+
+def spans():
+    """
+    Spans registrados, em ordem de término, como dicionários com 'name', 'start_s'
+    (desde `reset`), 'duration_s', 'thread', 'depth' e 'args'.
+    """
+    return [{'name': name, 'start_s': (start - _origin_ns) / 1e9, 'duration_s': duration / 1e9,
+             'thread': thread, 'depth': depth, 'args': dict(args)}
+            for name, start, duration, thread, depth, args in list(_spans)]
+
+def _self_times(records):
+    """Tempo próprio de cada span: a duração menos a dos spans filhos diretos (mesma thread)."""
+    own = [record['duration_s'] for record in records]
+    by_thread = {}
+    for index, record in enumerate(records):
+        by_thread.setdefault(record['thread'], []).append(index)
+    for indices in by_thread.values():
+        stack = []
+        for index in sorted(indices, key=lambda i: (records[i]['start_s'], records[i]['depth'])):
+            while stack and records[stack[-1]]['depth'] >= records[index]['depth']:
+                stack.pop()
+            if stack:
+                own[stack[-1]] -= records[index]['duration_s']
+            stack.append(index)
+    return own
+
+def timing_report():
+    """
+    Resumo por etapa: DataFrame com 'name', 'calls', 'total_s', 'self_s' (sem os spans
+    aninhados), 'mean_ms' e 'max_ms', da etapa mais cara para a mais barata.
+    """
+    import pandas as pd
+
+    columns = ['name', 'calls', 'total_s', 'self_s', 'mean_ms', 'max_ms']
+    records = spans()
+    if not records:
+        return pd.DataFrame(columns=columns)
+    frame = pd.DataFrame(records)
+    frame['self_s'] = _self_times(records)
+    report = frame.groupby('name').agg(calls=('duration_s', 'size'), total_s=('duration_s', 'sum'),
+                                       self_s=('self_s', 'sum'), mean_s=('duration_s', 'mean'),
+                                       max_s=('duration_s', 'max'))
+    report['mean_ms'] = report.pop('mean_s') * 1000
+    report['max_ms'] = report.pop('max_s') * 1000
+    return report.reset_index().sort_values('total_s', ascending=False, ignore_index=True)[columns]
+
+def _write_json(data, path):
+    if path is not None:
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump(data, handle, indent=1, ensure_ascii=False, default=str)
+    return data
+
+def export_json(path=None):
+    """
+    Spans e contadores num dicionário {'spans': [...], 'counters': {...}}, gravado em `path` se dado.
+    """
+    return _write_json({'spans': spans(), 'counters': counters()}, path)
+
+def export_chrome_trace(path=None):
+    """
+    Spans e contadores no formato Trace Event do Chrome (abre em chrome://tracing ou no
+    Perfetto): um evento completo ('X') por span e um evento de contador ('C') no fim.
+    """
+    pid = os.getpid()
+    records = spans()
+    events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': 'Analisador Astronômico'}}]
+    events += [{'name': record['name'], 'ph': 'X', 'ts': record['start_s'] * 1e6,
+                'dur': record['duration_s'] * 1e6, 'pid': pid, 'tid': record['thread'], 'args': record['args']}
+               for record in records]
+    totals = counters()
+    if totals:
+        end = max((record['start_s'] + record['duration_s'] for record in records), default=0.0)
+        events.append({'name': 'contadores', 'ph': 'C', 'ts': end * 1e6, 'pid': pid, 'args': totals})
+    return _write_json({'traceEvents': events, 'displayTimeUnit': 'ms'}, path)
@@ -6,39 +6,67 @@ Módulo de Localização.
 """
 
 # CORREÇÃO: Importar dependências diretamente, não via config.
-try:
-    from geopy.geocoders import Nominatim
-    from geopy.exc import GeocoderTimedOut, GeocoderUnavailable
-    GEOPY_USABLE = True
-except ImportError:
-    # Se o geopy não estiver instalado, define uma flag para desativar a funcionalidade
-    Nominatim = None
-    GeocoderTimedOut = None
-    GeocoderUnavailable = None
-    GEOPY_USABLE = False
+import importlib.util
 
 import pytz
 from astropy import units as u
 from astropy.coordinates import EarthLocation
 
-def get_location_from_city(city_name_input, altitude_meters=None):
+from . import instrumentation
+from .gazetteer import lookup_place, get_default_place_cache
+
+# O geopy só é importado na primeira busca por nome; aqui apenas verificamos se está instalado.
+GEOPY_USABLE = importlib.util.find_spec('geopy') is not None
+
+@instrumentation.instrumented()
+def get_location_from_city(city_name_input, altitude_meters=None, cache=None, use_network=True):
     """
-    Tenta transformar o nome de uma cidade em coordenadas geográficas usando um serviço online.
-    ... (docstring como antes) ...
+    Transforma o nome de uma cidade em coordenadas geográficas.
+
+    A busca é feita primeiro no gazetteer offline (`src/gazetteer.py`, sem rede e sem
+    distinção de acentos), depois no cache persistente de cidades já geocodificadas.
+    Só se nenhum dos dois conhecer a cidade o serviço online (Nominatim) é consultado,
+    e o resultado vai para o cache. Retorna um EarthLocation ou None.
     """
+    altitude = altitude_meters if altitude_meters is not None else 0
+
+    with instrumentation.span('gazetteer_lookup'):
+        place = lookup_place(city_name_input)
+    instrumentation.count('gazetteer_hits' if place is not None else 'gazetteer_misses')
+    if place is not None:
+        print(f"  Localização encontrada (offline): {place.name}, {place.country} - "
+              f"Latitude {place.lat_deg:.4f}°, Longitude {place.lon_deg:.4f}°")
+        return EarthLocation(lat=place.lat_deg*u.deg, lon=place.lon_deg*u.deg, height=altitude*u.m)
+
+    cache = cache if cache is not None else get_default_place_cache()
+    cached = cache.get(city_name_input)
+    instrumentation.count('place_cache_hits' if cached is not None else 'place_cache_misses')
+    if cached is not None:
+        latitude, longitude = cached
+        print(f"  Localização encontrada (cache): Latitude {latitude:.4f}°, Longitude {longitude:.4f}°")
+        return EarthLocation(lat=latitude*u.deg, lon=longitude*u.deg, height=altitude*u.m)
+
+    if not use_network:
+        print(f"  Não foi possível encontrar '{city_name_input}' no gazetteer offline.")
+        return None
     if not GEOPY_USABLE:
         print("AVISO: A biblioteca 'geopy' não está disponível. Não é possível buscar a cidade pelo nome.")
         return None
 
+    from geopy.geocoders import Nominatim
+    from geopy.exc import GeocoderTimedOut, GeocoderUnavailable
+
     print(f"Buscando coordenadas geográficas para: '{city_name_input}'...")
     try:
         geolocator = Nominatim(user_agent="astro_planner_modular/1.0")
-        location_data = geolocator.geocode(city_name_input, timeout=10)
+        instrumentation.count('network_calls')
+        with instrumentation.span('nominatim_geocode'):
+            location_data = geolocator.geocode(city_name_input, timeout=10)
 
         if location_data:
             latitude = location_data.latitude
             longitude = location_data.longitude
-            altitude = altitude_meters if altitude_meters is not None else 0
+            cache.put(city_name_input, latitude, longitude)
 
             print(f"  Localização encontrada: Latitude {latitude:.4f}°, Longitude {longitude:.4f}°")
             print(f"  Altitude definida como: {altitude}m")
@@ -74,6 +102,3 @@ def set_timezone_for_sao_paulo(location):
     if -53 < location.lon.deg < -34 and -34 < location.lat.deg < 5:
         return pytz.timezone('America/Sao_Paulo')
     return None # Retorna None se estiver fora da área
-
-
-print("Módulo de Localização (src/location.py) carregado.")
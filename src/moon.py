@@ -0,0 +1,118 @@
+# src/moon.py
+
+"""
+Módulo da Camada Lunar.
+
+Calcula a Lua uma única vez por grade de tempos e reaproveita o resultado para
+todos os alvos:
+    - posição, altitude/azimute e fração iluminada da Lua ao longo da grade da
+      noite (`compute_moon_layer`), a partir das efemérides interpoladas de
+      `src/ephemeris.py`;
+    - a matriz alvos x tempos da separação angular entre cada alvo e a Lua
+      (`moon_separation`), obtida das altitudes/azimutes que a análise já calculou,
+      sem nenhuma transformação de coordenadas adicional;
+    - a máscara de afastamento mínimo da Lua (`moon_avoidance_mask`);
+    - para análises de muitas noites, um valor por noite (`compute_nightly_moon`).
+
+A fração iluminada segue a mesma fórmula do `astroplan.moon_illumination`
+(ângulo de fase a partir da elongação Sol-Lua e das distâncias geocêntricas).
+"""
+import numpy as np
+from astropy.time import Time
+
+from .ephemeris import get_body_ephemeris
+from .horizon import check_accuracy, times_to_jd
+
+def moon_illumination_from_xyz(moon_xyz, sun_xyz):
+    """
+    Fração iluminada da Lua (0 a 1) a partir das posições geocêntricas (T x 3, mesma unidade).
+    """
+    moon_xyz = np.atleast_2d(moon_xyz)
+    sun_xyz = np.atleast_2d(sun_xyz)
+    moon_distance = np.linalg.norm(moon_xyz, axis=-1)
+    sun_distance = np.linalg.norm(sun_xyz, axis=-1)
+    cos_elongation = np.einsum('tc,tc->t', moon_xyz, sun_xyz) / (moon_distance * sun_distance)
+    elongation = np.arccos(np.clip(cos_elongation, -1.0, 1.0))
+    phase_angle = np.arctan2(sun_distance * np.sin(elongation), moon_distance - sun_distance * np.cos(elongation))
+    return (1.0 + np.cos(phase_angle)) / 2.0
+
+def _time_span(jd):
+    return Time([jd.min(), jd.max()], format='jd', scale='utc')
+
+def compute_moon_layer(times, observer_location, accuracy='exact'):
+    """
+    Altitude, azimute e fração iluminada da Lua ao longo de uma grade de tempos.
+
+    `times` é a grade da análise (p. ex. `analyze_targets_visibility_for_night(...)['time']`).
+    As efemérides da Lua e do Sol são ajustadas uma vez para o intervalo e avaliadas em
+    todos os instantes. Retorna um dicionário com 'time', 'altitude', 'azimuth' (graus)
+    e 'illumination' (0 a 1), todos do tamanho da grade.
+    """
+    check_accuracy(accuracy)
+    jd = times_to_jd(times)
+    if jd.size == 0:
+        empty = np.empty(0)
+        return {'time': times, 'altitude': empty, 'azimuth': empty.copy(), 'illumination': empty.copy()}
+
+    span = _time_span(jd)
+    moon = get_body_ephemeris('moon', span[0], span[1])
+    sun = get_body_ephemeris('sun', span[0], span[1])
+    altitude, azimuth = moon.altaz(times, observer_location, accuracy)
+    illumination = moon_illumination_from_xyz(moon.gcrs_xyz(times), sun.gcrs_xyz(times))
+    return {'time': times, 'altitude': altitude, 'azimuth': azimuth, 'illumination': illumination}
+
+def moon_separation(target_altitude, target_azimuth, moon_altitude, moon_azimuth):
+    """
+    Separação angular (graus) entre alvos e a Lua a partir das coordenadas horizontais.
+
+    Os alvos são matrizes N x T e a Lua arrays de tamanho T (ou qualquer combinação
+    compatível por broadcasting). Como as duas posições são topocêntricas, a paralaxe
+    da Lua já está incluída.
+    """
+    alt1, az1 = np.radians(target_altitude), np.radians(target_azimuth)
+    alt2, az2 = np.radians(moon_altitude), np.radians(moon_azimuth)
+    cos_separation = np.sin(alt1) * np.sin(alt2) + np.cos(alt1) * np.cos(alt2) * np.cos(az1 - az2)
+    return np.degrees(np.arccos(np.clip(cos_separation, -1.0, 1.0)))
+
+def moon_avoidance_mask(separation, moon_altitude, min_separation_deg):
+    """
+    Máscara (mesma forma de `separation`) dos instantes em que a Lua não atrapalha:
+    separação de pelo menos `min_separation_deg` ou Lua abaixo do horizonte.
+    """
+    return (np.asarray(separation) >= min_separation_deg) | (np.asarray(moon_altitude) < 0)
+
+def xyz_to_radec(xyz):
+    """
+    RA e Dec (graus) e distância (mesma unidade) de posições cartesianas T x 3.
+    """
+    x, y, z = np.atleast_2d(xyz).T
+    distance = np.sqrt(x * x + y * y + z * z)
+    return np.mod(np.degrees(np.arctan2(y, x)), 360.0), np.degrees(np.arcsin(z / distance)), distance
+
+def compute_nightly_moon(reference_times):
+    """
+    Um valor da Lua por noite, para análises de muitas noites (p. ex. um ano).
+
+    `reference_times` traz um instante por noite (p. ex. a meia-noite). Retorna um
+    dicionário com 'ra' e 'dec' geocêntricos (graus), 'distance' (km) e 'illumination'
+    (0 a 1) da Lua em cada instante, a partir de uma única efeméride para o período.
+    """
+    jd = times_to_jd(reference_times)
+    span = _time_span(jd)
+    moon_xyz = get_body_ephemeris('moon', span[0], span[1]).gcrs_xyz(reference_times)
+    sun_xyz = get_body_ephemeris('sun', span[0], span[1]).gcrs_xyz(reference_times)
+    ra, dec, distance = xyz_to_radec(moon_xyz)
+    return {
+        'ra': ra,
+        'dec': dec,
+        'distance': distance,
+        'illumination': moon_illumination_from_xyz(moon_xyz, sun_xyz),
+    }
+
+def angular_separation(ra1, dec1, ra2, dec2):
+    """
+    Separação angular (graus) entre direções equatoriais (graus), com broadcasting.
+    """
+    ra1, dec1, ra2, dec2 = (np.radians(value) for value in (ra1, dec1, ra2, dec2))
+    cos_separation = np.sin(dec1) * np.sin(dec2) + np.cos(dec1) * np.cos(dec2) * np.cos(ra1 - ra2)
+    return np.degrees(np.arccos(np.clip(cos_separation, -1.0, 1.0)))
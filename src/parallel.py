@@ -0,0 +1,166 @@
+# src/parallel.py
+
+"""
+Módulo de Execução Paralela.
+
+Divide calendários de visibilidade (anuais ou plurianuais) em blocos de meses e
+os distribui num pool de processos (`concurrent.futures`). Os processos recebem
+apenas descrições simples e serializáveis do local e dos alvos (`SiteSpec` e
+`TargetSpec`) e reconstroem os objetos do astropy do seu lado.
+"""
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, timedelta
+
+import pandas as pd
+from astropy import units as u
+from astropy.coordinates import EarthLocation, SkyCoord
+
+from .analysis import get_night_events_table, _evaluate_target_on_nights
+from .catalog import TargetCatalog
+
+SiteSpec = namedtuple('SiteSpec', ['lat_deg', 'lon_deg', 'height_m', 'timezone'])
+TargetSpec = namedtuple('TargetSpec', ['name', 'ra_deg', 'dec_deg'])
+
+RESULT_COLUMNS = ['date', 'start_time', 'end_time', 'duration_hours']
+
+def site_spec_from_location(observer_location, observer_timezone=None):
+    """
+    Cria um `SiteSpec` a partir de um EarthLocation (e, opcionalmente, de um fuso do pytz).
+    """
+    timezone = getattr(observer_timezone, 'zone', None) or (str(observer_timezone) if observer_timezone else 'UTC')
+    return SiteSpec(
+        lat_deg=float(observer_location.lat.deg),
+        lon_deg=float(observer_location.lon.deg),
+        height_m=float(observer_location.height.to_value(u.m)),
+        timezone=timezone,
+    )
+
+def target_specs_from_coords(targets):
+    """
+    Converte um dicionário nome -> SkyCoord (formato de `get_target_skycoords`) ou um
+    `TargetCatalog` em `TargetSpec`s.
+
+    Os workers só recebem alvos fixos (RA/Dec): entradas None, efemérides do Sistema
+    Solar (`registrar_alvos_sistema_solar(..., end_time)`) e nomes de corpos são
+    ignorados, com um aviso listando os alvos em movimento, como em
+    `TargetCatalog.from_skycoords`.
+    """
+    from .ephemeris import is_moving_target
+
+    if isinstance(targets, TargetCatalog):
+        return [TargetSpec(name, float(ra), float(dec))
+                for name, ra, dec in zip(targets.names, targets.ra_deg, targets.dec_deg)]
+    specs, moving = [], []
+    for name, coord in targets.items():
+        if coord is None:
+            continue
+        if isinstance(coord, str) or is_moving_target(coord):
+            moving.append(name)
+            continue
+        icrs = coord.icrs
+        specs.append(TargetSpec(name=name, ra_deg=float(icrs.ra.deg), dec_deg=float(icrs.dec.deg)))
+    if moving:
+        print(f"  AVISO: alvos em movimento ignorados na execução paralela: {', '.join(moving)}.")
+    return specs
+
+def month_chunks(start_date, end_date, months_per_chunk=1):
+    """
+    Divide o intervalo [start_date, end_date] em blocos consecutivos de meses do calendário.
+    """
+    chunks = []
+    chunk_start = start_date
+    while chunk_start <= end_date:
+        month_index = chunk_start.year * 12 + chunk_start.month - 1 + months_per_chunk
+        next_start = date(month_index // 12, month_index % 12 + 1, 1)
+        chunk_end = min(next_start - timedelta(days=1), end_date)
+        chunks.append((chunk_start, chunk_end))
+        chunk_start = chunk_end + timedelta(days=1)
+    return chunks
+
+def _analyze_chunk(site, targets, chunk_start, chunk_end, min_altitude_deg):
+    """
+    Trabalho executado em cada processo: eventos noturnos do bloco (uma vez) e todos os alvos.
+    """
+    location = EarthLocation(lat=site.lat_deg * u.deg, lon=site.lon_deg * u.deg, height=site.height_m * u.m)
+    night_events = get_night_events_table(chunk_start, chunk_end, location, site.timezone)
+
+    return {
+        target.name: _evaluate_target_on_nights(
+            night_events, location, SkyCoord(ra=target.ra_deg * u.deg, dec=target.dec_deg * u.deg),
+            min_altitude_deg * u.deg
+        )
+        for target in targets
+    }
+
+def _run_chunks(chunks, site, targets, min_altitude, max_workers, progress_callback):
+    """
+    Executa os blocos (em processo quando max_workers == 1) e devolve os resultados na ordem dos blocos.
+    """
+    min_altitude_deg = min_altitude.to_value(u.deg)
+    results = [None] * len(chunks)
+
+    if max_workers == 1:
+        for done, (chunk_start, chunk_end) in enumerate(chunks, start=1):
+            results[done - 1] = _analyze_chunk(site, targets, chunk_start, chunk_end, min_altitude_deg)
+            if progress_callback:
+                progress_callback(done, len(chunks))
+        return results
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(_analyze_chunk, site, targets, chunk_start, chunk_end, min_altitude_deg): index
+            for index, (chunk_start, chunk_end) in enumerate(chunks)
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            results[futures[future]] = future.result()
+            if progress_callback:
+                progress_callback(done, len(chunks))
+    return results
+
+def _merge_results(results, targets, store=None):
+    """
+    Concatena, por alvo, os DataFrames de cada bloco (já em ordem cronológica). Com `store`
+    (um `YearStore`), os blocos são acrescentados a ele e o próprio armazenamento é devolvido.
+    """
+    if store is not None:
+        for target in targets:
+            store.append(target.name, pd.DataFrame(columns=RESULT_COLUMNS))
+            for chunk in results:
+                store.append(target.name, chunk[target.name])
+        return store
+    merged = {}
+    for target in targets:
+        frames = [chunk[target.name] for chunk in results if not chunk[target.name].empty]
+        merged[target.name] = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=RESULT_COLUMNS)
+    return merged
+
+def analyze_date_range_parallel(start_date, end_date, site, targets, min_altitude, max_workers=None,
+                                months_per_chunk=1, progress_callback=None, store=None):
+    """
+    Analisa a visibilidade de vários alvos em cada noite de um intervalo de datas, em paralelo.
+
+    O intervalo é dividido em blocos de `months_per_chunk` meses, distribuídos num pool de
+    `max_workers` processos (None = número de CPUs; 1 = executa no próprio processo).
+    `progress_callback(concluidos, total)` é chamado a cada bloco terminado, no lugar da
+    barra de progresso do tqdm.
+
+    Retorna um dicionário nome do alvo -> DataFrame no formato de `analyze_year_visibility`,
+    em ordem cronológica independentemente da ordem de conclusão dos blocos. Com `store`
+    (um `YearStore` de `src/yearstore.py`) os resultados são acrescentados a ele em colunas
+    tipadas e o armazenamento é devolvido no lugar do dicionário.
+    """
+    chunks = month_chunks(start_date, end_date, months_per_chunk)
+    results = _run_chunks(chunks, site, targets, min_altitude, max_workers, progress_callback)
+    return _merge_results(results, targets, store)
+
+def analyze_years_parallel(years, site, targets, min_altitude, max_workers=None, months_per_chunk=1,
+                           progress_callback=None, store=None):
+    """
+    Versão de `analyze_date_range_parallel` para uma lista de anos (não necessariamente consecutivos).
+    """
+    chunks = []
+    for year in sorted(set(years)):
+        chunks.extend(month_chunks(date(year, 1, 1), date(year, 12, 31), months_per_chunk))
+    results = _run_chunks(chunks, site, targets, min_altitude, max_workers, progress_callback)
+    return _merge_results(results, targets, store)
@@ -3,20 +3,33 @@
 """
 Módulo de Plotagem.
 Contém funções para gerar todas as visualizações de dados astronômicos.
+
+matplotlib e seaborn só são importados quando um gráfico é gerado, de modo que
+importar este módulo não carrega as bibliotecas de visualização.
 """
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 from astropy import units as u
-from matplotlib.dates import DateFormatter
-import seaborn as sns
-from astropy.coordinates import SkyCoord, AltAz
+from astropy.time import Time
+
+from . import instrumentation
+from .analysis import compute_sky_positions
+from .render import get_default_render_cache, render_key
+from .yearstore import YearStore
+
+SKY_MAP_LEGEND_LIMIT = 20
+SMALL_MULTIPLES_COLUMNS = 4
+SMALL_MULTIPLES_PANEL_SIZE = (4.0, 2.4)  # polegadas (largura, altura) por painel
 
+@instrumentation.instrumented()
 def plot_target_visibility(df_visible, target_name, analysis_date, min_altitude_deg):
     """
     Gera um gráfico da altitude do alvo ao longo do tempo para uma noite.
     """
+    import matplotlib.pyplot as plt
+    from matplotlib.dates import DateFormatter
+
     fig, ax = plt.subplots(figsize=(12, 6))
 
     if not df_visible.empty:
@@ -39,18 +52,118 @@ def plot_target_visibility(df_visible, target_name, analysis_date, min_altitude_
 
     return fig
 
-def plot_sky_map(targets_coords, observer_location, time):
+def render_target_visibility(df_visible, target_name, analysis_date, min_altitude_deg, cache=None):
+    """
+    PNG (bytes) de `plot_target_visibility`, servido pelo cache de renderização
+    (`src/render.py`) quando os dados e o estilo não mudaram.
+    """
+    cache = cache if cache is not None else get_default_render_cache()
+    key = render_key('target_visibility', df_visible['time'], df_visible['altitude'], target_name,
+                     analysis_date.isoformat(), float(min_altitude_deg))
+    return cache.render(key, lambda: plot_target_visibility(df_visible, target_name, analysis_date,
+                                                            min_altitude_deg))
+
+@instrumentation.instrumented()
+def plot_visibility_small_multiples(night_visibility, target_names, min_altitude_deg, analysis_date,
+                                    ncols=SMALL_MULTIPLES_COLUMNS):
+    """
+    Desenha as curvas de altitude de vários alvos numa única figura (small multiples).
+
+    `night_visibility` é o resultado de `analyze_targets_visibility_for_night`. Cada alvo
+    ganha um painel pequeno, com eixos de tempo e altitude compartilhados, a janela
+    acima de `min_altitude_deg` preenchida e a linha da elevação mínima. A figura é
+    criada fora do pyplot, com o backend Agg.
+
+    Para manter o custo baixo com muitos painéis, os tempos são convertidos uma única
+    vez em números de data do matplotlib, os ticks usam um localizador fixo (de 2 em 2
+    horas) e só os painéis da borda mostram rótulos dos eixos.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.dates import DateFormatter, HourLocator, date2num
+    from matplotlib.figure import Figure
+
+    target_names = list(target_names)
+    rows = [night_visibility['names'].index(name) for name in target_names]
+    x = date2num(night_visibility['time'].to_numpy())
+    ncols = max(1, min(ncols, len(target_names)))
+    nrows = max(1, -(-len(target_names) // ncols))
+
+    width, height = SMALL_MULTIPLES_PANEL_SIZE
+    fig = Figure(figsize=(width * ncols, height * nrows))
+    FigureCanvasAgg(fig)
+    axes = fig.subplots(nrows, ncols, sharex=True, sharey=True, squeeze=False)
+    fig.subplots_adjust(left=0.9 / (width * ncols), right=1 - 0.2 / (width * ncols),
+                        bottom=0.7 / (height * nrows), top=1 - 0.7 / (height * nrows), wspace=0.05, hspace=0.3)
+    axes[0, 0].set_ylim(0, 90)
+    axes[0, 0].xaxis.set_major_locator(HourLocator(interval=2))
+    axes[0, 0].xaxis.set_major_formatter(DateFormatter('%H:%M'))
+
+    for ax, name, row in zip(axes.ravel(), target_names, rows):
+        altitude = night_visibility['altitude'][row]
+        ax.plot(x, altitude, color='royalblue', linewidth=1.2)
+        ax.fill_between(x, min_altitude_deg, altitude, where=altitude >= min_altitude_deg,
+                        color='green', alpha=0.3)
+        ax.axhline(min_altitude_deg, color='red', linestyle='--', linewidth=0.8)
+        ax.set_title(name, fontsize=10, pad=3)
+        ax.grid(True, linestyle=':', alpha=0.7)
+        ax.label_outer()
+    for ax in axes.ravel()[len(target_names):]:
+        ax.set_visible(False)
+    # Painéis acima de uma célula vazia ficam na borda de baixo e mantêm os rótulos de hora
+    n_empty = nrows * ncols - len(target_names)
+    if n_empty and nrows > 1:
+        for ax in axes[-2, ncols - n_empty:]:
+            ax.xaxis.set_tick_params(labelbottom=True)
+
+    fig.supxlabel(f'Hora (UTC) em {analysis_date.strftime("%Y-%m-%d")}')
+    fig.supylabel('Altitude (graus)', x=0.25 / (width * ncols))
+    fig.suptitle(f'Visibilidade dos alvos (elevação mínima {min_altitude_deg}°)')
+    return fig
+
+def render_visibility_small_multiples(night_visibility, target_names, min_altitude_deg, analysis_date,
+                                      ncols=SMALL_MULTIPLES_COLUMNS, cache=None):
+    """
+    PNG (bytes) de `plot_visibility_small_multiples`, servido pelo cache de renderização.
+    A chave cobre a grade de tempos, as curvas dos alvos escolhidos e o estilo.
+    """
+    cache = cache if cache is not None else get_default_render_cache()
+    target_names = list(target_names)
+    rows = [night_visibility['names'].index(name) for name in target_names]
+    key = render_key('small_multiples', night_visibility['time'], night_visibility['altitude'][rows],
+                     target_names, float(min_altitude_deg), analysis_date.isoformat(), ncols,
+                     SMALL_MULTIPLES_PANEL_SIZE)
+    return cache.render(key, lambda: plot_visibility_small_multiples(night_visibility, target_names,
+                                                                     min_altitude_deg, analysis_date, ncols))
+
+@instrumentation.instrumented()
+def plot_sky_map(targets_coords, observer_location, time, accuracy='exact', positions=None):
     """
     Gera um mapa do céu (plot polar) mostrando a posição dos alvos em um tempo específico.
+
+    `targets_coords` aceita os formatos de `compute_sky_positions` (dicionário de
+    SkyCoords/efemérides, `TargetCatalog` ou colunas nomes, ra, dec); todos os alvos
+    são transformados de uma vez (`accuracy='fast'` usa o núcleo analítico). Se
+    `positions` (resultado de `compute_sky_positions`) for informado, a transformação
+    é reaproveitada e `targets_coords` é ignorado. Os alvos são desenhados numa única
+    chamada `scatter`, o que mantém mapas com milhares de objetos interativos; a
+    legenda só é montada até `SKY_MAP_LEGEND_LIMIT` alvos.
     """
-    frame = AltAz(obstime=time, location=observer_location)
+    import matplotlib.pyplot as plt
+    from matplotlib.lines import Line2D
 
-    fig, ax = plt.subplots(figsize=(10, 10), subplot_kw={'projection': 'polar'})
+    time = time if isinstance(time, Time) else Time(time)
+    if positions is None:
+        positions = compute_sky_positions(targets_coords, observer_location, time, accuracy)
+    altitude = np.asarray(positions['altitude'], dtype=float)
+    azimuth = np.asarray(positions['azimuth'], dtype=float)
+    above = altitude > 0  # Apenas plotar objetos acima do horizonte
+    names = [name for name, keep in zip(positions['names'], above) if keep]
 
-    for name, coord in targets_coords.items():
-        altaz = coord.transform_to(frame)
-        if altaz.alt > 0: # Apenas plotar objetos acima do horizonte
-            ax.plot(altaz.az.radian, 90 - altaz.alt.deg, 'o', label=name, markersize=10)
+    fig, ax = plt.subplots(figsize=(10, 10), subplot_kw={'projection': 'polar'})
+    few = len(names) <= SKY_MAP_LEGEND_LIMIT
+    colors = plt.get_cmap('tab20')(np.arange(len(names)) % 20)
+    ax.scatter(np.radians(azimuth[above]), 90 - altitude[above], c=colors, s=100 if few else 6,
+               linewidths=0)
 
     ax.set_theta_zero_location('N')
     ax.set_theta_direction(-1)
@@ -58,29 +171,62 @@ def plot_sky_map(targets_coords, observer_location, time):
     ax.set_yticks([0, 30, 60, 90])  # Definir posições dos ticks
     ax.set_yticklabels(['90° (Zênite)', '60°', '30°', '0° (Horizonte)'])
     ax.set_title(f'Mapa do Céu em {time.to_datetime():%Y-%m-%d %H:%M} UTC')
-    ax.legend(bbox_to_anchor=(1.1, 1.1))
+    if names and few:
+        handles = [Line2D([], [], marker='o', linestyle='', color=color, markersize=10) for color in colors]
+        ax.legend(handles, names, bbox_to_anchor=(1.1, 1.1))
     ax.grid(True)
 
     return fig
 
+def _yearly_heatmap_frame(days, durations):
+    """
+    Matriz mês x dia (12 x 31, NaN nas noites sem visibilidade) a partir das datas das noites.
+    """
+    days = np.asarray(days).astype('datetime64[D]')
+    month_start = days.astype('datetime64[M]')
+    grid = np.full((12, 31), np.nan)
+    grid[month_start.astype(int) % 12, (days - month_start).astype(int)] = durations
+    return pd.DataFrame(grid, index=np.arange(1, 13), columns=np.arange(1, 32))
+
+@instrumentation.instrumented()
 def plot_yearly_visibility(df_year, target_name, year):
     """
     Gera um mapa de calor para visualizar a visibilidade de um alvo ao longo do ano.
+
+    `df_year` pode ser o DataFrame de `analyze_year_visibility` ou um `YearStore`
+    (`src/yearstore.py`); no segundo caso só as colunas 'date' e 'duration_hours' do
+    alvo e do ano são lidas, sem montar um DataFrame. Nos dois casos só as noites de
+    `year` entram no gráfico.
     """
-    if df_year.empty:
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    if isinstance(df_year, YearStore):
+        nights = df_year.select(target_name, year, ['date', 'duration_hours'])
+        days, durations = nights['date'].astype('datetime64[D]'), nights['duration_hours']
+        min_alt = df_year.min_altitude_deg if df_year.min_altitude_deg is not None else 30
+    else:
+        min_alt = df_year.get("min_alt", 30)
+        if df_year.empty:
+            days, durations = np.empty(0), np.empty(0)
+        else:
+            # Como no caminho do YearStore, só as noites do ano pedido (um resultado de
+            # vários anos sobrescreveria as mesmas células mês x dia).
+            dates = pd.to_datetime(df_year['date'])
+            in_year = (dates.dt.year == year).to_numpy()
+            days = dates.to_numpy()[in_year]
+            durations = df_year['duration_hours'].to_numpy(dtype=float)[in_year]
+
+    if len(days) == 0:
         print(f"Nenhum dado de visibilidade para plotar para {target_name} em {year}.")
         return None # Retornar None se não houver dados
 
-    # Preparar os dados para o heatmap
-    df_year['month'] = pd.to_datetime(df_year['date']).dt.month
-    df_year['day'] = pd.to_datetime(df_year['date']).dt.day
-
-    heatmap_data = df_year.pivot_table(index='month', columns='day', values='duration_hours')
+    heatmap_data = _yearly_heatmap_frame(days, durations)
 
     fig, ax = plt.subplots(figsize=(18, 7))
     sns.heatmap(heatmap_data, cmap='viridis', robust=True, ax=ax, cbar_kws={'label': 'Horas de Visibilidade'})
 
-    ax.set_title(f'Calendário de Visibilidade para {target_name} em {year} (horas > {df_year.get("min_alt", 30)}°)')
+    ax.set_title(f'Calendário de Visibilidade para {target_name} em {year} (horas > {min_alt}°)')
     ax.set_xlabel('Dia do Mês')
     ax.set_ylabel('Mês')
     ax.set_yticks(ticks=np.arange(12) + 0.5, labels=[
@@ -89,5 +235,3 @@ def plot_yearly_visibility(df_year, target_name, year):
     ], rotation=0)
 
     return fig
-
-print("Módulo de Plotagem (src/plotting.py) carregado e aprimorado.")
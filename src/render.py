@@ -0,0 +1,150 @@
+# src/render.py
+
+"""
+Módulo de Cache de Renderização.
+
+Rasterizar uma figura do matplotlib custa bem mais do que calcular os dados dela.
+Este módulo guarda os PNGs já gerados, endereçados pelo conteúdo: a chave é um hash
+SHA-256 dos arrays de entrada e dos parâmetros de estilo, de modo que um gráfico
+cujos dados não mudaram nunca é rasterizado de novo, venha de qual chamada vier.
+
+Os PNGs ficam num LRU em memória e, opcionalmente, num diretório (um arquivo
+`<chave>.png` por figura). A rasterização usa sempre o backend não interativo Agg,
+sem depender do backend configurado no pyplot.
+"""
+import hashlib
+import io
+import os
+import sys
+from collections import OrderedDict
+
+import numpy as np
+
+from . import instrumentation
+
+DEFAULT_MAXSIZE = 256
+
+def _hash_part(digest, part):
+    if hasattr(part, 'to_numpy'):  # Series / Index / DataFrame do pandas
+        part = part.to_numpy()
+    if isinstance(part, np.ndarray) and part.dtype != object:
+        array = np.ascontiguousarray(part)
+        digest.update(f'{array.dtype.str}{array.shape}'.encode())
+        digest.update(array.tobytes())
+    elif isinstance(part, (list, tuple)):
+        digest.update(f'seq{len(part)}'.encode())
+        for item in part:
+            _hash_part(digest, item)
+    else:
+        digest.update(repr(part).encode())
+    digest.update(b'\x00')
+
+def render_key(*parts):
+    """
+    Chave de conteúdo (hex SHA-256) de arrays NumPy/pandas e parâmetros de estilo.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        _hash_part(digest, part)
+    return digest.hexdigest()
+
+def figure_to_png(fig, dpi=None):
+    """
+    Rasteriza uma figura em PNG (bytes) com o backend Agg e a libera.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    if not isinstance(fig.canvas, FigureCanvasAgg):
+        FigureCanvasAgg(fig)
+    buffer = io.BytesIO()
+    with instrumentation.span('rasterize_png'):
+        fig.savefig(buffer, format='png', dpi=dpi)
+    if 'matplotlib.pyplot' in sys.modules:
+        sys.modules['matplotlib.pyplot'].close(fig)
+    return buffer.getvalue()
+
+class RenderCache:
+    """
+    Cache LRU de PNGs endereçado por conteúdo, com persistência opcional em disco.
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, directory=None):
+        self.maxsize = maxsize
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.png')
+
+    def get(self, key):
+        """
+        Retorna os bytes PNG da chave, ou None se ainda não foram renderizados.
+        """
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            instrumentation.count('render_cache_hits')
+            return self._memory[key]
+        if self.directory and os.path.exists(self._path(key)):
+            with open(self._path(key), 'rb') as file:
+                png = file.read()
+            self._remember(key, png)
+            self.hits += 1
+            instrumentation.count('render_cache_hits')
+            return png
+        self.misses += 1
+        instrumentation.count('render_cache_misses')
+        return None
+
+    def put(self, key, png):
+        """
+        Guarda os bytes PNG de uma chave.
+        """
+        self._remember(key, png)
+        if self.directory:
+            with open(self._path(key), 'wb') as file:
+                file.write(png)
+
+    def _remember(self, key, png):
+        self._memory[key] = png
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def render(self, key, build_figure):
+        """
+        Retorna o PNG da chave; só chama `build_figure()` e rasteriza se ele não estiver no cache.
+        """
+        png = self.get(key)
+        if png is None:
+            png = figure_to_png(build_figure())
+            self.put(key, png)
+        return png
+
+    def clear(self):
+        self._memory.clear()
+
+    def __len__(self):
+        return len(self._memory)
+
+_default_render_cache = None
+
+def get_default_render_cache():
+    """
+    Retorna o cache de renderização padrão do processo (em memória, criado na primeira chamada).
+    """
+    global _default_render_cache
+    if _default_render_cache is None:
+        _default_render_cache = RenderCache()
+    return _default_render_cache
+
+def set_default_render_cache(cache):
+    """
+    Substitui o cache de renderização padrão do processo (p. ex. por um com diretório em disco).
+    """
+    global _default_render_cache
+    _default_render_cache = cache
@@ -0,0 +1,180 @@
+# src/resolver.py
+
+"""
+Módulo de Resolução Local de Alvos.
+
+Camada consultada antes de qualquer acesso à rede para transformar nomes de alvos
+em coordenadas:
+    1. um catálogo offline empacotado com o projeto (Messier, NGC e estrelas
+       brilhantes, em `src/data/offline_catalog.csv`);
+    2. um cache persistente em disco (SQLite) com os nomes já resolvidos pela rede,
+       com prazo de validade (TTL).
+
+Os nomes são normalizados antes da busca, de modo que "m 31", "M31" e "M031"
+são o mesmo alvo.
+"""
+import csv
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+from functools import lru_cache
+
+CATALOG_PATH = os.path.join(os.path.dirname(__file__), 'data', 'offline_catalog.csv')
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'skyler')
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+
+_CATALOG_NUMBER = re.compile(r'^(M|NGC|IC)0*(\d)')
+_SEPARATORS = re.compile(r'[\s_\-.]+')
+
+def get_cache_dir():
+    """
+    Diretório dos caches persistentes (pode ser alterado pela variável SKYLER_CACHE_DIR).
+    """
+    return os.environ.get('SKYLER_CACHE_DIR', DEFAULT_CACHE_DIR)
+
+def _drop_separator(match):
+    """Remove um separador, exceto entre dois dígitos ("M2-9" é Minkowski 2-9, não M29)."""
+    text, start, end = match.string, match.start(), match.end()
+    between_digits = 0 < start and end < len(text) and text[start - 1].isdigit() and text[end].isdigit()
+    return '-' if between_digits else ''
+
+def normalize_target_name(name):
+    """
+    Normaliza um nome de alvo: sem acentos, maiúsculo, sem espaços/separadores e sem
+    zeros à esquerda nos números de catálogo ("m 31" -> "M31", "NGC 0224" -> "NGC224").
+    Um separador entre dígitos vira '-' em vez de sumir ("M 2-9" -> "M2-9", distinto de "M29").
+    """
+    text = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode('ascii')
+    text = _SEPARATORS.sub(_drop_separator, text.upper())
+    return _CATALOG_NUMBER.sub(r'\1\2', text)
+
+@lru_cache(maxsize=1)
+def load_offline_catalog(path=CATALOG_PATH):
+    """
+    Carrega o catálogo offline e devolve um dicionário nome normalizado -> (nome, ra_graus, dec_graus).
+
+    Cada objeto é indexado pelo nome principal e por todos os seus apelidos.
+    """
+    index = {}
+    with open(path, encoding='utf-8') as f:
+        reader = csv.DictReader(line for line in f if not line.startswith('#'))
+        for row in reader:
+            entry = (row['name'], float(row['ra_deg']), float(row['dec_deg']))
+            keys = [row['name']] + [alias for alias in row['aliases'].split(';') if alias]
+            for key in keys:
+                index.setdefault(normalize_target_name(key), entry)
+    return index
+
+def lookup_offline(name):
+    """
+    Procura um alvo no catálogo offline. Retorna (ra_graus, dec_graus) ou None.
+    """
+    entry = load_offline_catalog().get(normalize_target_name(name))
+    return (entry[1], entry[2]) if entry else None
+
+class TargetCache:
+    """
+    Cache persistente (SQLite) de nomes de alvos resolvidos pela rede.
+
+    As entradas são indexadas pelo nome normalizado e expiram após `ttl_seconds`.
+    Se o arquivo não puder ser criado (p. ex. disco somente leitura), o cache passa
+    a funcionar apenas em memória.
+    """
+
+    def __init__(self, path=None, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.path = path or os.path.join(get_cache_dir(), 'targets.sqlite')
+        self.ttl_seconds = ttl_seconds
+        try:
+            if self.path != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._create_table()
+        except (OSError, sqlite3.Error) as e:
+            print(f"  AVISO: Cache de alvos indisponível em '{self.path}', usando memória. Erro: {e}")
+            self.path = ':memory:'
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._create_table()
+
+    def _create_table(self):
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS targets ("
+                " key TEXT PRIMARY KEY, name TEXT, ra_deg REAL, dec_deg REAL,"
+                " source TEXT, resolved_at REAL)"
+            )
+
+    def get(self, name, now=None):
+        """
+        Retorna (ra_graus, dec_graus) se o nome estiver no cache e não tiver expirado; senão None.
+        """
+        now = time.time() if now is None else now
+        row = self._conn.execute(
+            "SELECT ra_deg, dec_deg, resolved_at FROM targets WHERE key = ?", (normalize_target_name(name),)
+        ).fetchone()
+        if row is None or now - row[2] > self.ttl_seconds:
+            return None
+        return row[0], row[1]
+
+    def put(self, name, ra_deg, dec_deg, source='network', now=None):
+        """
+        Armazena (ou atualiza) a resolução de um nome.
+        """
+        now = time.time() if now is None else now
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO targets (key, name, ra_deg, dec_deg, source, resolved_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (normalize_target_name(name), name, float(ra_deg), float(dec_deg), source, now)
+            )
+
+    def purge_expired(self, now=None):
+        """
+        Remove as entradas expiradas e retorna quantas foram removidas.
+        """
+        now = time.time() if now is None else now
+        with self._conn:
+            cursor = self._conn.execute("DELETE FROM targets WHERE ? - resolved_at > ?", (now, self.ttl_seconds))
+        return cursor.rowcount
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM targets").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+_default_cache = None
+
+def get_default_cache():
+    """
+    Retorna o cache de alvos padrão do processo (criado na primeira chamada).
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = TargetCache()
+    return _default_cache
+
+def resolve_locally(target_names_list, cache=None):
+    """
+    Resolve o que for possível sem rede (catálogo offline e cache persistente).
+
+    Retorna (resolvidos, pendentes): um dicionário nome -> (ra_graus, dec_graus, origem),
+    com origem 'offline' ou 'cache', e a lista de nomes que precisam ser buscados na rede.
+    """
+    cache = cache if cache is not None else get_default_cache()
+    resolved, pending, seen = {}, [], set()
+    for name in target_names_list:
+        if name in seen:
+            continue
+        seen.add(name)
+        radec = lookup_offline(name)
+        if radec is not None:
+            resolved[name] = radec + ('offline',)
+            continue
+        radec = cache.get(name)
+        if radec is not None:
+            resolved[name] = radec + ('cache',)
+        else:
+            pending.append(name)
+    return resolved, pending
@@ -0,0 +1,169 @@
+# src/scheduler.py
+
+"""
+Módulo de Planejamento da Noite.
+
+Monta um plano de observação sem sobreposições a partir de uma lista de pedidos
+(alvo, prioridade, tempo de exposição e restrições de altitude e de distância à
+Lua), sobre a matriz alvos x tempos já calculada por
+`analyze_targets_visibility_for_night`.
+
+O algoritmo é guloso por prioridade e trabalha na grade de tempos da noite:
+    - para cada pedido, as posições de início viáveis (alvo acima da altitude mínima
+      e longe o bastante da Lua durante todo o bloco) saem de somas acumuladas da
+      máscara de restrições, para todos os pedidos de uma vez;
+    - os pedidos são atendidos em ordem de prioridade (e, entre iguais, do mais
+      restrito para o menos restrito); cada um ocupa o bloco livre viável de maior
+      altitude média, o que também favorece a menor massa de ar.
+Cada bloco inclui o tempo de apontamento (slew) e um overhead fixo antes da
+exposição, e é arredondado para cima para um número inteiro de passos da grade.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from astropy import units as u
+
+from .analysis import NIGHT_GRID_FREQ, analyze_targets_visibility_for_night
+from .config import MIN_ALTITUDE_DEFAULT
+
+SLEW_MINUTES_DEFAULT = 2.0
+OVERHEAD_MINUTES_DEFAULT = 1.0
+
+ObservationRequest = namedtuple(
+    'ObservationRequest',
+    ['target', 'priority', 'exposure_minutes', 'min_altitude_deg', 'min_moon_separation_deg'],
+    defaults=(None, None),
+)
+
+PLAN_COLUMNS = ['target', 'priority', 'start_time', 'exposure_start', 'end_time', 'mean_altitude']
+
+def _requests_frame(requests):
+    """
+    Normaliza os pedidos (lista de `ObservationRequest` ou DataFrame com as mesmas colunas).
+    """
+    frame = pd.DataFrame(list(requests) if not isinstance(requests, pd.DataFrame) else requests)
+    if frame.empty:
+        return pd.DataFrame(columns=ObservationRequest._fields)
+    for field in ObservationRequest._field_defaults:
+        if field not in frame:
+            frame[field] = np.nan
+    return frame.reset_index(drop=True)
+
+def _window_sums(values, lengths):
+    """
+    Soma de `values` (pedidos x tempos) em janelas de `lengths[r]` amostras a partir de cada
+    início; inícios cuja janela passa do fim da grade recebem NaN.
+    """
+    n_requests, n_times = values.shape
+    cumulative = np.zeros((n_requests, n_times + 1))
+    np.cumsum(values, axis=1, out=cumulative[:, 1:])
+    starts = np.arange(n_times)
+    ends = starts[np.newaxis, :] + lengths[:, np.newaxis]
+    inside = ends <= n_times
+    sums = np.take_along_axis(cumulative, np.minimum(ends, n_times), axis=1) - cumulative[:, :-1]
+    return np.where(inside, sums, np.nan)
+
+def schedule_night(visibility, requests, slew_minutes=SLEW_MINUTES_DEFAULT,
+                   overhead_minutes=OVERHEAD_MINUTES_DEFAULT, min_altitude=MIN_ALTITUDE_DEFAULT):
+    """
+    Plano guloso por prioridade sobre a visibilidade de uma noite já calculada.
+
+    `visibility` é o resultado de `analyze_targets_visibility_for_night`; para pedidos com
+    `min_moon_separation_deg` ele precisa ter sido calculado com `min_moon_separation`
+    (chaves 'moon' e 'moon_separation'). `requests` é uma lista de `ObservationRequest`
+    ou um DataFrame com as mesmas colunas; maior `priority` é atendida primeiro, e
+    `min_altitude` vale para os pedidos sem `min_altitude_deg`.
+
+    Retorna um DataFrame em ordem de horário com as colunas 'target', 'priority',
+    'start_time' (início do apontamento), 'exposure_start', 'end_time' e 'mean_altitude'
+    (graus, durante o bloco). Pedidos que não couberem na noite ficam de fora.
+    """
+    frame = _requests_frame(requests)
+    row_of = {name: row for row, name in enumerate(visibility['names'])}
+    frame = frame[frame['target'].isin(row_of)].reset_index(drop=True)
+    times = pd.DatetimeIndex(visibility['time'])
+    if frame.empty or len(times) < 2:
+        return pd.DataFrame(columns=PLAN_COLUMNS)
+
+    step_minutes = (times[1] - times[0]).total_seconds() / 60.0
+    rows = frame['target'].map(row_of).to_numpy()
+    altitude = np.asarray(visibility['altitude'])[rows]
+
+    exposure = frame['exposure_minutes'].to_numpy(dtype=float)
+    lengths = np.ceil((exposure + slew_minutes + overhead_minutes) / step_minutes - 1e-9).astype(int)
+    lengths = np.maximum(lengths, 1)
+
+    min_alt = frame['min_altitude_deg'].astype(float).fillna(min_altitude.to_value(u.deg)).to_numpy()
+    allowed = altitude >= min_alt[:, np.newaxis]
+    min_sep = frame['min_moon_separation_deg'].astype(float).to_numpy()
+    if np.isfinite(min_sep).any():
+        if 'moon_separation' not in visibility:
+            raise ValueError("Pedidos com distância mínima da Lua exigem a visibilidade calculada com "
+                             "`min_moon_separation` (ver `plan_night`).")
+        separation = np.asarray(visibility['moon_separation'])[rows]
+        moon_down = np.asarray(visibility['moon']['altitude']) < 0
+        constrained = np.isfinite(min_sep)
+        allowed[constrained] &= (separation[constrained] >= min_sep[constrained, np.newaxis]) | moon_down
+
+    # Início viável: o bloco inteiro dentro das restrições; pontuação: altitude média no bloco.
+    feasible = _window_sums(allowed.astype(float), lengths) == lengths[:, np.newaxis]
+    score = np.where(feasible, _window_sums(altitude, lengths) / lengths[:, np.newaxis], -np.inf)
+    n_options = feasible.sum(axis=1)
+
+    priority = frame['priority'].to_numpy(dtype=float)
+    order = np.lexsort((np.arange(len(frame)), n_options, -priority))
+    order = order[n_options[order] > 0]
+
+    n_times = len(times)
+    free = np.ones(n_times, dtype=bool)
+    chosen_request, chosen_start = [], []
+    for request in order:
+        length = lengths[request]
+        if length > n_times:
+            continue
+        free_sum = np.convolve(free, np.ones(length, dtype=int), mode='valid')
+        candidate = np.full(n_times, -np.inf)
+        candidate[:free_sum.size] = np.where(free_sum == length, score[request, :free_sum.size], -np.inf)
+        start = int(np.argmax(candidate))
+        if not np.isfinite(candidate[start]):
+            continue
+        free[start:start + length] = False
+        chosen_request.append(request)
+        chosen_start.append(start)
+        if not free.any():
+            break
+
+    if not chosen_request:
+        return pd.DataFrame(columns=PLAN_COLUMNS)
+    chosen_request = np.asarray(chosen_request)
+    chosen_start = np.asarray(chosen_start)
+    start_times = times[chosen_start]
+    exposure_start = start_times + pd.to_timedelta(slew_minutes + overhead_minutes, unit='min')
+    plan = pd.DataFrame({
+        'target': frame['target'].to_numpy()[chosen_request],
+        'priority': priority[chosen_request],
+        'start_time': start_times,
+        'exposure_start': exposure_start,
+        'end_time': exposure_start + pd.to_timedelta(exposure[chosen_request], unit='min'),
+        'mean_altitude': score[chosen_request, chosen_start],
+    }, columns=PLAN_COLUMNS)
+    return plan.sort_values('start_time', ignore_index=True)
+
+def plan_night(start_time, end_time, observer_location, targets, requests, accuracy='exact',
+               freq=NIGHT_GRID_FREQ, slew_minutes=SLEW_MINUTES_DEFAULT,
+               overhead_minutes=OVERHEAD_MINUTES_DEFAULT, min_altitude=MIN_ALTITUDE_DEFAULT):
+    """
+    Calcula a visibilidade da noite (com a camada lunar, se algum pedido a usar) e
+    monta o plano com `schedule_night`.
+    """
+    frame = _requests_frame(requests)
+    needs_moon = frame['min_moon_separation_deg'].astype(float).notna().any()
+    # O pré-filtro de culminação usa a menor elevação pedida, para não descartar pedidos
+    # com `min_altitude_deg` abaixo do padrão.
+    lowest = np.nanmin(np.append(frame['min_altitude_deg'].astype(float).to_numpy(), min_altitude.to_value(u.deg)))
+    visibility = analyze_targets_visibility_for_night(
+        start_time, end_time, observer_location, targets, lowest * u.deg, freq=freq, accuracy=accuracy,
+        min_moon_separation=0 * u.deg if needs_moon else None,
+    )
+    return schedule_night(visibility, frame, slew_minutes, overhead_minutes, min_altitude)
@@ -0,0 +1,181 @@
+# src/sites.py
+
+"""
+Módulo de Análise Multi-Sítio.
+
+Compara uma rede de locais de observação sem repetir a análise local por local:
+    - os eventos noturnos de todos os locais saem de uma única grade do Sol avaliada
+      como matriz locais x tempos (`compute_sites_night_events`);
+    - as grades de 5 minutos de todas as noites de todos os locais são concatenadas e
+      os alvos são avaliados nelas numa única transformação, com um local por amostra
+      (`analyze_sites_visibility`).
+
+O custo em Python não cresce com o número de locais: só o tamanho dos arrays. Os
+resultados são tabelas "tidy" indexadas pelo nome do local.
+"""
+import numpy as np
+import pandas as pd
+from astropy import units as u
+from astropy.coordinates import EarthLocation
+from astropy.time import Time
+
+from .almanac import EVENT_COLUMNS
+from .analysis import (
+    NIGHT_GRID_FREQ, _as_target_arrays, _compute_sites_night_events_jd, _jd_matrix_to_table
+)
+from .horizon import CULMINATION_MARGIN_DEG, check_accuracy, compute_altaz, culmination_altitudes, times_to_jd
+
+# Limite de elementos (alvos x amostras) de cada bloco de altitudes, para que anos de
+# dezenas de locais não aloquem matrizes de centenas de MB de uma vez.
+SITES_BLOCK_ELEMENTS = 4_000_000
+
+WINDOW_COLUMNS = ['target', 'date', 'start_time', 'end_time', 'duration_hours', 'max_altitude']
+
+def as_site_arrays(sites):
+    """
+    Normaliza um conjunto de locais para (nomes, EarthLocation vetorial).
+
+    Aceita um dicionário nome -> EarthLocation ou uma tupla (nomes, lat_graus, lon_graus,
+    altitude_metros) com arrays de mesmo tamanho.
+    """
+    if isinstance(sites, dict):
+        names = list(sites)
+        lat = [location.lat.deg for location in sites.values()]
+        lon = [location.lon.deg for location in sites.values()]
+        height = [location.height.to_value(u.m) for location in sites.values()]
+    else:
+        names, lat, lon, height = sites
+        names = list(names)
+
+    lat = np.asarray(lat, dtype=float).reshape(-1)
+    lon = np.asarray(lon, dtype=float).reshape(-1)
+    height = np.broadcast_to(np.asarray(height, dtype=float), lat.shape)
+    if not (len(names) == lat.size == lon.size):
+        raise ValueError("Os arrays de nomes, latitude e longitude devem ter o mesmo tamanho.")
+    if len(set(names)) != len(names):
+        raise ValueError("Os nomes dos locais devem ser únicos.")
+    return names, EarthLocation(lat=lat * u.deg, lon=lon * u.deg, height=height * u.m)
+
+def _sites_night_events(start_date, end_date, locations):
+    with np.errstate(all='ignore'):
+        return _compute_sites_night_events_jd(start_date, end_date, locations)
+
+def compute_sites_night_events(start_date, end_date, sites):
+    """
+    Eventos noturnos de todos os locais e datas de um intervalo, numa única passada vetorial.
+
+    Mesma convenção de `compute_night_events_table` (eventos em UTC, NaT quando não
+    ocorrem). Retorna um DataFrame com índice (site, date) e as colunas de EVENT_COLUMNS.
+    """
+    names, locations = as_site_arrays(sites)
+    dates, jd = _sites_night_events(start_date, end_date, locations)
+    table = _jd_matrix_to_table(np.tile(dates, len(names)), jd.reshape(-1, len(EVENT_COLUMNS)))
+    table.index = pd.MultiIndex.from_product([names, dates], names=['site', 'date'])
+    return table
+
+def _night_samples(dates, jd, freq):
+    """
+    Grades concatenadas de todas as noites válidas (locais x dias).
+
+    Retorna (tempos das amostras, índice da noite de cada amostra, local de cada noite,
+    data de cada noite).
+    """
+    start_jd = jd[:, :, EVENT_COLUMNS.index('inicio_noite')]
+    end_jd = jd[:, :, EVENT_COLUMNS.index('fim_noite')]
+    with np.errstate(invalid='ignore'):
+        site, day = np.nonzero(start_jd < end_jd)
+
+    step = pd.Timedelta(freq).to_timedelta64()
+    starts = Time(start_jd[site, day], format='jd', scale='utc').datetime64.astype('datetime64[us]')
+    ends = Time(end_jd[site, day], format='jd', scale='utc').datetime64.astype('datetime64[us]')
+    n_samples = ((ends - starts) // step).astype(int) + 1
+
+    night_id = np.repeat(np.arange(site.size), n_samples)
+    offsets = np.arange(n_samples.sum()) - np.repeat(np.cumsum(n_samples) - n_samples, n_samples)
+    sample_times = starts[night_id] + offsets * step
+    return sample_times, night_id, site, dates[day]
+
+def analyze_sites_visibility(start_date, end_date, sites, targets, min_altitude, accuracy='exact',
+                             freq=NIGHT_GRID_FREQ):
+    """
+    Janelas de visibilidade de todos os alvos em todos os locais e noites de um intervalo.
+
+    `sites` segue `as_site_arrays` e `targets` o formato de `analyze_targets_visibility_for_night`
+    (alvos em movimento são ignorados). Cada noite é amostrada como em
+    `analyze_visibility_over_dates`, e a janela de uma noite vai da primeira à última
+    amostra acima de `min_altitude`.
+
+    Retorna um DataFrame indexado por 'site' com as colunas 'target', 'date',
+    'start_time', 'end_time', 'duration_hours' e 'max_altitude' (uma linha por
+    local, alvo e noite com visibilidade).
+    """
+    check_accuracy(accuracy)
+    site_names, locations = as_site_arrays(sites)
+    target_names, coords = _as_target_arrays(targets)
+    dates, jd = _sites_night_events(start_date, end_date, locations)
+    sample_times, night_id, night_site, night_date = _night_samples(dates, jd, freq)
+
+    empty = pd.DataFrame(columns=WINDOW_COLUMNS, index=pd.Index([], name='site'))
+    if sample_times.size == 0 or not target_names:
+        return empty
+
+    # Pré-filtro analítico: só entram os alvos cuja culminação alcança a elevação mínima
+    # em pelo menos um local.
+    threshold = min_altitude.to_value(u.deg)
+    upper = culmination_altitudes(coords.ra.deg, coords.dec.deg, locations.lat.deg[:, np.newaxis],
+                                  times_to_jd([sample_times.min(), sample_times.max()]))[0]
+    reachable = (upper + CULMINATION_MARGIN_DEG >= threshold).any(axis=0)
+    coords = coords[reachable]
+    reachable_names = [name for name, ok in zip(target_names, reachable) if ok]
+    if not reachable_names:
+        return empty
+
+    sample_locations = locations[night_site[night_id]]
+    n_nights = night_site.size
+    rows_per_block = max(1, SITES_BLOCK_ELEMENTS // sample_times.size)
+
+    frames = []
+    for first_row in range(0, len(reachable_names), rows_per_block):
+        block = coords[first_row:first_row + rows_per_block]
+        altitude = compute_altaz(block, sample_times, sample_locations, accuracy)[0]
+
+        # np.nonzero percorre a matriz linha a linha e as amostras estão em ordem de
+        # noite, então a chave (alvo, noite) é crescente e `np.unique` dá a primeira amostra.
+        rows, samples = np.nonzero(altitude >= threshold)
+        if rows.size == 0:
+            continue
+        keys = rows * n_nights + night_id[samples]
+        unique_keys, first = np.unique(keys, return_index=True)
+        last = np.append(first[1:], keys.size) - 1
+        flat = altitude[rows, samples]
+        max_alt = np.maximum.reduceat(flat, first)
+
+        target_row, night = np.divmod(unique_keys, n_nights)
+        start_times = pd.DatetimeIndex(sample_times[samples[first]])
+        end_times = pd.DatetimeIndex(sample_times[samples[last]])
+        frames.append(pd.DataFrame({
+            'site': np.asarray(site_names, dtype=object)[night_site[night]],
+            'target': np.asarray(reachable_names, dtype=object)[first_row + target_row],
+            'date': night_date[night],
+            'start_time': start_times,
+            'end_time': end_times,
+            'duration_hours': (end_times - start_times).total_seconds() / 3600.0,
+            'max_altitude': max_alt,
+        }))
+
+    if not frames:
+        return empty
+    table = pd.concat(frames, ignore_index=True)
+    table = table.sort_values(['site', 'target', 'date'], key=_site_order(site_names, target_names),
+                              kind='stable')
+    return table.set_index('site')[WINDOW_COLUMNS]
+
+def _site_order(site_names, target_names):
+    """
+    Chave de ordenação que mantém locais e alvos na ordem em que foram passados.
+    """
+    ranks = {
+        'site': {name: rank for rank, name in enumerate(site_names)},
+        'target': {name: rank for rank, name in enumerate(target_names)},
+    }
+    return lambda column: column.map(ranks[column.name]) if column.name in ranks else column
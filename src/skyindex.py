@@ -0,0 +1,119 @@
+# src/skyindex.py
+
+"""
+Módulo de Índice Espacial do Céu.
+
+Divide a esfera celeste em faixas de declinação de largura fixa e, dentro de cada
+faixa, ordena os alvos por ascensão reta. Uma consulta por calota (centro e raio)
+vira, para cada faixa que a calota cruza, um intervalo contínuo de RA encontrado
+com `np.searchsorted`, todas as faixas de uma vez: o custo cresce com o número de
+faixas e com o tamanho da resposta, não com o tamanho do catálogo.
+
+A calota visível de um local num instante é centrada no zênite (convertido para
+ICRS) com raio 90° − altitude mínima, mais uma pequena folga que cobre a aberração
+e o erro do modo 'fast'. Os candidatos devolvidos ainda passam pela transformação
+precisa; o índice só evita transformar os alvos que certamente estão abaixo dela.
+"""
+import numpy as np
+from astropy import units as u
+from astropy.coordinates import AltAz, SkyCoord
+from astropy.time import Time
+
+SKY_INDEX_BAND_DEG = 1.0
+SKY_INDEX_MARGIN_DEG = 0.05
+
+class SkyIndex:
+    """
+    Índice de alvos por faixas de declinação x RA ordenada.
+
+    As consultas devolvem índices (ordenados) das posições originais de `ra_deg`/`dec_deg`.
+    """
+
+    def __init__(self, ra_deg, dec_deg, band_deg=SKY_INDEX_BAND_DEG):
+        ra = np.mod(np.asarray(ra_deg, dtype=float).reshape(-1), 360.0)
+        dec = np.asarray(dec_deg, dtype=float).reshape(-1)
+        if ra.size != dec.size:
+            raise ValueError("Os arrays de RA e Dec devem ter o mesmo tamanho.")
+        self.band_deg = float(band_deg)
+        self.n_bands = int(np.ceil(180.0 / self.band_deg))
+        band = np.clip(np.floor((dec + 90.0) / self.band_deg).astype(int), 0, self.n_bands - 1)
+
+        # Chave única crescente: faixa * 360 + RA. Uma faixa e um intervalo de RA viram
+        # um intervalo contínuo da chave ordenada.
+        key = band * 360.0 + ra
+        self._order = np.argsort(key, kind='stable')
+        self._key = key[self._order]
+        self._ra = np.radians(ra[self._order])
+        self._dec = np.radians(dec[self._order])
+
+    def __len__(self):
+        return self._key.size
+
+    def _band_half_widths(self, dec0, radius):
+        """
+        Meia-largura em RA (graus) da calota em cada faixa, no pior ponto da faixa;
+        180 quando a faixa inteira precisa ser varrida e NaN quando não toca a calota.
+        """
+        lower = -90.0 + self.band_deg * np.arange(self.n_bands)
+        upper = np.minimum(lower + self.band_deg, 90.0)
+        lo = np.maximum(lower, dec0 - radius)
+        hi = np.minimum(upper, dec0 + radius)
+        touches = lo <= hi
+
+        sin_d0, cos_d0, cos_r = np.sin(np.radians(dec0)), np.cos(np.radians(dec0)), np.cos(np.radians(radius))
+        if cos_r <= 0:
+            # Calotas maiores que um hemisfério cobrem quase todas as RAs de cada faixa.
+            return np.where(touches, 180.0, np.nan)
+        # A largura máxima da calota em RA ocorre onde sin(dec) = sin(dec0) / cos(raio).
+        widest = np.degrees(np.arcsin(np.clip(sin_d0 / cos_r, -1.0, 1.0)))
+        probes = np.stack([lo, hi, np.clip(np.full_like(lo, widest), lo, hi)])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cos_dec = np.cos(np.radians(probes))
+            cos_width = (cos_r - np.sin(np.radians(probes)) * sin_d0) / (cos_dec * cos_d0)
+            width = np.where(cos_width <= -1.0, 180.0, np.degrees(np.arccos(np.clip(cos_width, -1.0, 1.0))))
+        width = np.where(cos_dec * cos_d0 < 1e-12, 180.0, width).max(axis=0)
+        return np.where(touches, width, np.nan)
+
+    def query_cap(self, ra0_deg, dec0_deg, radius_deg):
+        """
+        Índices dos alvos a até `radius_deg` graus de (ra0_deg, dec0_deg).
+        """
+        if radius_deg >= 180.0:
+            return np.sort(self._order)
+        if radius_deg < 0 or len(self) == 0:
+            return np.empty(0, dtype=np.intp)
+        ra0 = float(np.mod(ra0_deg, 360.0))
+        width = self._band_half_widths(float(dec0_deg), float(radius_deg))
+        bands = np.nonzero(np.isfinite(width))[0]
+        width = width[bands]
+
+        # Até dois intervalos de RA por faixa (quando a calota cruza RA = 0/360); um
+        # intervalo vazio é representado por início > fim.
+        full = width >= 180.0
+        start = np.where(full, 0.0, ra0 - width)
+        stop = np.where(full, 360.0, ra0 + width)
+        ranges_lo = [np.maximum(start, 0.0), np.where(start < 0, start + 360.0, np.where(stop > 360.0, 0.0, 360.0))]
+        ranges_hi = [np.minimum(stop, 360.0), np.where(start < 0, 360.0, np.where(stop > 360.0, stop - 360.0, 0.0))]
+
+        base = bands * 360.0
+        first = np.concatenate([np.searchsorted(self._key, base + lo, 'left') for lo in ranges_lo])
+        last = np.concatenate([np.searchsorted(self._key, base + hi, 'right') for hi in ranges_hi])
+        count = np.maximum(last - first, 0)
+        positions = np.repeat(first - np.cumsum(count) + count, count) + np.arange(count.sum())
+
+        # Teste exato de distância só nos candidatos das faixas.
+        ra, dec = self._ra[positions], self._dec[positions]
+        dec0 = np.radians(dec0_deg)
+        cos_sep = (np.sin(dec) * np.sin(dec0) + np.cos(dec) * np.cos(dec0) * np.cos(ra - np.radians(ra0)))
+        inside = cos_sep >= np.cos(np.radians(radius_deg))
+        return np.sort(self._order[positions[inside]])
+
+    def query_visible(self, observer_location, time, min_altitude_deg, margin_deg=SKY_INDEX_MARGIN_DEG):
+        """
+        Candidatos possivelmente acima de `min_altitude_deg` num local e instante: a calota
+        em torno do zênite (em ICRS) com raio 90° − altitude mínima + `margin_deg`.
+        """
+        time = time if isinstance(time, Time) else Time(time)
+        zenith = SkyCoord(alt=90 * u.deg, az=0 * u.deg,
+                          frame=AltAz(obstime=time, location=observer_location)).icrs
+        return self.query_cap(zenith.ra.deg, zenith.dec.deg, 90.0 - float(min_altitude_deg) + margin_deg)
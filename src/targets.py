@@ -4,17 +4,21 @@
 Módulo de Gerenciamento de Alvos.
 ... (comentários como antes) ...
 """
+import time
 import warnings
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
-from astroquery.simbad import Simbad
-# CORREÇÃO: O nome correto da exceção é TimeoutError, não AstroqueryTimeoutError.
-from astroquery.exceptions import RemoteServiceError, TimeoutError
-
-from astropy.coordinates import SkyCoord, get_body
+from astropy.coordinates import SkyCoord, Angle, get_body
 from astropy.time import Time
 from astropy import units as u
+from astropy.utils.data import conf as data_conf
+import numpy as np
 import pandas as pd
-from tqdm.auto import tqdm
+
+from . import instrumentation
+from .catalog import CATALOG_CHUNK_ROWS, TargetCatalog
+from .resolver import resolve_locally, get_default_cache
+from .ephemeris import get_body_ephemeris
 
 DEEP_SKY_TARGETS_PRESET = [
     'M31', 'M42', 'M45', 'M13', 'M51', 'M8', 'M20',
@@ -23,50 +27,232 @@ DEEP_SKY_TARGETS_PRESET = [
 ]
 SOLAR_SYSTEM_TARGETS_PRESET = ["Sun", "Moon", "Mercury", "Venus", "Mars", "Jupiter", "Saturn", "Uranus", "Neptune", "Pluto"]
 
-def get_target_skycoords(target_names_list):
+FALLBACK_MAX_WORKERS = 8
+FALLBACK_TIMEOUT_SECONDS = 10.0
+REPORT_COLUMNS = ['name', 'source', 'latency_s', 'error']
+
+def _to_degrees(value, unit):
     """
-    Busca as coordenadas celestes (RA/Dec) para uma lista de nomes de alvos.
+    Converte um valor de RA/Dec do SIMBAD para graus (número ou texto sexagesimal).
+    """
+    if isinstance(value, (str, bytes)):
+        return Angle(value, unit=unit).deg
+    return float(value)
+
+def query_simbad_bulk(target_names_list, simbad=None):
+    """
+    Resolve vários nomes com uma única consulta `query_objects` ao SIMBAD.
+
+    Retorna um dicionário nome -> (ra_graus, dec_graus) só com os nomes encontrados;
+    nomes que voltarem vazios ficam de fora.
+    """
+    names = list(target_names_list)
+    if simbad is None:
+        from astroquery.simbad import Simbad
+
+        simbad = Simbad()
+    with warnings.catch_warnings(), instrumentation.span('simbad_query', names=len(names)):
+        warnings.simplefilter("ignore")
+        table = simbad.query_objects(names)
+    instrumentation.count('network_calls')
+    instrumentation.count('simbad_queries')
+    if table is None or len(table) == 0:
+        return {}
+
+    columns = {name.lower(): name for name in table.colnames}
+    ra_column, dec_column = table[columns['ra']], table[columns['dec']]
+    if 'user_specified_id' in columns:
+        keys = [str(value) for value in table[columns['user_specified_id']]]
+    else:
+        # Versões antigas do astroquery devolvem uma linha por nome, na ordem da consulta.
+        keys = names[:len(table)]
+
+    found = {}
+    for key, ra, dec in zip(keys, ra_column, dec_column):
+        if key in found or np.ma.is_masked(ra) or np.ma.is_masked(dec) or ra in ('', b''):
+            continue
+        found[key] = (_to_degrees(ra, u.hourangle), _to_degrees(dec, u.deg))
+    return found
+
+def resolve_names_concurrently(target_names_list, resolver=None, max_workers=FALLBACK_MAX_WORKERS,
+                               timeout=FALLBACK_TIMEOUT_SECONDS):
+    """
+    Resolve nomes em paralelo com `SkyCoord.from_name` (ou outro `resolver(nome) -> SkyCoord`).
+
+    Usa um pool limitado de threads; cada requisição tem seu próprio prazo de `timeout`
+    segundos, contado a partir do momento em que começa a executar.
+
+    Retorna um dicionário nome -> (SkyCoord ou None, erro ou None, latência em segundos).
+    """
+    # CORREÇÃO: O nome correto da exceção é TimeoutError, não AstroqueryTimeoutError.
+    from astroquery.exceptions import TimeoutError
+
+    resolver = resolver if resolver is not None else SkyCoord.from_name
+    started = {}
+
+    def resolve(name):
+        started[name] = time.perf_counter()
+        with instrumentation.span('name_fallback', target=name):
+            coord = resolver(name)
+        return coord, time.perf_counter() - started[name]
+
+    instrumentation.count('network_calls', len(target_names_list))
+    instrumentation.count('name_fallbacks', len(target_names_list))
+
+    results = {}
+    futures = {}
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        with data_conf.set_temp('remote_timeout', timeout):
+            futures = {executor.submit(resolve, name): name for name in target_names_list}
+            pending = set(futures)
+            while pending:
+                now = time.perf_counter()
+                deadlines = [started[futures[f]] + timeout for f in pending if futures[f] in started]
+                wait_for = max(min(deadlines) - now, 0) if deadlines else timeout
+                done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    name = futures[future]
+                    try:
+                        coord, latency = future.result()
+                        results[name] = (coord, None, latency)
+                    except Exception as e:
+                        results[name] = (None, e, time.perf_counter() - started.get(name, now))
+
+                now = time.perf_counter()
+                for future in list(pending):
+                    name = futures[future]
+                    if name in started and now - started[name] >= timeout:
+                        pending.discard(future)
+                        results[name] = (None, TimeoutError(f"Tempo esgotado após {timeout:.1f} s"),
+                                         now - started[name])
+    finally:
+        # `shutdown(cancel_futures=True)` só existe a partir do Python 3.9.
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+    return results
+
+@instrumentation.instrumented('resolve_targets')
+def _resolve_to_degrees(target_names_list, cache=None, simbad=None, fallback=None,
+                        max_workers=FALLBACK_MAX_WORKERS, timeout=FALLBACK_TIMEOUT_SECONDS):
+    """
+    Núcleo de `resolve_targets`: devolve (dicionário nome -> (ra_graus, dec_graus) na ordem
+    da lista de entrada, relatório), sem criar um SkyCoord por alvo.
     """
-    print(f"Buscando coordenadas para {len(target_names_list)} alvos...")
-    targets_coords = {}
+    cache = cache if cache is not None else get_default_cache()
+    report = []
 
-    simbad = Simbad()
-    simbad.add_votable_fields('ra', 'dec')
+    start = time.perf_counter()
+    with instrumentation.span('resolve_locally', names=len(target_names_list)):
+        local_coords, pending = resolve_locally(target_names_list, cache)
+    instrumentation.count('target_local_hits', len(local_coords))
+    instrumentation.count('target_local_misses', len(pending))
+    local_latency = (time.perf_counter() - start) / max(len(local_coords) + len(pending), 1)
+    resolved = {}
+    for name, (ra, dec, source) in local_coords.items():
+        resolved[name] = (ra, dec)
+        report.append((name, source, local_latency, None))
 
-    for name in tqdm(target_names_list, desc="Buscando Alvos"):
+    if pending:
+        print(f"Buscando coordenadas para {len(pending)} alvos...")
+        start = time.perf_counter()
         try:
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                result_table = simbad.query_object(name)
-
-            if result_table:
-                ra = result_table['RA'][0]
-                dec = result_table['DEC'][0]
-                targets_coords[name] = SkyCoord(ra=ra*u.deg, dec=dec*u.deg, frame='icrs')
-            else:
-                targets_coords[name] = SkyCoord.from_name(name)
-        except (RemoteServiceError, TimeoutError, Exception) as e:
-            print(f"  AVISO: Não foi possível resolver o alvo '{name}'. Tentando fallback. Erro: {e}")
-            try:
-                # Se o Simbad falhar, tenta o resolver de nomes padrão do SkyCoord
-                targets_coords[name] = SkyCoord.from_name(name)
-            except Exception as fallback_e:
-                print(f"  AVISO: Fallback também falhou para '{name}'. Erro: {fallback_e}")
-                continue
+            found = query_simbad_bulk(pending, simbad)
+        except Exception as e:
+            print(f"  AVISO: A consulta em lote ao SIMBAD falhou. Tentando fallback. Erro: {e}")
+            found = {}
+        bulk_latency = time.perf_counter() - start
+
+        for name, (ra, dec) in found.items():
+            resolved[name] = (ra, dec)
+            cache.put(name, ra, dec, source='simbad')
+            report.append((name, 'simbad', bulk_latency, None))
+
+        missing = [name for name in pending if name not in found]
+        if missing:
+            fallback_results = resolve_names_concurrently(missing, fallback, max_workers, timeout)
+            for name in missing:
+                coord, error, latency = fallback_results[name]
+                if coord is None:
+                    print(f"  AVISO: Não foi possível resolver o alvo '{name}'. Erro: {error}")
+                    report.append((name, 'failed', latency, str(error)))
+                    continue
+                icrs = coord.icrs
+                resolved[name] = (icrs.ra.deg, icrs.dec.deg)
+                cache.put(name, icrs.ra.deg, icrs.dec.deg, source='fallback')
+                report.append((name, 'fallback', latency, None))
+
+    degrees = {name: resolved[name] for name in dict.fromkeys(target_names_list) if name in resolved}
+    return degrees, pd.DataFrame(report, columns=REPORT_COLUMNS)
+
+def resolve_targets(target_names_list, cache=None, simbad=None, fallback=None,
+                    max_workers=FALLBACK_MAX_WORKERS, timeout=FALLBACK_TIMEOUT_SECONDS):
+    """
+    Resolve uma lista de nomes de alvos e informa de onde veio cada resolução.
 
-    return targets_coords
+    Ordem de resolução:
+        1. catálogo offline e cache persistente (`src/resolver.py`);
+        2. uma única consulta em lote ao SIMBAD (`query_objects`) para todos os que faltarem;
+        3. só os nomes que o SIMBAD não encontrar vão para o fallback `SkyCoord.from_name`,
+           em paralelo e com prazo por requisição.
 
-def registrar_alvos_sistema_solar(observation_time):
+    Retorna (coordenadas, relatório): um dicionário nome -> SkyCoord, na ordem da
+    lista de entrada, e um DataFrame com colunas 'name', 'source' ('offline', 'cache',
+    'simbad', 'fallback' ou 'failed'), 'latency_s' e 'error'.
+    """
+    degrees, report = _resolve_to_degrees(target_names_list, cache, simbad, fallback, max_workers, timeout)
+    coords = {name: SkyCoord(ra=ra*u.deg, dec=dec*u.deg, frame='icrs') for name, (ra, dec) in degrees.items()}
+    return coords, report
+
+def get_target_skycoords(target_names_list, cache=None, simbad=None, fallback=None):
+    """
+    Busca as coordenadas celestes (RA/Dec) para uma lista de nomes de alvos.
+
+    Os nomes são resolvidos primeiro localmente (catálogo offline e cache persistente);
+    os que faltarem são buscados na rede em lote (ver `resolve_targets`).
+    """
+    return resolve_targets(target_names_list, cache, simbad=simbad, fallback=fallback)[0]
+
+def get_target_catalog(target_names_list, cache=None, simbad=None, fallback=None):
+    """
+    Como `get_target_skycoords`, mas devolve um `TargetCatalog` (arrays NumPy) com os
+    alvos resolvidos, na ordem da lista de entrada.
+    """
+    degrees = _resolve_to_degrees(target_names_list, cache, simbad=simbad, fallback=fallback)[0]
+    radec = np.array(list(degrees.values()), dtype=float).reshape(-1, 2)
+    return TargetCatalog(list(degrees), radec[:, 0], radec[:, 1])
+
+def load_target_catalog(path, cache=None, simbad=None, fallback=None, chunk_rows=CATALOG_CHUNK_ROWS):
+    """
+    Lê um arquivo de alvos (CSV, FITS ou .txt com um nome por linha) em blocos como um
+    `TargetCatalog`. Linhas sem RA/Dec são resolvidas pelo nome, bloco a bloco, como em
+    `get_target_skycoords`.
+    """
+    def resolver(names):
+        return _resolve_to_degrees(names, cache, simbad=simbad, fallback=fallback)[0]
+
+    return TargetCatalog.from_file(path, chunk_rows, resolver=resolver)
+
+def registrar_alvos_sistema_solar(observation_time, end_time=None):
     """
     Obtém as coordenadas dos principais corpos do sistema solar para um dado momento.
+
+    Se `end_time` for informado, retorna efemérides interpoladas (`src/ephemeris.py`)
+    válidas de `observation_time` a `end_time`, de modo que a posição dos corpos (em
+    especial a da Lua) acompanhe o movimento ao longo da noite.
     """
+    from tqdm.auto import tqdm
+
     print("Obtendo posições dos alvos do Sistema Solar...")
     ss_targets = {}
     for name in tqdm(SOLAR_SYSTEM_TARGETS_PRESET, desc="Calculando Posições"):
         try:
-            ss_targets[name] = get_body(name.lower(), observation_time)
+            if end_time is not None:
+                ss_targets[name] = get_body_ephemeris(name, observation_time, end_time)
+            else:
+                ss_targets[name] = get_body(name.lower(), observation_time)
         except Exception as e:
             print(f"  AVISO: Não foi possível obter coordenadas para '{name}'. Erro: {e}")
     return ss_targets
-
-print("Módulo de Gerenciamento de Alvos (src/targets.py) carregado.")
@@ -0,0 +1,160 @@
+# src/weather.py
+
+"""
+Módulo de Previsão do Tempo.
+
+Cliente da API Open-Meteo para a cobertura de nuvens horária. Em vez de uma
+requisição avulsa a cada consulta, o cliente:
+    - reaproveita conexões com uma `requests.Session` (pool HTTP e novas tentativas);
+    - usa prazos explícitos de conexão e de leitura;
+    - guarda as respostas num cache com validade (TTL), com chave na latitude/longitude
+      arredondadas e na hora da previsão, de modo que consultas repetidas na mesma
+      hora e região não vão à rede.
+
+A série horária é interpolada para a mesma grade de tempos (UTC) usada pela análise
+de visibilidade (`analyze_targets_visibility_for_night(...)['time']`), então a
+nebulosidade pode ser combinada diretamente com as matrizes de altitude.
+
+O `requests` só é importado quando o cliente faz a primeira requisição.
+"""
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+OPEN_METEO_URL = "https://api.open-meteo.com/v1/forecast"
+WEATHER_TIMEOUT_SECONDS = (3.05, 10.0)  # (conexão, leitura)
+WEATHER_TTL_SECONDS = 1800
+WEATHER_MAX_RETRIES = 2
+WEATHER_CACHE_SIZE = 256
+LAT_LON_DECIMALS = 2
+FORECAST_DAYS = 3
+
+_UNIX_EPOCH = pd.Timestamp('1970-01-01')
+
+def weather_key(lat, lon, forecast_hour):
+    """
+    Chave do cache: (lat, lon arredondadas, hora da previsão em horas desde 1970 UTC).
+    """
+    return (round(float(lat), LAT_LON_DECIMALS), round(float(lon), LAT_LON_DECIMALS), int(forecast_hour))
+
+def _to_utc_seconds(times):
+    index = pd.DatetimeIndex(np.atleast_1d(pd.to_datetime(times)))
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return np.asarray((index - _UNIX_EPOCH) / pd.Timedelta(seconds=1), dtype=float)
+
+class WeatherClient:
+    """
+    Cliente da cobertura de nuvens horária do Open-Meteo, com sessão HTTP e cache TTL.
+
+    `clock` (segundos desde 1970, por padrão `time.time`) define a hora da previsão e
+    a validade do cache, e pode ser substituído nos testes.
+    """
+
+    def __init__(self, base_url=OPEN_METEO_URL, timeout=WEATHER_TIMEOUT_SECONDS, ttl=WEATHER_TTL_SECONDS,
+                 max_retries=WEATHER_MAX_RETRIES, maxsize=WEATHER_CACHE_SIZE, session=None, clock=time.time):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.ttl = ttl
+        self.max_retries = max_retries
+        self.maxsize = maxsize
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._session = session
+        self._cache = OrderedDict()
+
+    @property
+    def session(self):
+        """
+        Sessão HTTP compartilhada (criada no primeiro uso), com pool de conexões e novas tentativas.
+        """
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            # Repete falhas de conexão e respostas 429/5xx; um servidor lento (prazo de leitura
+            # esgotado) não é repetido e chega ao chamador como `requests.Timeout`.
+            retry = Retry(total=self.max_retries, read=False, backoff_factor=0.3,
+                          status_forcelist=(429, 500, 502, 503, 504), allowed_methods=('GET',))
+            session = requests.Session()
+            session.mount('http://', HTTPAdapter(max_retries=retry))
+            session.mount('https://', HTTPAdapter(max_retries=retry))
+            self._session = session
+        return self._session
+
+    def hourly_cloud_cover(self, lat, lon):
+        """
+        Série horária da cobertura de nuvens (%) indexada por tempos UTC (sem fuso).
+
+        Erros de rede ou HTTP (`requests.RequestException`) são propagados; respostas
+        com erro não entram no cache.
+        """
+        now = self.clock()
+        key = weather_key(lat, lon, now // 3600)
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > now:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        params = {
+            'latitude': key[0],
+            'longitude': key[1],
+            'hourly': 'cloudcover',
+            'forecast_days': FORECAST_DAYS,
+            'timezone': 'UTC',
+        }
+        response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        hourly = response.json()['hourly']
+        series = pd.Series(np.asarray(hourly['cloudcover'], dtype=float),
+                           index=pd.DatetimeIndex(pd.to_datetime(hourly['time'])), name='cloud_cover')
+
+        self._cache[key] = (now + self.ttl, series)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return series
+
+    def cloud_cover_on_grid(self, lat, lon, time_grid):
+        """
+        Cobertura de nuvens (%) interpolada para a grade de tempos (UTC) da análise.
+
+        Retorna um array do tamanho da grade, com NaN nos instantes fora da previsão.
+        """
+        series = self.hourly_cloud_cover(lat, lon)
+        grid_seconds = _to_utc_seconds(time_grid)
+        if series.empty:
+            return np.full(grid_seconds.shape, np.nan)
+        return np.interp(grid_seconds, _to_utc_seconds(series.index), series.to_numpy(),
+                         left=np.nan, right=np.nan)
+
+    def clear(self):
+        self._cache.clear()
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+_default_client = None
+
+def get_default_weather_client():
+    """
+    Retorna o cliente de previsão do tempo padrão do processo (criado na primeira chamada).
+    """
+    global _default_client
+    if _default_client is None:
+        _default_client = WeatherClient()
+    return _default_client
+
+def set_default_weather_client(client):
+    """
+    Substitui o cliente padrão do processo (p. ex. apontando para outro servidor).
+    """
+    global _default_client
+    _default_client = client
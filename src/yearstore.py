@@ -0,0 +1,267 @@
+# src/yearstore.py
+
+"""
+Módulo de Armazenamento de Calendários Anuais.
+
+Guarda os resultados de `analyze_year_visibility`/`analyze_years_parallel` de muitos
+alvos e anos em colunas tipadas, em vez de um DataFrame por alvo:
+    - 'target': código int32 do alvo (os nomes ficam numa lista à parte);
+    - 'date': dia da noite como int32 (dias desde 1970-01-01);
+    - 'start_time'/'end_time': int64 em microssegundos desde 1970-01-01 (UTC);
+    - 'duration_hours' e as colunas opcionais da Lua: float32.
+
+Os resultados são acrescentados alvo a alvo (ou bloco a bloco) com `append` e só
+concatenados quando lidos. `save`/`load` usam Parquet (extensão .parquet, requer o
+pyarrow) ou o formato .npz do NumPy, ambos com projeção de colunas e filtro por
+alvo na leitura. `plot_yearly_visibility` aceita o armazenamento diretamente e lê
+só as colunas 'date' e 'duration_hours' do alvo e do ano pedidos.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+YEAR_STORE_COLUMNS = {
+    'target': np.int32,
+    'date': np.int32,
+    'start_time': np.int64,
+    'end_time': np.int64,
+    'duration_hours': np.float32,
+    'moon_illumination': np.float32,
+    'moon_separation': np.float32,
+}
+MOON_COLUMNS = ('moon_illumination', 'moon_separation')
+FRAME_COLUMNS = ['date', 'start_time', 'end_time', 'duration_hours', 'moon_illumination', 'moon_separation']
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+
+def _to_int(values, unit):
+    """Datas/horários (Timestamp, datetime64 ou string) -> inteiros na unidade pedida."""
+    values = np.asarray(values)
+    if values.dtype.kind != 'M':
+        values = pd.to_datetime(values).to_numpy()
+    return values.astype(f'datetime64[{unit}]').astype(np.int64)
+
+def _column_or_nan(part, column, size):
+    """A coluna de um bloco, ou NaN quando o bloco não a tem (colunas da Lua)."""
+    return part[column] if column in part else np.full(size, np.nan, dtype=YEAR_STORE_COLUMNS[column])
+
+def _check_columns(columns):
+    unknown = set(columns) - set(YEAR_STORE_COLUMNS)
+    if unknown:
+        raise ValueError(f"Colunas desconhecidas: {sorted(unknown)}. Use {list(YEAR_STORE_COLUMNS)}.")
+
+class YearStore:
+    """
+    Calendários de visibilidade de vários alvos em colunas tipadas, com acréscimo incremental.
+
+    As colunas da Lua só passam a existir quando algum resultado acrescentado as tiver
+    (as noites anteriores ficam com NaN). `min_altitude_deg` é opcional e só aparece no
+    título do gráfico anual.
+    """
+
+    def __init__(self, min_altitude_deg=None):
+        self.min_altitude_deg = min_altitude_deg
+        self._names = []
+        self._codes = {}
+        self._pending = []
+        self._projected = False
+        self._columns = {column: np.empty(0, dtype=dtype) for column, dtype in YEAR_STORE_COLUMNS.items()
+                         if column not in MOON_COLUMNS}
+
+    def __len__(self):
+        return self._columns['target'].size + sum(block['target'].size for block in self._pending)
+
+    def __repr__(self):
+        return f"YearStore({len(self._names)} alvos, {len(self)} noites)"
+
+    def __contains__(self, name):
+        return name in self._codes
+
+    @property
+    def targets(self):
+        """Nomes dos alvos, na ordem em que foram acrescentados."""
+        return list(self._names)
+
+    @property
+    def nbytes(self):
+        """Memória ocupada pelas colunas, em bytes."""
+        return sum(array.nbytes for array in self.columns().values())
+
+    def _code(self, name):
+        if name not in self._codes:
+            self._codes[name] = len(self._names)
+            self._names.append(name)
+        return self._codes[name]
+
+    def append(self, target_name, df):
+        """
+        Acrescenta as noites de um alvo (DataFrame no formato de `analyze_year_visibility`).
+        """
+        if self._projected:
+            raise ValueError("Não é possível acrescentar a um armazenamento lido só com parte das colunas.")
+        code = self._code(target_name)
+        n = len(df)
+        if n == 0:
+            return self
+        block = {
+            'target': np.full(n, code, dtype=np.int32),
+            'date': _to_int(df['date'], 'D').astype(np.int32),
+            'start_time': _to_int(df['start_time'], 'us'),
+            'end_time': _to_int(df['end_time'], 'us'),
+            'duration_hours': df['duration_hours'].to_numpy(dtype=np.float32),
+        }
+        for column in MOON_COLUMNS:
+            if column in df:
+                block[column] = df[column].to_numpy(dtype=np.float32)
+        self._pending.append(block)
+        return self
+
+    def extend(self, results):
+        """
+        Acrescenta um dicionário nome do alvo -> DataFrame (formato de `analyze_years_parallel`).
+        """
+        for name, df in results.items():
+            self.append(name, df)
+        return self
+
+    @classmethod
+    def from_frames(cls, results, min_altitude_deg=None):
+        """
+        Cria o armazenamento a partir de um dicionário nome do alvo -> DataFrame.
+        """
+        return cls(min_altitude_deg).extend(results)
+
+    def columns(self, columns=None):
+        """
+        Dicionário coluna -> array (concatena os blocos pendentes uma única vez).
+        """
+        if self._pending:
+            present = [column for column in YEAR_STORE_COLUMNS
+                       if column in self._columns or any(column in block for block in self._pending)]
+            self._columns = {column: np.concatenate([_column_or_nan(part, column, part['target'].size)
+                                                     for part in [self._columns] + self._pending])
+                             for column in present}
+            self._pending = []
+        columns = list(self._columns) if columns is None else list(columns)
+        _check_columns(columns)
+        missing = [column for column in columns if column not in self._columns]
+        if missing:
+            raise ValueError(f"Colunas não carregadas: {missing} (ver `YearStore.load(columns=...)`).")
+        return {column: self._columns[column] for column in columns}
+
+    def _rows(self, target_name=None, year=None):
+        """Máscara das linhas de um alvo e/ou de um ano (None = todas)."""
+        data = self.columns(['target', 'date'])
+        rows = np.ones(data['target'].size, dtype=bool)
+        if target_name is not None:
+            rows &= data['target'] == self._codes.get(target_name, -1)
+        if year is not None:
+            first = np.datetime64(f'{year}-01-01', 'D').astype(np.int64)
+            last = np.datetime64(f'{year + 1}-01-01', 'D').astype(np.int64)
+            rows &= (data['date'] >= first) & (data['date'] < last)
+        return rows
+
+    def select(self, target_name=None, year=None, columns=None):
+        """
+        Colunas (arrays tipados, sem conversão) das noites de um alvo e/ou ano.
+        """
+        rows = self._rows(target_name, year)
+        return {column: values[rows] for column, values in self.columns(columns).items()}
+
+    def to_frame(self, target_name, year=None, columns=None):
+        """
+        DataFrame de um alvo no formato de `analyze_year_visibility` (colunas da Lua só
+        quando o alvo tiver algum valor nelas).
+        """
+        wanted = [column for column in (columns or FRAME_COLUMNS)
+                  if column != 'target' and (columns is not None or column in self._columns)]
+        data = self.select(target_name, year, wanted)
+        frame = {}
+        for column in wanted:
+            values = data[column]
+            if column == 'date':
+                frame[column] = values.astype('datetime64[D]').astype('datetime64[s]')
+            elif column in ('start_time', 'end_time'):
+                frame[column] = values.astype('datetime64[us]')
+            elif column.startswith('moon_') and columns is None and np.isnan(values).all():
+                continue
+            else:
+                frame[column] = values.astype(float)
+        return pd.DataFrame(frame)
+
+    def save(self, path):
+        """
+        Grava o armazenamento em Parquet (.parquet/.pq, requer o pyarrow) ou em .npz
+        (qualquer outra extensão). Retorna o caminho gravado.
+        """
+        data = self.columns()
+        names = np.asarray(self._names, dtype=str)
+        if str(path).lower().endswith(PARQUET_EXTENSIONS):
+            pa, pq = _import_pyarrow()
+            # O nome do alvo vai como coluna de texto (codificada em dicionário pelo Parquet),
+            # para que a leitura possa filtrar por nome; a lista ordenada de nomes vai nos metadados.
+            columns = {'target': names[data['target']] if names.size else np.empty(0, dtype=str)}
+            columns.update({column: values for column, values in data.items() if column != 'target'})
+            metadata = {b'target_names': json.dumps(self._names).encode()}
+            if self.min_altitude_deg is not None:
+                metadata[b'min_altitude_deg'] = str(self.min_altitude_deg).encode()
+            pq.write_table(pa.table(columns).replace_schema_metadata(metadata), str(path))
+        else:
+            path = str(path) if str(path).endswith('.npz') else f"{path}.npz"
+            extra = {} if self.min_altitude_deg is None else {'min_altitude_deg': np.float64(self.min_altitude_deg)}
+            np.savez_compressed(path, target_names=names, **data, **extra)
+        return path
+
+    @classmethod
+    def load(cls, path, columns=None, targets=None):
+        """
+        Lê um armazenamento salvo com `save`, só com as colunas e os alvos pedidos.
+
+        'target' é sempre lido; as colunas não pedidas não ficam disponíveis no resultado.
+        """
+        projected = columns is not None and set(columns) | {'target'} != set(YEAR_STORE_COLUMNS)
+        columns = list(YEAR_STORE_COLUMNS) if columns is None else ['target'] + [c for c in columns if c != 'target']
+        _check_columns(columns)
+        if str(path).lower().endswith(PARQUET_EXTENSIONS):
+            names, data, min_alt = _read_parquet(path, columns, targets)
+        else:
+            names, data, min_alt = _read_npz(path, columns)
+
+        store = cls(min_alt)
+        for name in names:
+            store._code(name)
+        rows = (np.ones(data['target'].size, dtype=bool) if targets is None
+                else np.isin(data['target'], [store._codes[name] for name in targets if name in store._codes]))
+        store._columns = {column: data[column][rows].astype(dtype, copy=False)
+                          for column, dtype in YEAR_STORE_COLUMNS.items() if column in data}
+        store._projected = projected
+        return store
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as error:
+        raise ImportError("Parquet requer o pacote pyarrow (pip install pyarrow); "
+                          "use a extensão .npz para o formato do NumPy.") from error
+    return pa, pq
+
+def _read_parquet(path, columns, targets):
+    """Lê só as colunas pedidas e, com `targets`, só as linhas desses alvos."""
+    _, pq = _import_pyarrow()
+    metadata = pq.read_schema(str(path)).metadata or {}
+    names = json.loads(metadata[b'target_names'])
+    filters = [('target', 'in', list(targets))] if targets is not None else None
+    table = pq.read_table(str(path), columns=columns, filters=filters)
+    data = {column: table.column(column).to_numpy() for column in columns if column != 'target'}
+    data['target'] = pd.Categorical(table.column('target').to_numpy(), categories=names).codes.astype(np.int32)
+    min_alt = metadata.get(b'min_altitude_deg')
+    return names, data, float(min_alt) if min_alt is not None else None
+
+def _read_npz(path, columns):
+    """O .npz é lido de forma preguiçosa: só as colunas pedidas são descompactadas."""
+    with np.load(path) as archive:
+        names = archive['target_names'].tolist()
+        data = {column: archive[column] for column in columns if column in archive.files}
+        min_alt = float(archive['min_altitude_deg']) if 'min_altitude_deg' in archive.files else None
+    return names, data, min_alt
@@ -0,0 +1,125 @@
+# tests/test_almanac.py
+
+from datetime import date
+
+import pytest
+import numpy as np
+import pandas as pd
+from astropy.coordinates import EarthLocation
+from astropy.time import Time
+from astropy import units as u
+import pytz
+
+import src.analysis as analysis
+from src.almanac import AlmanacCache, almanac_key, set_default_almanac, get_default_almanac
+from src.analysis import calculate_nightly_events, get_night_events_table, precompute_almanac
+
+@pytest.fixture
+def observer_location():
+    """Fixture para uma localização fixa (São Paulo)."""
+    return EarthLocation(lat=-23.55 * u.deg, lon=-46.63 * u.deg, height=760 * u.m)
+
+@pytest.fixture
+def observer_timezone():
+    """Fixture para o fuso horário da localização fixa."""
+    return pytz.timezone('America/Sao_Paulo')
+
+@pytest.fixture
+def fresh_almanac():
+    """Fixture que troca o almanaque padrão por um vazio durante o teste."""
+    previous = get_default_almanac()
+    almanac = AlmanacCache()
+    set_default_almanac(almanac)
+    yield almanac
+    set_default_almanac(previous)
+
+def test_almanac_key_quantization(observer_location, observer_timezone):
+    """
+    Testa se locais muito próximos compartilham a mesma chave e datas diferentes não.
+    """
+    nearby = EarthLocation(lat=-23.551 * u.deg, lon=-46.632 * u.deg, height=763 * u.m)
+    key = almanac_key(date(2023, 1, 15), observer_location, observer_timezone)
+
+    assert key == almanac_key(date(2023, 1, 15), nearby, observer_timezone)
+    assert key != almanac_key(date(2023, 1, 16), observer_location, observer_timezone)
+    assert key[-1] == 'America/Sao_Paulo'
+
+def test_almanac_lru_eviction():
+    """
+    Testa a remoção da entrada usada há mais tempo quando o limite é atingido.
+    """
+    almanac = AlmanacCache(maxsize=2)
+    almanac.put('a', [1, 2, 3, 4, 5])
+    almanac.put('b', [1, 2, 3, 4, 5])
+    assert almanac.get('a') is not None  # 'a' passa a ser a mais recente
+    almanac.put('c', [1, 2, 3, 4, 5])
+
+    assert almanac.get('b') is None
+    assert almanac.get('a') is not None
+    assert len(almanac) == 2
+    assert (almanac.hits, almanac.misses) == (2, 1)
+
+def test_almanac_disk_persistence(tmp_path, observer_location, observer_timezone):
+    """
+    Testa se o almanaque em disco sobrevive à reabertura e preserva eventos ausentes (NaN).
+    """
+    path = str(tmp_path / 'almanac.sqlite')
+    key = almanac_key(date(2023, 1, 15), observer_location, observer_timezone)
+    almanac = AlmanacCache(path=path)
+    almanac.put(key, [2459960.4, np.nan, 2459960.6, 2459960.7, 2459960.8])
+    almanac.close()
+
+    reopened = AlmanacCache(path=path)
+    values = reopened.get(key)
+    assert values[0] == pytest.approx(2459960.4)
+    assert np.isnan(values[1])
+
+def test_precompute_then_lookup_without_recomputing(monkeypatch, fresh_almanac, observer_location, observer_timezone):
+    """
+    Testa se, após o pré-cálculo, noites e anos são servidos pelo almanaque sem nova busca.
+    """
+    assert precompute_almanac(2023, 2024, observer_location, observer_timezone) == 365 + 366
+    assert len(fresh_almanac) == 365 + 366
+
+    def fail(*args, **kwargs):
+        raise AssertionError("O almanaque deveria evitar este cálculo.")
+
+    monkeypatch.setattr('astroplan.Observer', fail)
+    monkeypatch.setattr(analysis, '_compute_night_events_jd', fail)
+
+    events = calculate_nightly_events(date(2024, 2, 29), observer_location, observer_timezone)
+    table = get_night_events_table(date(2023, 12, 1), date(2024, 1, 31), observer_location, observer_timezone)
+
+    assert isinstance(events['inicio_noite'], Time)
+    assert events['inicio_noite'] < events['fim_noite']
+    assert len(table) == 62
+    assert table.notna().all().all()
+
+def test_calculate_nightly_events_is_memoized(monkeypatch, fresh_almanac, observer_location, observer_timezone):
+    """
+    Testa se uma segunda chamada para a mesma data e local não recalcula os eventos.
+    """
+    first = calculate_nightly_events(date(2023, 1, 15), observer_location, observer_timezone)
+    monkeypatch.setattr('astroplan.Observer', None)
+    second = calculate_nightly_events(date(2023, 1, 15), observer_location, observer_timezone)
+
+    for key in first:
+        assert abs((first[key] - second[key]).to_value(u.s)) < 1e-3
+
+@pytest.mark.parametrize('warm', [False, True])
+def test_both_engines_agree_for_an_eastern_site(fresh_almanac, warm):
+    """
+    Testa se o astroplan e o núcleo vetorial dão a mesma noite num local a leste (Tóquio),
+    com o almanaque frio ou já preenchido pela tabela vetorial.
+    """
+    tokyo = EarthLocation(lat=35.68 * u.deg, lon=139.69 * u.deg, height=40 * u.m)
+    timezone = pytz.timezone('Asia/Tokyo')
+    if warm:
+        get_night_events_table(date(2024, 1, 15), date(2024, 1, 15), tokyo, timezone)
+    events = calculate_nightly_events(date(2024, 1, 15), tokyo, timezone)
+    table = get_night_events_table(date(2024, 1, 15), date(2024, 1, 15), tokyo, timezone,
+                                   almanac=AlmanacCache())
+
+    assert events['inicio_noite'] < events['fim_noite']
+    for key in ('por_do_sol', 'inicio_noite', 'fim_noite', 'nascer_do_sol'):
+        assert abs((events[key] - Time(table[key].iloc[0])).to_value(u.s)) < 60
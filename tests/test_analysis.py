@@ -1,20 +1,30 @@
 # tests/test_analysis.py
 
 import pytest
-from astropy.coordinates import EarthLocation, SkyCoord
+from astropy.coordinates import EarthLocation, SkyCoord, AltAz
 from astropy.time import Time
 from astropy import units as u
 import pytz
 import pandas as pd
-from datetime import date
+from datetime import date, timedelta
 
+from src.almanac import AlmanacCache, get_default_almanac, set_default_almanac
 from src.location import get_location_from_city, set_timezone_for_sao_paulo
+import numpy as np
+
 from src.analysis import (
     calculate_nightly_events,
     analyze_target_visibility_for_night,
+    analyze_targets_visibility_for_night,
+    analyze_target_visibility_adaptive,
+    find_observing_windows,
+    target_visibility_dataframe,
     check_hemisphere_visibility,
+    classify_targets_by_culmination,
     analyze_moon_impact,
-    analyze_year_visibility
+    analyze_year_visibility,
+    analyze_visibility_over_dates,
+    compute_night_events_table
 )
 
 @pytest.fixture(scope="module")
@@ -37,6 +47,25 @@ def northern_target():
     """Fixture para um alvo no hemisfério celestial norte (Polaris)."""
     return SkyCoord.from_name('Polaris')
 
+@pytest.fixture(scope="module")
+def offline_location():
+    """Fixture para uma localização fixa (São Paulo) que não depende de rede."""
+    return EarthLocation(lat=-23.55 * u.deg, lon=-46.63 * u.deg, height=760 * u.m)
+
+@pytest.fixture(scope="module")
+def offline_timezone():
+    """Fixture para o fuso horário da localização fixa."""
+    return pytz.timezone('America/Sao_Paulo')
+
+@pytest.fixture(scope="module")
+def offline_targets():
+    """Fixture com coordenadas fixas (ICRS) de alguns alvos, sem consulta ao SIMBAD."""
+    return {
+        'Sirius': SkyCoord(ra=101.2872 * u.deg, dec=-16.7161 * u.deg),
+        'Polaris': SkyCoord(ra=37.9546 * u.deg, dec=89.2641 * u.deg),
+        'M42': SkyCoord(ra=83.8221 * u.deg, dec=-5.3911 * u.deg),
+    }
+
 def test_calculate_nightly_events(observer_location, observer_timezone):
     """
     Testa se os eventos noturnos são calculados corretamente.
@@ -111,3 +140,149 @@ def test_analyze_year_visibility(observer_location, observer_timezone, southern_
         expected_columns = ['date', 'start_time', 'end_time', 'duration_hours']
         for col in expected_columns:
             assert col in df_year.columns
+
+def test_analyze_targets_visibility_for_night_matches_single_target(offline_location, offline_timezone, offline_targets):
+    """
+    Testa se a análise em lote reproduz a análise alvo a alvo.
+    """
+    events = calculate_nightly_events(date(2023, 1, 15), offline_location, offline_timezone)
+    night = analyze_targets_visibility_for_night(
+        events['inicio_noite'], events['fim_noite'], offline_location, offline_targets, 30 * u.deg
+    )
+
+    assert night['names'] == list(offline_targets)
+    assert night['altitude'].shape == (len(offline_targets), len(night['time']))
+    assert night['azimuth'].shape == night['altitude'].shape
+    assert 'Polaris' not in set(night['windows']['target'])
+
+    for name, coord in offline_targets.items():
+        expected = analyze_target_visibility_for_night(
+            events['inicio_noite'], events['fim_noite'], offline_location, coord, 30 * u.deg
+        )
+        batched = target_visibility_dataframe(night, name, 30 * u.deg)
+        assert list(batched['time']) == list(expected['time'])
+        np.testing.assert_allclose(batched['altitude'], expected['altitude'], atol=1e-6)
+
+def test_find_observing_windows_multiple_windows():
+    """
+    Testa se mais de uma janela por alvo é encontrada e se as bordas são respeitadas.
+    """
+    time_range = pd.date_range('2023-01-15 23:00', periods=8, freq='5min')
+    altitude = np.array([
+        [35, 40, 10, 10, 45, 50, 20, 31],
+        [10, 10, 10, 10, 10, 10, 10, 10],
+        [31, 32, 33, 34, 35, 36, 37, 38],
+    ], dtype=float)
+
+    windows = find_observing_windows(['A', 'B', 'C'], time_range, altitude, 30)
+
+    assert list(windows['target']) == ['A', 'A', 'A', 'C']
+    assert list(windows['start_time']) == [time_range[0], time_range[4], time_range[7], time_range[0]]
+    assert list(windows['end_time']) == [time_range[1], time_range[5], time_range[7], time_range[7]]
+    assert list(windows['max_altitude']) == [40, 50, 31, 38]
+    assert windows['duration_hours'].iloc[3] == pytest.approx(35 / 60)
+
+def test_compute_night_events_table_matches_observer(offline_location, offline_timezone):
+    """
+    Testa se os eventos calculados em lote concordam com os do Observer (astroplan) em até um minuto.
+    """
+    table = compute_night_events_table(date(2023, 1, 1), date(2023, 12, 31), offline_location)
+    assert len(table) == 365
+
+    for test_date in [date(2023, 1, 15), date(2023, 6, 21), date(2023, 12, 31)]:
+        events = calculate_nightly_events(test_date, offline_location, offline_timezone, use_almanac=False)
+        row = table.loc[pd.Timestamp(test_date)]
+        for key, value in events.items():
+            delta = abs((pd.Timestamp(row[key]) - pd.Timestamp(value.datetime64)).total_seconds())
+            assert delta < 60, key
+
+def test_vectorized_year_engine_matches_observer_path(offline_location, offline_timezone, offline_targets):
+    """
+    Testa se o engine vetorizado reproduz o caminho original (Observer dia a dia) em até
+    um minuto em todas as noites.
+
+    Os crepúsculos dos dois caminhos diferem em ~1 s (comparados em
+    `test_compute_night_events_table_matches_observer`) e a grade de 5 minutos parte deles, então
+    uma amostra rente à elevação mínima poderia mudar de lado. Para comparar só a
+    visibilidade, o almanaque é preenchido antes com os crepúsculos do Observer e os dois
+    engines amostram a mesma grade.
+    """
+    start, end = date(2023, 1, 1), date(2023, 1, 31)
+    target = offline_targets['Sirius']
+    previous = get_default_almanac()
+    set_default_almanac(AlmanacCache())
+    try:
+        for offset in range((end - start).days + 1):
+            calculate_nightly_events(start + timedelta(days=offset), offline_location, offline_timezone)
+        expected = analyze_visibility_over_dates(start, end, offline_location, offline_timezone, target,
+                                                 30 * u.deg, engine='observer')
+        result = analyze_visibility_over_dates(start, end, offline_location, offline_timezone, target, 30 * u.deg)
+    finally:
+        set_default_almanac(previous)
+
+    assert list(result.columns) == list(expected.columns)
+    assert list(result['date']) == list(expected['date'])
+
+    deltas = np.abs(np.concatenate([
+        (result['start_time'] - expected['start_time']).dt.total_seconds(),
+        (result['end_time'] - expected['end_time']).dt.total_seconds(),
+    ]))
+    assert deltas.max() <= 60
+
+def test_adaptive_sampling_finds_exact_crossings(offline_location, offline_targets):
+    """
+    Testa se o modo adaptativo encontra as travessias exatas do limiar, a culminação e
+    janelas mais curtas que a grade grossa, com menos avaliações que a grade fixa de 5 min.
+    """
+    start, end = Time('2023-01-15 23:30'), Time('2023-01-16 07:30')
+    grid_samples = len(pd.date_range(start.to_datetime(), end.to_datetime(), freq='5min'))
+    # Culmina em ~30,5°: a janela dura ~1 h e fica entre pontos da grade grossa de 2 h.
+    grazing = SkyCoord(ra=101.3 * u.deg, dec=36.0 * u.deg)
+
+    for coord in [offline_targets['Sirius'], offline_targets['M42'], grazing]:
+        result = analyze_target_visibility_adaptive(start, end, offline_location, coord, 30 * u.deg,
+                                                    coarse_step_minutes=120)
+        df_grid = analyze_target_visibility_for_night(start, end, offline_location, coord, 30 * u.deg)
+        window = result['windows'].iloc[0]
+
+        assert len(result['windows']) == 1
+        assert result['n_evaluations'] < grid_samples
+        assert abs((window['start_time'] - df_grid['time'].min()).total_seconds()) <= 300
+        assert abs((window['end_time'] - df_grid['time'].max()).total_seconds()) <= 300
+        assert window['max_altitude'] == pytest.approx(df_grid['altitude'].max(), abs=0.05)
+
+        end_alt = AltAz(obstime=Time(window['end_time']), location=offline_location)
+        assert coord.transform_to(end_alt).alt.deg == pytest.approx(30.0, abs=0.01)
+
+    assert result['transit_time'] is not None
+    assert result['peak_altitude'] == pytest.approx(30.47, abs=0.05)
+
+def test_culmination_prefilter_offline(offline_location, offline_timezone):
+    """
+    Testa o pré-filtro analítico de culminação: Sirius alcança 30° de São Paulo e Polaris
+    nunca nasce; alvos na borda não são rejeitados e o pré-filtro poupa a transformação
+    sem mudar as janelas dos demais alvos.
+    """
+    sirius = SkyCoord(ra=101.2872 * u.deg, dec=-16.7161 * u.deg)
+    polaris = SkyCoord(ra=37.9546 * u.deg, dec=89.2641 * u.deg)
+    time = Time('2024-07-15 03:00:00')
+    assert check_hemisphere_visibility(offline_location, sirius, time=time) is True
+    assert check_hemisphere_visibility(offline_location, polaris, time=time) is False
+    # Dec +40° culmina a ~26,5° e dec -75° é circumpolar em São Paulo: a regra de ±30° errava ambos.
+    edge = SkyCoord(ra=[0.0, 0.0] * u.deg, dec=[40.0, -75.0] * u.deg)
+    np.testing.assert_array_equal(check_hemisphere_visibility(offline_location, edge, 20 * u.deg, time), [True, True])
+
+    targets = {'Sirius': sirius, 'Polaris': polaris, 'Octans': SkyCoord(ra=320 * u.deg, dec=-80 * u.deg)}
+    report = classify_targets_by_culmination(targets, offline_location, 10 * u.deg, time).set_index('target')
+    assert list(report['status']) == ['rises_and_sets', 'never', 'circumpolar']
+    assert report.loc['Sirius', 'max_altitude'] == pytest.approx(90 - abs(-23.55 + 16.72), abs=0.2)
+
+    start, end = Time('2024-07-15 22:00'), Time('2024-07-16 09:00')
+    night = analyze_targets_visibility_for_night(start, end, offline_location, targets, 30 * u.deg)
+    assert night['never_visible'] == ['Polaris']
+    assert np.isnan(night['altitude'][1]).all() and not np.isnan(night['altitude'][[0, 2]]).any()
+    assert set(night['windows']['target']) <= {'Sirius', 'Octans'}
+    assert analyze_target_visibility_for_night(start, end, offline_location, polaris, 30 * u.deg).empty
+    year = analyze_visibility_over_dates(date(2024, 1, 1), date(2024, 1, 31), offline_location,
+                                         offline_timezone, polaris, 0 * u.deg)
+    assert year.empty and list(year.columns) == ['date', 'start_time', 'end_time', 'duration_hours']
@@ -0,0 +1,59 @@
+# tests/test_app.py
+
+import pytest
+from astropy.coordinates import EarthLocation
+from astropy import units as u
+
+AppTest = pytest.importorskip("streamlit.testing.v1").AppTest
+
+APP_PATH = __file__.rsplit('tests', 1)[0] + 'app.py'
+
+@pytest.fixture
+def app():
+    """Fixture com o app carregado e uma localização já definida na sessão (sem rede)."""
+    at = AppTest.from_file(APP_PATH, default_timeout=600)
+    at.session_state['observer_location'] = EarthLocation(lat=-23.55 * u.deg, lon=-46.63 * u.deg, height=760 * u.m)
+    at.run()
+    return at
+
+def _by_label(elements, prefix):
+    return next(element for element in elements if element.label.startswith(prefix))
+
+def test_night_results_survive_reruns(app):
+    """
+    Testa se a análise noturna continua na tela após mexer no slider do mapa e na
+    elevação mínima, sem clicar de novo no botão.
+    """
+    _by_label(app.button, "Gerar Análise da Noite").click().run()
+    assert not app.exception
+    assert 'night_request' in app.session_state
+    n_plots = len(app.image)
+    assert n_plots > 0
+
+    _by_label(app.slider, "Selecione o horário").set_value(3).run()
+    assert not app.exception
+    assert any("03:00 UTC" in message.value for message in list(app.success) + list(app.warning))
+    assert len(app.image) >= n_plots - 1
+
+    _by_label(app.slider, "Elevação Mínima").set_value(60).run()
+    assert not app.exception
+    assert any("Analisando visibilidade" in message.value for message in app.success)
+
+    _by_label(app.radio, "Gráficos de altitude").set_value("Um gráfico por alvo").run()
+    assert not app.exception
+    assert len(app.image) >= 1
+
+def test_performance_panel_lists_the_stages(app):
+    """
+    Testa se o painel de desempenho mostra as etapas da execução e desliga a instrumentação no fim.
+    """
+    import streamlit as st
+    from src import instrumentation
+
+    st.cache_data.clear()  # sem isso a análise da noite viria do cache do teste anterior
+    _by_label(app.checkbox, "⏱️ Painel de desempenho").check().run()
+    _by_label(app.button, "Gerar Análise da Noite").click().run()
+    assert not app.exception
+    assert any(expander.label.startswith("⏱️ Desempenho") for expander in app.expander)
+    assert len(app.dataframe) >= 1
+    assert not instrumentation.is_enabled()
@@ -0,0 +1,59 @@
+# tests/test_benchmark.py
+
+import json
+
+import pytest
+
+from src.benchmark import (
+    BASELINE_PATH, BENCHMARK_CASES, compare_to_baseline, load_results, main, run_benchmarks, save_results
+)
+
+def test_quick_run_writes_json(tmp_path):
+    """
+    Testa uma execução curta (resolução com o SIMBAD local) e a gravação dos resultados em JSON.
+    """
+    progress = []
+    results = run_benchmarks(cases=['get_target_skycoords'], quick=True, repeats=1,
+                             progress=lambda name, size, measurement: progress.append((name, size)))
+    assert progress == [('get_target_skycoords', 10), ('get_target_skycoords', 100)]
+    measurement = results['results']['get_target_skycoords']['100']
+    assert 0 < measurement['best_s'] <= measurement['median_s']
+    assert 'astropy' in results['environment']
+
+    path = save_results(results, str(tmp_path / 'resultados.json'))
+    assert load_results(path) == json.loads(json.dumps(results))
+
+    with pytest.raises(ValueError):
+        run_benchmarks(cases=['caso_inexistente'])
+
+def test_regressions_beyond_tolerance_fail(tmp_path):
+    """
+    Testa a comparação com a linha de base: só pioras acima da tolerância (e do ruído) falham.
+    """
+    def timing(seconds):
+        return {'best_s': seconds, 'median_s': seconds, 'repeats': 1}
+
+    baseline = {'results': {'a': {'1': timing(1.0), '10': timing(0.001)}, 'b': {'1': timing(2.0)}}}
+    current = {'results': {'a': {'1': timing(1.2), '10': timing(0.004)}, 'b': {'1': timing(3.0)},
+                           'novo': {'1': timing(5.0)}}}
+
+    comparison = compare_to_baseline(current, baseline, tolerance_pct=25).set_index(['case', 'size'])
+    assert len(comparison) == 3
+    assert not comparison.loc[('a', 1), 'regression']
+    assert not comparison.loc[('a', 10), 'regression']  # +300%, mas abaixo do ruído absoluto
+    assert comparison.loc[('b', 1), 'regression']
+    assert comparison.loc[('b', 1), 'change_pct'] == pytest.approx(50.0)
+    assert not compare_to_baseline(current, baseline, tolerance_pct=60)['regression'].any()
+
+    # Linha de base impossível de bater: a linha de comando sai com 1.
+    fast = {'results': {'get_target_skycoords': {'10': timing(1e-9), '100': timing(1e-9)}}}
+    baseline_path = save_results(fast, str(tmp_path / 'baseline.json'))
+    assert main(['--quick', '--case', 'get_target_skycoords', '--repeats', '1', '--baseline', baseline_path]) == 1
+
+def test_stored_baseline_covers_every_case():
+    """
+    Testa se a linha de base do repositório tem todos os casos e tamanhos registrados.
+    """
+    baseline = load_results(BASELINE_PATH)['results']
+    for case in BENCHMARK_CASES:
+        assert sorted(baseline[case.name], key=int) == [str(size) for size in case.sizes]
@@ -0,0 +1,103 @@
+# tests/test_catalog.py
+
+import numpy as np
+import pytest
+from astropy import units as u
+from astropy.coordinates import EarthLocation, SkyCoord
+from astropy.table import Table
+from astropy.time import Time
+
+from src.analysis import analyze_targets_visibility_for_night, compute_sky_positions
+from src.catalog import TargetCatalog, read_target_chunks
+from src.resolver import TargetCache
+from src.targets import get_target_catalog, load_target_catalog
+
+@pytest.fixture
+def catalog():
+    """Fixture com um catálogo pequeno de estrelas brilhantes (coordenadas fixas)."""
+    return TargetCatalog(['Sirius', 'Canopus', 'Vega', 'Antares'],
+                         [101.2872, 95.9880, 279.2347, 247.3519],
+                         [-16.7161, -52.6957, 38.7837, -26.4320],
+                         magnitude=[-1.46, -0.74, 0.03, 0.96], kind=['estrela'] * 4)
+
+def test_catalog_behaves_like_arrays_and_mapping(catalog):
+    """
+    Testa o SkyCoord vetorial, a seleção por máscara e o uso como dicionário de alvos.
+    """
+    coord = catalog.to_skycoord()
+    assert coord.shape == (4,)
+    assert catalog.to_skycoord() is coord
+    assert catalog['Vega'].separation(SkyCoord(ra=279.2347 * u.deg, dec=38.7837 * u.deg)) < 1 * u.arcsec
+
+    bright = catalog[catalog.magnitude < 0]
+    assert bright.keys() == ['Sirius', 'Canopus']
+    assert 'Vega' in catalog and 'Vega' not in bright
+
+    targets = {'M42': SkyCoord(ra=83.82 * u.deg, dec=-5.39 * u.deg)}
+    targets.update(catalog)
+    assert list(targets) == ['M42', 'Sirius', 'Canopus', 'Vega', 'Antares']
+    assert TargetCatalog.from_skycoords(targets).keys() == list(targets)
+
+    with pytest.raises(ValueError):
+        TargetCatalog(['A'], [10.0], [np.nan])
+
+def test_catalog_plugs_into_analysis(catalog):
+    """
+    Testa se o catálogo dá o mesmo resultado que o dicionário de SkyCoords na análise da noite.
+    """
+    location = EarthLocation(lat=-23.55 * u.deg, lon=-46.63 * u.deg, height=760 * u.m)
+    start, end = Time('2024-03-20 23:00'), Time('2024-03-21 08:00')
+    from_catalog = analyze_targets_visibility_for_night(start, end, location, catalog, 30 * u.deg)
+    from_dict = analyze_targets_visibility_for_night(start, end, location, dict(catalog.items()), 30 * u.deg)
+
+    assert from_catalog['names'] == from_dict['names']
+    np.testing.assert_allclose(from_catalog['altitude'], from_dict['altitude'], atol=1e-9)
+    positions = compute_sky_positions(catalog, location, start)
+    assert positions['names'] == catalog.keys()
+
+def test_csv_fits_and_txt_are_streamed_in_chunks(tmp_path, catalog):
+    """
+    Testa a leitura em blocos de CSV (graus e sexagesimal), FITS e lista de nomes,
+    com os nomes sem coordenadas resolvidos pelo catálogo offline.
+    """
+    csv_path = tmp_path / 'alvos.csv'
+    csv_path.write_text(
+        "# catálogo de teste\n"
+        "Nome,RA,Dec,Mag,Tipo\n"
+        "Sirius,101.2872,-16.7161,-1.46,estrela\n"
+        "Canopus,06 23 57.1,-52 41 44,-0.74,estrela\n"
+        "M42,,,4.0,nebulosa\n"
+        "Vega,279.2347,38.7837,0.03,estrela\n"
+        "Alvo Inexistente XYZ,,,,\n",
+        encoding='utf-8'
+    )
+    chunks = list(read_target_chunks(str(csv_path), chunk_rows=2))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert chunks[0]['ra_deg'][1] == pytest.approx(95.988, abs=1e-3)
+
+    class NoNetworkSimbad:
+        def query_objects(self, names):
+            return None
+
+    def no_network_fallback(name):
+        raise ValueError(f"sem rede: {name}")
+
+    cache = TargetCache(path=str(tmp_path / 'cache.sqlite'))
+    loaded = load_target_catalog(str(csv_path), cache=cache, simbad=NoNetworkSimbad(),
+                                 fallback=no_network_fallback, chunk_rows=2)
+    assert loaded.keys() == ['Sirius', 'Canopus', 'M42', 'Vega']
+    assert loaded['M42'].dec.deg == pytest.approx(-5.39, abs=0.1)
+    assert loaded.kind[2] == 'nebulosa' and loaded.magnitude[0] == pytest.approx(-1.46)
+
+    fits_path = tmp_path / 'alvos.fits'
+    Table({'MAIN_ID': catalog.names.astype(str), 'RA': catalog.ra_deg, 'DEC': catalog.dec_deg,
+           'FLUX_V': catalog.magnitude}).write(fits_path)
+    assert [len(chunk) for chunk in read_target_chunks(str(fits_path), chunk_rows=3)] == [3, 1]
+    from_fits = TargetCatalog.from_file(str(fits_path), chunk_rows=3)
+    assert from_fits.keys() == catalog.keys()
+    np.testing.assert_allclose(from_fits.dec_deg, catalog.dec_deg)
+
+    txt_path = tmp_path / 'alvos.txt'
+    txt_path.write_text("# lista\nM31\nSirius\n\n", encoding='utf-8')
+    assert get_target_catalog(['M31', 'Sirius'], cache=cache).keys() == ['M31', 'Sirius']
+    assert load_target_catalog(str(txt_path), cache=cache).keys() == ['M31', 'Sirius']
@@ -0,0 +1,104 @@
+# tests/test_curves.py
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+import pytz
+from astropy import units as u
+from astropy.coordinates import EarthLocation, SkyCoord
+
+from src.analysis import analyze_visibility_over_dates
+from src.curves import CURVE_ALTITUDE_TOLERANCE_DEG, AltitudeCurves, compute_altitude_curves
+
+START, END = date(2024, 1, 1), date(2024, 2, 29)
+
+@pytest.fixture(scope="module")
+def location():
+    """Fixture para uma localização fixa (São Paulo)."""
+    return EarthLocation(lat=-23.55 * u.deg, lon=-46.63 * u.deg, height=760 * u.m)
+
+@pytest.fixture(scope="module")
+def timezone():
+    return pytz.timezone('America/Sao_Paulo')
+
+@pytest.fixture(scope="module")
+def targets():
+    """Alvos fixos (um que nunca nasce acima de 10°) e um planeta pelo nome."""
+    return {
+        'Sirius': SkyCoord(ra=101.2872 * u.deg, dec=-16.7161 * u.deg),
+        'Vega': SkyCoord(ra=279.2347 * u.deg, dec=38.7837 * u.deg),
+        'Polaris': SkyCoord(ra=37.9546 * u.deg, dec=89.2641 * u.deg),
+        'Júpiter': 'jupiter',
+    }
+
+@pytest.fixture(scope="module")
+def curves(location, timezone, targets):
+    """Curvas de dois meses, com a camada lunar, calculadas uma única vez."""
+    return compute_altitude_curves(START, END, location, timezone, targets, lowest_altitude=10 * u.deg,
+                                   with_moon=True)
+
+@pytest.mark.parametrize('min_altitude_deg', [15, 30, 60])
+def test_windows_match_the_direct_analysis(curves, location, timezone, targets, min_altitude_deg):
+    """
+    Testa se refazer o limiar sobre as curvas dá o mesmo calendário da análise direta.
+    """
+    for name in ('Sirius', 'Júpiter'):
+        expected = analyze_visibility_over_dates(START, END, location, timezone, targets[name],
+                                                 min_altitude_deg * u.deg)
+        result = curves.windows(name, min_altitude_deg * u.deg)
+        assert list(result['date']) == list(expected['date'])
+        assert (result['start_time'] == expected['start_time']).all()
+        assert (result['end_time'] == expected['end_time']).all()
+    assert curves.windows('Polaris', min_altitude_deg * u.deg).empty
+
+def test_moon_threshold_matches_the_direct_analysis(curves, location, timezone, targets):
+    """
+    Testa o limiar de distância da Lua sobre a camada lunar guardada.
+    """
+    expected = analyze_visibility_over_dates(START, END, location, timezone, targets['Sirius'], 30 * u.deg,
+                                             min_moon_separation=40 * u.deg)
+    result = curves.windows('Sirius', 30 * u.deg, min_moon_separation=40 * u.deg)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False, rtol=1e-5)
+
+def test_many_thresholds_in_one_reduction(curves):
+    """
+    Testa as durações por noite para vários limiares de uma vez, o `YearStore` e o limite inferior.
+    """
+    thresholds = np.array([15, 30, 60]) * u.deg
+    durations = curves.nightly_durations(thresholds)
+    assert durations.shape == (3, len(curves), len(curves.dates))
+    assert durations.dtype == np.float32
+    assert np.isnan(durations[:, curves.names.index('Polaris')]).all()
+    # Limiar mais alto, janela menor (ou nenhuma).
+    assert (np.nan_to_num(durations[0]) >= np.nan_to_num(durations[2])).all()
+
+    sirius = curves.windows('Sirius', 30 * u.deg)
+    row = curves.names.index('Sirius')
+    visible = ~np.isnan(durations[1, row])
+    np.testing.assert_allclose(durations[1, row, visible], sirius['duration_hours'], rtol=1e-6)
+
+    store = curves.to_year_store(30 * u.deg)
+    assert store.targets == curves.names
+    pd.testing.assert_frame_equal(store.to_frame('Sirius'), sirius, check_dtype=False, rtol=1e-6)
+
+    with pytest.raises(ValueError):
+        curves.windows('Sirius', 5 * u.deg)
+
+def test_sample_exactly_at_the_threshold_counts_as_visible():
+    """
+    Testa se uma amostra guardada no limiar (30,3° não é exato em float32) entra na janela,
+    e se o desvio em relação ao float64 fica dentro de `CURVE_ALTITUDE_TOLERANCE_DEG`.
+    """
+    threshold = 30.3
+    assert float(np.float32(threshold)) < threshold
+    sample_times = pd.date_range('2024-01-01 23:00', periods=4, freq='10min')
+    curves = AltitudeCurves(['Alvo'], [pd.Timestamp('2024-01-01')], sample_times, [0],
+                            [[20.0, threshold, threshold, 20.0]], lowest_altitude_deg=10)
+
+    window = curves.windows('Alvo', threshold * u.deg)
+    assert window['start_time'].iloc[0] == sample_times[1]
+    assert window['end_time'].iloc[0] == sample_times[2]
+    np.testing.assert_allclose(curves.nightly_durations([threshold] * u.deg), [[[1 / 6]]])
+    assert abs(float(np.float32(threshold)) - threshold) < CURVE_ALTITUDE_TOLERANCE_DEG
@@ -0,0 +1,93 @@
+# tests/test_ephemeris.py
+
+import pytest
+import numpy as np
+from datetime import date
+from astropy.coordinates import EarthLocation, SkyCoord, AltAz, get_body
+from astropy.time import Time
+from astropy import units as u
+
+from src.ephemeris import BodyEphemeris, get_body_ephemeris
+from src.horizon import FAST_ALTAZ_MAX_ERROR_DEG
+from src.analysis import (
+    analyze_target_visibility_for_night,
+    analyze_targets_visibility_for_night,
+    analyze_visibility_over_dates,
+)
+
+@pytest.fixture(scope="module")
+def observer_location():
+    """Fixture para uma localização fixa (São Paulo)."""
+    return EarthLocation(lat=-23.55 * u.deg, lon=-46.63 * u.deg, height=760 * u.m)
+
+@pytest.fixture(scope="module")
+def night():
+    """Fixture com o início e o fim de uma noite (UTC)."""
+    return Time('2024-03-20 23:00'), Time('2024-03-21 08:00')
+
+@pytest.mark.parametrize("body", ['moon', 'mars', 'jupiter'])
+def test_interpolation_matches_get_body(body):
+    """
+    Testa se a posição interpolada coincide com `get_body` em instantes arbitrários (erro < 1").
+    """
+    ephemeris = BodyEphemeris(body, Time('2024-01-01'), Time('2024-04-01'))
+    times = Time('2024-01-01') + np.random.default_rng(1).uniform(0, 90, 300) * u.day
+    reference = get_body(body, times)
+
+    separation = ephemeris.skycoord(times).separation(reference).arcsec
+    assert separation.max() < 1.0
+
+def test_moon_moves_during_the_night(observer_location, night):
+    """
+    Testa se a altitude da Lua segue a posição real a cada instante, e não a do início da noite.
+    """
+    start, end = night
+    df = analyze_target_visibility_for_night(start, end, observer_location, 'moon', -90 * u.deg)
+    times = Time(df['time'].to_numpy())
+    reference = get_body('moon', times, location=observer_location).transform_to(
+        AltAz(obstime=times, location=observer_location)).alt.deg
+    frozen = get_body('moon', start).transform_to(AltAz(obstime=times, location=observer_location)).alt.deg
+
+    assert np.abs(df['altitude'].to_numpy() - reference).max() < 0.01
+    assert np.abs(frozen - reference).max() > 1.0
+
+def test_batch_analysis_mixes_fixed_and_moving_targets(observer_location, night):
+    """
+    Testa a análise em lote com alvos fixos e efemérides, preservando a ordem dos alvos.
+    """
+    start, end = night
+    targets = {
+        'Sirius': SkyCoord(ra=101.2872 * u.deg, dec=-16.7161 * u.deg),
+        'Lua': get_body_ephemeris('moon', start, end),
+        'M42': SkyCoord(ra=83.8221 * u.deg, dec=-5.3911 * u.deg),
+    }
+    result = analyze_targets_visibility_for_night(start, end, observer_location, targets, 0 * u.deg)
+    single = analyze_target_visibility_for_night(start, end, observer_location, targets['Lua'], -90 * u.deg)
+
+    assert result['names'] == ['Sirius', 'Lua', 'M42']
+    np.testing.assert_allclose(result['altitude'][1], single['altitude'].to_numpy())
+
+    fast = analyze_targets_visibility_for_night(start, end, observer_location, targets, 0 * u.deg, accuracy='fast')
+    assert np.abs(fast['altitude'] - result['altitude']).max() < FAST_ALTAZ_MAX_ERROR_DEG
+
+def test_planet_calendar_by_name(observer_location):
+    """
+    Testa o calendário de um planeta pelo nome, conferindo uma noite contra a análise direta.
+    """
+    df = analyze_visibility_over_dates(date(2024, 1, 1), date(2024, 1, 31), observer_location, None,
+                                       'jupiter', 30 * u.deg)
+    assert 0 < len(df) <= 31
+
+    row = df.iloc[10]
+    start, end = Time(row['start_time']), Time(row['end_time'])
+    for moment in (start, end):
+        altitude = get_body('jupiter', moment).transform_to(AltAz(obstime=moment, location=observer_location)).alt.deg
+        assert altitude >= 30 - 0.01
+
+def test_times_outside_the_ephemeris_raise():
+    """
+    Testa se consultar a efeméride fora do intervalo ajustado gera erro.
+    """
+    ephemeris = BodyEphemeris('mars', Time('2024-01-01'), Time('2024-01-10'))
+    with pytest.raises(ValueError):
+        ephemeris.gcrs_xyz(Time('2025-01-01'))
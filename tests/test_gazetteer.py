@@ -0,0 +1,79 @@
+# tests/test_gazetteer.py
+
+import time
+
+import pytest
+from astropy import units as u
+
+from src.gazetteer import PlaceCache, load_gazetteer, lookup_place, normalize_place_name, search_places
+from src.location import get_location_from_city
+
+def test_lookup_is_accent_and_case_insensitive():
+    """
+    Testa se "Sao Paulo", "SÃO PAULO" e "são-paulo" encontram a mesma cidade.
+    """
+    place = lookup_place("São Paulo, Brazil")
+    assert place.name == "São Paulo" and place.country_code == 'BR'
+    assert place.timezone == 'America/Sao_Paulo'
+    assert lookup_place("Sao Paulo") == lookup_place("SÃO PAULO") == lookup_place("são-paulo") == place
+    assert normalize_place_name("Vitória da Conquista") == "vitoria da conquista"
+
+def test_country_qualifier_disambiguates_homonyms():
+    """
+    Testa se o país após a vírgula escolhe entre cidades homônimas (inclusive por apelidos como "UK").
+    """
+    assert lookup_place("Cambridge, United Kingdom").country_code == 'GB'
+    assert lookup_place("Cambridge, US").country_code == 'US'
+    assert lookup_place("Uberaba, MG, Brazil").name == "Uberaba"
+    assert lookup_place("Uberaba, MG").country_code == 'BR'
+    assert lookup_place("São Paulo, Portugal") is None
+    assert lookup_place("CidadeInexistente12345") is None
+    assert lookup_place("Cambridge, UK").country_code == 'GB'
+    assert lookup_place("Uberaba, Minas Gerais, Brasil").country_code == 'BR'
+
+def test_unverifiable_qualifiers_fall_through():
+    """
+    Testa se um estado só é aceito quando deixa um único candidato e se qualificadores
+    desconhecidos dão None (em vez da homônima mais populosa de outro continente).
+    """
+    for query in ("Paris, TX, USA", "Paris, Texas"):
+        place = lookup_place(query)
+        assert place.country_code == 'US' and place.lat_deg == pytest.approx(33.66, abs=0.01)
+    assert lookup_place("Cambridge, MA").country_code == 'US'
+    assert lookup_place("Springfield, Illinois") is None
+    assert lookup_place("Springfield, IL, USA") is None
+    assert lookup_place("Paris, Lugar Desconhecido") is None
+
+def test_prefix_search_orders_by_population():
+    """
+    Testa a busca por prefixo: todos os resultados começam com o prefixo, dos mais populosos para os menos.
+    """
+    results = search_places("sao pau", limit=5)
+    assert results[0].name == "São Paulo"
+    assert all(normalize_place_name(place.name).startswith("sao pau") for place in results)
+    assert [place.population for place in results] == sorted((place.population for place in results), reverse=True)
+    assert search_places("") == []
+
+def test_lookups_take_microseconds():
+    """
+    Testa se, com o índice carregado, uma busca exata leva bem menos de 0,1 ms.
+    """
+    load_gazetteer()
+    queries = ["Uberaba", "Lisbon, Portugal", "Vitória da Conquista, Brazil", "Nairobi"] * 250
+    start = time.perf_counter()
+    for query in queries:
+        lookup_place(query)
+    assert (time.perf_counter() - start) / len(queries) < 1e-4
+
+def test_network_results_come_from_the_persistent_cache(tmp_path):
+    """
+    Testa se uma cidade fora do gazetteer, já geocodificada, é lida do cache em disco sem rede.
+    """
+    path = str(tmp_path / 'places.sqlite')
+    PlaceCache(path).put("Observatório Pico dos Dias", -22.5344, -45.5825)
+
+    location = get_location_from_city("observatorio pico dos dias", altitude_meters=1864, cache=PlaceCache(path),
+                                      use_network=False)
+    assert location.lat.to_value(u.deg) == pytest.approx(-22.5344)
+    assert location.height.to_value(u.m) == pytest.approx(1864)
+    assert get_location_from_city("Outro Lugar 123", cache=PlaceCache(path), use_network=False) is None
@@ -0,0 +1,90 @@
+# tests/test_horizon.py
+
+import pytest
+import numpy as np
+import pandas as pd
+from astropy.coordinates import EarthLocation, SkyCoord
+from astropy.time import Time
+from astropy import units as u
+
+from src.horizon import CULMINATION_MARGIN_DEG, compute_altaz, culmination_altitudes, FAST_ALTAZ_MAX_ERROR_DEG
+from src.analysis import analyze_target_visibility_for_night, analyze_targets_visibility_for_night
+
+SITES = [(-23.55, -46.63), (19.82, -155.47), (-30.17, -70.80), (51.48, 0.0), (78.22, 15.65), (0.0, 100.0)]
+EPOCHS = ['1975-03-10', '2000-01-01', '2023-06-21', '2050-11-30']
+
+@pytest.fixture(scope="module")
+def sky_sample():
+    """Fixture com alvos distribuídos uniformemente pela esfera celeste."""
+    rng = np.random.default_rng(42)
+    ra = rng.uniform(0, 360, 200)
+    dec = np.degrees(np.arcsin(rng.uniform(-1, 1, 200)))
+    return SkyCoord(ra=ra * u.deg, dec=dec * u.deg)
+
+@pytest.mark.parametrize("lat, lon", SITES)
+def test_fast_altaz_error_bound(sky_sample, lat, lon):
+    """
+    Testa se o modo rápido fica dentro do erro documentado em relação ao astropy,
+    em vários locais e épocas.
+    """
+    location = EarthLocation(lat=lat * u.deg, lon=lon * u.deg, height=500 * u.m)
+    for epoch in EPOCHS:
+        times = pd.date_range(epoch, periods=12, freq='2h')
+        alt_exact, az_exact = compute_altaz(sky_sample, times, location, 'exact')
+        alt_fast, az_fast = compute_altaz(sky_sample, times, location, 'fast')
+
+        az_error = np.abs((az_fast - az_exact + 180) % 360 - 180) * np.cos(np.radians(alt_exact))
+        assert np.abs(alt_fast - alt_exact).max() < FAST_ALTAZ_MAX_ERROR_DEG, epoch
+        assert az_error.max() < FAST_ALTAZ_MAX_ERROR_DEG, epoch
+
+def test_compute_altaz_shapes_and_scalar_time(sky_sample):
+    """
+    Testa o formato das saídas (alvos x tempos) para um alvo escalar e um tempo escalar.
+    """
+    location = EarthLocation(lat=-23.55 * u.deg, lon=-46.63 * u.deg)
+    alt, az = compute_altaz(sky_sample[0], Time('2023-01-15 03:00'), location, 'fast')
+    assert alt.shape == az.shape == (1, 1)
+
+    alt, az = compute_altaz(sky_sample, pd.date_range('2023-01-15', periods=5, freq='1h'), location, 'fast')
+    assert alt.shape == (len(sky_sample), 5)
+    assert np.all((az >= 0) & (az < 360))
+
+def test_fast_accuracy_in_night_analysis():
+    """
+    Testa se as análises noturnas no modo rápido reproduzem o modo exato.
+    """
+    location = EarthLocation(lat=-23.55 * u.deg, lon=-46.63 * u.deg, height=760 * u.m)
+    start, end = Time('2023-01-15 23:30'), Time('2023-01-16 07:30')
+    sirius = SkyCoord(ra=101.2872 * u.deg, dec=-16.7161 * u.deg)
+
+    df_exact = analyze_target_visibility_for_night(start, end, location, sirius, 30 * u.deg)
+    df_fast = analyze_target_visibility_for_night(start, end, location, sirius, 30 * u.deg, accuracy='fast')
+    merged = df_exact.merge(df_fast, on='time', suffixes=('_exact', '_fast'))
+    assert len(merged) >= len(df_exact) - 1
+    assert np.abs(merged['altitude_exact'] - merged['altitude_fast']).max() < FAST_ALTAZ_MAX_ERROR_DEG
+
+    night = analyze_targets_visibility_for_night(start, end, location, {'Sirius': sirius}, 30 * u.deg, accuracy='fast')
+    assert night['altitude'].shape == (1, len(night['time']))
+
+def test_invalid_accuracy_raises():
+    """
+    Testa se um modo de precisão desconhecido é rejeitado.
+    """
+    location = EarthLocation(lat=0 * u.deg, lon=0 * u.deg)
+    with pytest.raises(ValueError):
+        compute_altaz(SkyCoord(ra=0 * u.deg, dec=0 * u.deg), Time('2023-01-01'), location, 'approximate')
+
+@pytest.mark.parametrize("lat, lon", SITES[:4])
+def test_culmination_altitudes_bound_the_sampled_track(sky_sample, lat, lon):
+    """
+    Testa se as culminações analíticas coincidem com a maior e a menor altitude
+    amostradas ao longo de um dia sidéreo (dentro da folga documentada).
+    """
+    location = EarthLocation(lat=lat * u.deg, lon=lon * u.deg)
+    times = Time('2023-06-21') + np.linspace(0, 1, 1441) * u.day
+    altitude = compute_altaz(sky_sample, times, location)[0]
+    upper, lower = culmination_altitudes(sky_sample.ra.deg, sky_sample.dec.deg, lat, times.jd[[0, -1]])
+
+    assert (altitude.max(axis=1) <= upper + CULMINATION_MARGIN_DEG).all()
+    np.testing.assert_allclose(altitude.max(axis=1), upper, atol=0.05)
+    np.testing.assert_allclose(altitude.min(axis=1), lower, atol=0.05)
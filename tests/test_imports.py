@@ -0,0 +1,53 @@
+# tests/test_imports.py
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Orçamento de tempo para `import src.analysis` num interpretador novo. Hoje o custo é
+# dominado por numpy, pandas e astropy (~1 s); carregar astroplan, matplotlib ou
+# requests de novo no import passaria facilmente deste limite.
+IMPORT_TIME_BUDGET_SECONDS = 2.5
+HEAVY_MODULES = ['matplotlib', 'seaborn', 'astroplan', 'astroquery', 'geopy', 'requests', 'tqdm']
+
+def _import_in_subprocess(module):
+    """
+    Importa `module` num interpretador novo e devolve (tempo, módulos pesados carregados, saída).
+    """
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"heavy = [name for name in {HEAVY_MODULES!r} if name in sys.modules]\n"
+        "sys.stderr.write(json.dumps({'elapsed': elapsed, 'heavy': heavy}))\n"
+    )
+    result = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT, capture_output=True,
+                            text=True, check=True)
+    report = json.loads(result.stderr.strip().splitlines()[-1])
+    return report['elapsed'], report['heavy'], result.stdout
+
+def test_import_analysis_within_budget():
+    """
+    Testa se `import src.analysis` fica dentro do orçamento de tempo (melhor de 3 execuções).
+    """
+    best = min(_import_in_subprocess('src.analysis')[0] for _ in range(3))
+    assert best < IMPORT_TIME_BUDGET_SECONDS, f"import src.analysis levou {best:.2f} s"
+
+@pytest.mark.parametrize("module", ['src.config', 'src.analysis', 'src.targets', 'src.location',
+                                    'src.plotting', 'src.parallel', 'src.weather', 'src.moon',
+                                    'src.sites', 'src.scheduler', 'src.catalog',
+                                    'src.skyindex', 'src.yearstore', 'src.curves',
+                                    'src.benchmark', 'src.instrumentation'])
+def test_import_is_lazy_and_silent(module):
+    """
+    Testa se importar um módulo do pacote não carrega dependências pesadas nem imprime nada.
+    """
+    _, heavy, output = _import_in_subprocess(module)
+    assert heavy == []
+    assert output == ''
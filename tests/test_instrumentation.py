@@ -0,0 +1,107 @@
+# tests/test_instrumentation.py
+
+import json
+import time
+
+import pytest
+from astropy import units as u
+
+from src import instrumentation
+from src.analysis import analyze_targets_visibility_for_night
+from src.benchmark import StandInSimbad, _night, _random_targets, _no_network_fallback
+from src.resolver import TargetCache
+from src.targets import get_target_skycoords
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    """Cada teste começa e termina com a instrumentação desligada e vazia."""
+    instrumentation.disable()
+    instrumentation.reset()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+def test_disabled_is_a_cheap_no_op():
+    """
+    Testa se, desligada, a instrumentação não registra nada e custa quase nada por chamada.
+    """
+    @instrumentation.instrumented()
+    def noop():
+        return 1
+
+    calls = 20000
+    start = time.perf_counter()
+    for _ in range(calls):
+        with instrumentation.span('etapa'):
+            instrumentation.count('contador')
+        noop()
+    per_call = (time.perf_counter() - start) / calls
+
+    assert instrumentation.spans() == [] and instrumentation.counters() == {}
+    assert per_call < 20e-6, f"{per_call * 1e6:.2f} µs por chamada"
+
+def test_recording_nests_spans_and_reports_self_time():
+    """
+    Testa o aninhamento dos spans, o tempo próprio no relatório e os contadores.
+    """
+    @instrumentation.instrumented('externa')
+    def outer():
+        for _ in range(2):
+            with instrumentation.span('interna', passo=1):
+                time.sleep(0.01)
+                instrumentation.count('passos')
+
+    with instrumentation.recording():
+        outer()
+    assert not instrumentation.is_enabled()
+
+    records = instrumentation.spans()
+    assert [record['name'] for record in records] == ['interna', 'interna', 'externa']
+    assert [record['depth'] for record in records] == [1, 1, 0]
+    assert records[0]['args'] == {'passo': 1}
+    assert instrumentation.counters() == {'passos': 2}
+
+    report = instrumentation.timing_report().set_index('name')
+    assert report.loc['interna', 'calls'] == 2
+    assert report.loc['externa', 'total_s'] >= report.loc['interna', 'total_s'] >= 0.02
+    assert report.loc['externa', 'self_s'] < 0.01
+    assert list(report.columns) == ['calls', 'total_s', 'self_s', 'mean_ms', 'max_ms']
+
+def test_hot_paths_report_transforms_and_network_calls(tmp_path):
+    """
+    Testa os pontos instrumentados: transformações da análise e consultas (simuladas) ao SIMBAD.
+    """
+    location, _, start, end = _night()
+    names = [f"Alvo Instrumentado {i}" for i in range(5)]
+    with instrumentation.recording():
+        analyze_targets_visibility_for_night(start, end, location, _random_targets(200), 30 * u.deg)
+        cache = TargetCache(str(tmp_path / 'cache.sqlite'))
+        get_target_skycoords(names, cache=cache, simbad=StandInSimbad(), fallback=_no_network_fallback)
+        cache.close()
+
+    totals = instrumentation.counters()
+    assert totals['altaz_transforms'] >= 1 and totals['altaz_points'] > 0
+    assert totals['network_calls'] == 1 and totals['simbad_queries'] == 1
+    stages = set(instrumentation.timing_report()['name'])
+    assert {'analyze_targets_visibility_for_night', 'altaz_transform', 'resolve_targets',
+            'simbad_query'} <= stages
+
+def test_json_and_chrome_trace_export(tmp_path):
+    """
+    Testa os arquivos exportados: JSON com spans e contadores e o formato Trace Event do Chrome.
+    """
+    with instrumentation.recording():
+        with instrumentation.span('geocodificacao', cidade='Campinas'):
+            instrumentation.count('network_calls')
+
+    data = instrumentation.export_json(tmp_path / 'medicoes.json')
+    assert json.loads((tmp_path / 'medicoes.json').read_text(encoding='utf-8')) == json.loads(json.dumps(data))
+    assert data['counters'] == {'network_calls': 1}
+
+    trace = instrumentation.export_chrome_trace(tmp_path / 'trace.json')
+    events = json.loads((tmp_path / 'trace.json').read_text(encoding='utf-8'))['traceEvents']
+    assert events == trace['traceEvents']
+    complete = [event for event in events if event['ph'] == 'X']
+    assert len(complete) == 1 and complete[0]['args'] == {'cidade': 'Campinas'}
+    assert complete[0]['dur'] >= 0
+    assert events[-1]['ph'] == 'C' and events[-1]['args'] == {'network_calls': 1}
@@ -6,6 +6,7 @@ from astropy import units as u
 import pytz
 
 from src.location import get_location_from_city, set_timezone_for_sao_paulo
+from src.gazetteer import PlaceCache
 
 def test_get_location_from_city_success():
     """
@@ -23,7 +24,7 @@ def test_get_location_from_city_not_found():
     Testa se a função retorna None para uma cidade inexistente.
     """
     # CORREÇÃO: A função retorna None, não levanta uma exceção.
-    location = get_location_from_city("CidadeInexistente12345")
+    location = get_location_from_city("CidadeInexistente12345", cache=PlaceCache(':memory:'), use_network=False)
     assert location is None
 
 def test_set_timezone_for_sao_paulo_inside():
@@ -0,0 +1,117 @@
+# tests/test_moon.py
+
+from datetime import date
+
+import numpy as np
+import pytest
+import pytz
+from astropy import units as u
+from astropy.coordinates import AltAz, EarthLocation, SkyCoord, get_body
+from astropy.time import Time
+
+from src.analysis import (
+    analyze_moon_impact,
+    analyze_targets_visibility_for_night,
+    analyze_visibility_over_dates,
+)
+from src.moon import compute_moon_layer, compute_nightly_moon, moon_separation
+
+# Noite de Lua cheia (25/03/2024) em São Paulo, em UTC.
+NIGHT_START = Time('2024-03-24 22:00:00')
+NIGHT_END = Time('2024-03-25 08:00:00')
+
+@pytest.fixture(scope="module")
+def location():
+    """Fixture para uma localização fixa (São Paulo) que não depende de rede."""
+    return EarthLocation(lat=-23.55 * u.deg, lon=-46.63 * u.deg, height=760 * u.m)
+
+@pytest.fixture(scope="module")
+def near_moon():
+    """Fixture com um alvo fixo na posição da Lua no meio da noite."""
+    moon = get_body('moon', Time('2024-03-25 03:00:00'))
+    return SkyCoord(ra=moon.ra, dec=moon.dec)
+
+def test_illumination_matches_astroplan():
+    """
+    Testa se a fração iluminada da camada lunar coincide com `astroplan.moon_illumination`.
+    """
+    from astroplan.moon import moon_illumination
+
+    location = EarthLocation(lat=0 * u.deg, lon=0 * u.deg)
+    times = Time('2024-03-01') + np.arange(0, 30, 2.5) * u.day
+    layer = compute_moon_layer(times, location)
+    np.testing.assert_allclose(layer['illumination'], moon_illumination(times), atol=2e-3)
+
+def test_separation_matrix_matches_astropy(location):
+    """
+    Testa a matriz alvos x tempos de separação da Lua contra `SkyCoord.separation`.
+    """
+    targets = {
+        'Sirius': SkyCoord(ra=101.2872 * u.deg, dec=-16.7161 * u.deg),
+        'Spica': SkyCoord(ra=201.2983 * u.deg, dec=-11.1613 * u.deg),
+    }
+    night = analyze_targets_visibility_for_night(NIGHT_START, NIGHT_END, location, targets, 0 * u.deg,
+                                                 min_moon_separation=30 * u.deg)
+    assert night['moon_separation'].shape == night['altitude'].shape
+
+    times = Time(night['time'][::24])
+    frame = AltAz(obstime=times, location=location)
+    moon = get_body('moon', times, location=location).transform_to(frame)
+    for row, name in enumerate(night['names']):
+        expected = targets[name].transform_to(frame).separation(moon).deg
+        np.testing.assert_allclose(night['moon_separation'][row, ::24], expected, atol=0.05)
+
+    pair = moon_separation(np.array([[10.0]]), np.array([[0.0]]), np.array([40.0]), np.array([0.0]))
+    assert pair[0, 0] == pytest.approx(30.0)
+
+def test_moon_avoidance_removes_windows_near_the_moon(location, near_moon):
+    """
+    Testa se o afastamento mínimo da Lua remove as janelas de um alvo colado nela e
+    preserva as de um alvo distante.
+    """
+    targets = {'Perto': near_moon, 'Longe': SkyCoord(ra=0 * u.deg, dec=-80 * u.deg)}
+    free = analyze_targets_visibility_for_night(NIGHT_START, NIGHT_END, location, targets, 20 * u.deg)
+    avoid = analyze_targets_visibility_for_night(NIGHT_START, NIGHT_END, location, targets, 20 * u.deg,
+                                                 min_moon_separation=30 * u.deg)
+
+    assert (free['windows']['target'] == 'Perto').any()
+    assert not (avoid['windows']['target'] == 'Perto').any()
+    far = lambda result: result['windows'][result['windows']['target'] == 'Longe']['duration_hours'].sum()
+    assert far(avoid) == pytest.approx(far(free))
+    assert avoid['moon']['illumination'].min() > 0.95
+
+def test_year_run_adds_moon_columns(location, near_moon):
+    """
+    Testa a camada lunar por noite nas análises de muitas noites (colunas opcionais).
+    """
+    timezone = pytz.timezone('America/Sao_Paulo')
+    plain = analyze_visibility_over_dates(date(2024, 3, 1), date(2024, 3, 31), location, timezone,
+                                          near_moon, 20 * u.deg)
+    moon = analyze_visibility_over_dates(date(2024, 3, 1), date(2024, 3, 31), location, timezone,
+                                         near_moon, 20 * u.deg, min_moon_separation=30 * u.deg)
+
+    assert list(plain.columns) == ['date', 'start_time', 'end_time', 'duration_hours']
+    assert list(moon.columns) == ['date', 'start_time', 'end_time', 'duration_hours',
+                                  'moon_illumination', 'moon_separation']
+    assert (moon['moon_separation'] >= 0).all() and moon['moon_illumination'].between(0, 100).all()
+    assert len(moon) < len(plain)
+    assert moon['duration_hours'].sum() < plain['duration_hours'].sum()
+
+    nightly = compute_nightly_moon(Time(['2024-03-25 03:00:00']))
+    assert nightly['illumination'][0] > 0.95
+    assert nightly['distance'][0] == pytest.approx(384_400, rel=0.1)
+
+def test_analyze_moon_impact_offline(location):
+    """
+    Testa o impacto da Lua num instante e num array de tempos, sem rede.
+    """
+    sirius = SkyCoord(ra=101.2872 * u.deg, dec=-16.7161 * u.deg)
+    single = analyze_moon_impact(Time('2024-03-25 03:00:00'), location, sirius)
+    assert single['moon_illumination'] > 95.0
+    assert isinstance(single['moon_separation'], u.Quantity)
+
+    times = Time(['2024-03-10 03:00:00', '2024-03-25 03:00:00'])
+    series = analyze_moon_impact(times, location, sirius)
+    assert series['moon_illumination'].shape == (2,)
+    assert series['moon_illumination'][0] < 5.0
+    assert series['moon_separation'].shape == (2,)
@@ -0,0 +1,108 @@
+# tests/test_parallel.py
+
+import pickle
+from datetime import date
+
+import pytest
+import pandas as pd
+from astropy.coordinates import EarthLocation, SkyCoord
+from astropy import units as u
+import pytz
+
+from src.analysis import analyze_visibility_over_dates
+from src.parallel import (
+    SiteSpec,
+    TargetSpec,
+    month_chunks,
+    site_spec_from_location,
+    target_specs_from_coords,
+    analyze_date_range_parallel,
+    analyze_years_parallel
+)
+
+@pytest.fixture(scope="module")
+def site():
+    """Fixture para a descrição serializável de um local fixo (São Paulo)."""
+    location = EarthLocation(lat=-23.55 * u.deg, lon=-46.63 * u.deg, height=760 * u.m)
+    return site_spec_from_location(location, pytz.timezone('America/Sao_Paulo'))
+
+@pytest.fixture(scope="module")
+def targets():
+    """Fixture com descrições serializáveis de dois alvos."""
+    return target_specs_from_coords({
+        'Sirius': SkyCoord(ra=101.2872 * u.deg, dec=-16.7161 * u.deg),
+        'M42': SkyCoord(ra=83.8221 * u.deg, dec=-5.3911 * u.deg),
+    })
+
+def test_specs_are_picklable(site, targets):
+    """
+    Testa se as descrições enviadas aos processos são serializáveis.
+    """
+    assert site.timezone == 'America/Sao_Paulo'
+    assert pickle.loads(pickle.dumps(site)) == site
+    assert pickle.loads(pickle.dumps(targets)) == targets
+    assert isinstance(targets[0], TargetSpec)
+
+def test_moving_targets_are_skipped_with_a_warning(capsys):
+    """
+    Testa se efemérides e nomes de corpos do Sistema Solar são ignorados (com aviso) em vez de quebrar.
+    """
+    from astropy.time import Time
+    from src.ephemeris import get_body_ephemeris
+
+    specs = target_specs_from_coords({
+        'Sirius': SkyCoord(ra=101.2872 * u.deg, dec=-16.7161 * u.deg),
+        'Júpiter': get_body_ephemeris('jupiter', Time('2024-01-01'), Time('2024-01-03')),
+        'Saturno': 'saturn',
+        'Sem Coordenadas': None,
+    })
+    assert [spec.name for spec in specs] == ['Sirius']
+    assert "Júpiter, Saturno" in capsys.readouterr().out
+
+def test_month_chunks_cover_range():
+    """
+    Testa se os blocos cobrem o intervalo sem lacunas nem sobreposição.
+    """
+    chunks = month_chunks(date(2023, 11, 15), date(2024, 2, 10))
+    assert chunks == [
+        (date(2023, 11, 15), date(2023, 11, 30)),
+        (date(2023, 12, 1), date(2023, 12, 31)),
+        (date(2024, 1, 1), date(2024, 1, 31)),
+        (date(2024, 2, 1), date(2024, 2, 10)),
+    ]
+    assert len(month_chunks(date(2023, 1, 1), date(2023, 12, 31), months_per_chunk=3)) == 4
+
+def test_parallel_matches_serial_and_reports_progress(site, targets):
+    """
+    Testa se o modo paralelo devolve, em ordem, o mesmo resultado do caminho serial.
+    """
+    progress = []
+    results = analyze_date_range_parallel(
+        date(2023, 1, 1), date(2023, 3, 31), site, targets, 30 * u.deg, max_workers=2,
+        progress_callback=lambda done, total: progress.append((done, total))
+    )
+
+    assert progress[-1] == (3, 3)
+    assert [done for done, _ in progress] == [1, 2, 3]
+
+    location = EarthLocation(lat=site.lat_deg * u.deg, lon=site.lon_deg * u.deg, height=site.height_m * u.m)
+    for target in targets:
+        coord = SkyCoord(ra=target.ra_deg * u.deg, dec=target.dec_deg * u.deg)
+        expected = analyze_visibility_over_dates(date(2023, 1, 1), date(2023, 3, 31), location, None, coord, 30 * u.deg)
+        result = results[target.name]
+        assert list(result.columns) == list(expected.columns)
+        assert result['date'].is_monotonic_increasing
+        assert list(result['date']) == list(expected['date'])
+        delta = (result['start_time'] - expected['start_time']).dt.total_seconds().abs()
+        assert delta.max() < 1
+
+def test_analyze_years_parallel_in_process(site, targets):
+    """
+    Testa a análise plurianual executada no próprio processo (max_workers=1).
+    """
+    results = analyze_years_parallel([2024, 2023], site, targets[:1], 30 * u.deg, max_workers=1, months_per_chunk=6)
+    df = results['Sirius']
+    assert not df.empty
+    years = pd.to_datetime(df['date']).dt.year
+    assert set(years) == {2023, 2024}
+    assert years.is_monotonic_increasing
@@ -0,0 +1,94 @@
+# tests/test_plotting.py
+
+import time
+from datetime import date
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+from astropy.coordinates import EarthLocation, SkyCoord, AltAz
+from astropy.time import Time
+from astropy import units as u
+
+from src.analysis import compute_sky_positions, analyze_targets_visibility_for_night
+from src.ephemeris import get_body_ephemeris
+from src.plotting import plot_sky_map, plot_visibility_small_multiples, render_visibility_small_multiples
+from src.render import RenderCache
+
+@pytest.fixture(scope="module")
+def observer_location():
+    """Fixture para uma localização fixa (São Paulo)."""
+    return EarthLocation(lat=-23.55 * u.deg, lon=-46.63 * u.deg, height=760 * u.m)
+
+@pytest.fixture(scope="module")
+def map_time():
+    """Fixture com o instante do mapa do céu (UTC)."""
+    return Time('2024-03-21 02:00')
+
+def test_sky_positions_match_per_target_transforms(observer_location, map_time):
+    """
+    Testa se a transformação única coincide com a transformação alvo a alvo, inclusive para a Lua.
+    """
+    targets = {
+        'Sirius': SkyCoord(ra=101.2872 * u.deg, dec=-16.7161 * u.deg),
+        'Lua': get_body_ephemeris('moon', map_time - 1 * u.hour, map_time + 1 * u.hour),
+        'Canopus': SkyCoord(ra=95.9880 * u.deg, dec=-52.6957 * u.deg),
+    }
+    positions = compute_sky_positions(targets, observer_location, map_time)
+    frame = AltAz(obstime=map_time, location=observer_location)
+
+    assert positions['names'] == ['Sirius', 'Lua', 'Canopus']
+    for row, name in enumerate(positions['names']):
+        if name == 'Lua':
+            expected = targets[name].skycoord(map_time).transform_to(frame)
+        else:
+            expected = targets[name].transform_to(frame)
+        assert positions['altitude'][row] == pytest.approx(expected.alt.deg, abs=1e-6)
+        assert positions['azimuth'][row] == pytest.approx(expected.az.deg, abs=1e-6)
+
+def test_large_sky_map_is_a_single_scatter(observer_location, map_time):
+    """
+    Testa um mapa de 10 mil objetos a partir do catálogo em colunas: um único scatter e sem legenda.
+    """
+    rng = np.random.default_rng(3)
+    n = 10_000
+    catalog = ([f'obj{i}' for i in range(n)], rng.uniform(0, 360, n), np.degrees(np.arcsin(rng.uniform(-1, 1, n))))
+
+    start = time.perf_counter()
+    positions = compute_sky_positions(catalog, observer_location, map_time, accuracy='fast')
+    fig = plot_sky_map(None, observer_location, map_time, positions=positions)
+    fig.canvas.draw()
+    elapsed = time.perf_counter() - start
+
+    ax = fig.axes[0]
+    assert len(ax.collections) == 1 and not ax.lines
+    assert len(ax.collections[0].get_offsets()) == (positions['altitude'] > 0).sum()
+    assert ax.get_legend() is None
+    assert elapsed < 5.0
+    plt.close(fig)
+
+def test_small_multiples_share_axes_and_use_the_render_cache(observer_location):
+    """
+    Testa o painel único: um eixo por alvo com eixos compartilhados, rasterizado uma vez por conteúdo.
+    """
+    night = analyze_targets_visibility_for_night(
+        Time('2024-03-20 23:00'), Time('2024-03-21 08:00'), observer_location,
+        {'Sirius': SkyCoord(ra=101.2872 * u.deg, dec=-16.7161 * u.deg),
+         'Canopus': SkyCoord(ra=95.9880 * u.deg, dec=-52.6957 * u.deg),
+         'M42': SkyCoord(ra=83.8221 * u.deg, dec=-5.3911 * u.deg)},
+        0 * u.deg, accuracy='fast')
+    names = ['Sirius', 'Canopus', 'M42']
+
+    fig = plot_visibility_small_multiples(night, names, 30, date(2024, 3, 20), ncols=2)
+    panels = [ax for ax in fig.axes if ax.get_visible()]
+    assert [ax.get_title() for ax in panels] == names
+    assert all(ax.get_shared_x_axes().joined(panels[0], ax) for ax in panels)
+
+    cache = RenderCache()
+    png = render_visibility_small_multiples(night, names, 30, date(2024, 3, 20), cache=cache)
+    assert render_visibility_small_multiples(night, names, 30, date(2024, 3, 20), cache=cache) == png
+    assert (cache.hits, cache.misses) == (1, 1)
+    render_visibility_small_multiples(night, names, 35, date(2024, 3, 20), cache=cache)
+    assert cache.misses == 2
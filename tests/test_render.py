@@ -0,0 +1,55 @@
+# tests/test_render.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.render import RenderCache, render_key
+
+def _figure(calls):
+    from matplotlib.figure import Figure
+
+    calls.append(1)
+    fig = Figure(figsize=(2, 2))
+    fig.subplots().plot([0, 1], [0, 1])
+    return fig
+
+def test_render_key_follows_content():
+    """
+    Testa se a chave depende do conteúdo dos arrays e do estilo, e não da identidade dos objetos.
+    """
+    times = pd.date_range('2024-03-20 23:00', periods=10, freq='5min')
+    altitude = np.linspace(0, 60, 10)
+
+    key = render_key(times, altitude, 'Sirius', 30.0)
+    assert key == render_key(times.copy(), altitude.copy(), 'Sirius', 30.0)
+    assert key != render_key(times, altitude + 1e-9, 'Sirius', 30.0)
+    assert key != render_key(times, altitude, 'Sirius', 31.0)
+    assert key != render_key(times, altitude.astype(np.float32), 'Sirius', 30.0)
+
+def test_unchanged_plots_are_not_rasterized_again(tmp_path):
+    """
+    Testa se o PNG é gerado uma única vez por chave, inclusive entre caches que usam o mesmo diretório.
+    """
+    calls = []
+    cache = RenderCache(directory=str(tmp_path))
+    key = render_key('teste', np.arange(5))
+
+    png = cache.render(key, lambda: _figure(calls))
+    assert png.startswith(b'\x89PNG')
+    assert cache.render(key, lambda: _figure(calls)) == png
+    assert len(calls) == 1 and cache.hits == 1
+
+    reopened = RenderCache(directory=str(tmp_path))
+    assert reopened.render(key, lambda: _figure(calls)) == png
+    assert len(calls) == 1
+
+def test_lru_limit():
+    """
+    Testa se o cache em memória descarta os PNGs menos usados além do limite.
+    """
+    cache = RenderCache(maxsize=2)
+    for i in range(3):
+        cache.put(render_key(i), b'png%d' % i)
+    assert len(cache) == 2
+    assert cache.get(render_key(0)) is None
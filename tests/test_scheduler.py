@@ -0,0 +1,100 @@
+# tests/test_scheduler.py
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from astropy import units as u
+from astropy.coordinates import EarthLocation
+from astropy.time import Time
+
+from src.scheduler import ObservationRequest, plan_night, schedule_night
+
+# Orçamento para planejar 5.000 pedidos (visibilidade no modo 'fast' + agendamento).
+SCHEDULER_TIME_BUDGET_SECONDS = 5.0
+
+TIMES = pd.date_range('2024-03-20 23:00', periods=24, freq='5min')
+
+def _visibility(altitude, moon_separation=None, moon_altitude=None):
+    """Monta um resultado no formato de `analyze_targets_visibility_for_night`."""
+    altitude = {name: np.broadcast_to(np.asarray(values, dtype=float), len(TIMES))
+                for name, values in altitude.items()}
+    visibility = {'names': list(altitude), 'time': TIMES, 'altitude': np.array(list(altitude.values()))}
+    if moon_separation is not None:
+        visibility['moon_separation'] = np.array([np.broadcast_to(moon_separation[name], len(TIMES))
+                                                  for name in altitude], dtype=float)
+        visibility['moon'] = {'altitude': np.broadcast_to(np.asarray(moon_altitude, dtype=float), len(TIMES))}
+    return visibility
+
+def test_priority_order_and_no_overlap():
+    """
+    Testa se a prioridade decide quem entra quando a noite não comporta todos e se os
+    blocos não se sobrepõem.
+    """
+    visibility = _visibility({'A': 60, 'B': 60, 'C': 60})
+    requests = [
+        ObservationRequest('A', 1, 50),
+        ObservationRequest('B', 3, 50),
+        ObservationRequest('C', 2, 50),
+        ObservationRequest('Desconhecido', 9, 5),
+    ]
+    plan = schedule_night(visibility, requests, slew_minutes=2, overhead_minutes=1)
+
+    assert sorted(plan['target']) == ['B', 'C']
+    assert (plan['start_time'].iloc[1:].to_numpy() >= plan['end_time'].iloc[:-1].to_numpy()).all()
+    assert ((plan['exposure_start'] - plan['start_time']) == pd.Timedelta(minutes=3)).all()
+    assert ((plan['end_time'] - plan['exposure_start']) == pd.Timedelta(minutes=50)).all()
+
+def test_altitude_and_moon_constraints():
+    """
+    Testa a altitude mínima por pedido e a distância mínima da Lua.
+    """
+    rising = np.linspace(10, 70, len(TIMES))
+    visibility = _visibility({'Sobe': rising, 'Perto da Lua': 60, 'Longe da Lua': 60},
+                             moon_separation={'Sobe': 90, 'Perto da Lua': 5, 'Longe da Lua': 90},
+                             moon_altitude=40)
+    requests = pd.DataFrame({
+        'target': ['Sobe', 'Perto da Lua', 'Longe da Lua'],
+        'priority': [1, 5, 5],
+        'exposure_minutes': [10, 10, 10],
+        'min_altitude_deg': [50, None, None],
+        'min_moon_separation_deg': [None, 30, 30],
+    })
+    plan = schedule_night(visibility, requests, slew_minutes=0, overhead_minutes=0).set_index('target')
+
+    assert 'Perto da Lua' not in plan.index
+    assert 'Longe da Lua' in plan.index
+    first_allowed = TIMES[np.argmax(rising >= 50)]
+    assert plan.loc['Sobe', 'start_time'] >= first_allowed
+    assert plan.loc['Sobe', 'mean_altitude'] >= 50
+
+    with pytest.raises(ValueError):
+        schedule_night(_visibility({'Longe da Lua': 60}), requests)
+
+def test_five_thousand_requests_within_budget():
+    """
+    Testa se 5.000 pedidos (um terço com restrição de Lua) são planejados dentro do orçamento.
+    """
+    rng = np.random.default_rng(42)
+    n = 5000
+    names = [f"Alvo {i}" for i in range(n)]
+    ra = rng.uniform(0, 360, n)
+    dec = np.degrees(np.arcsin(rng.uniform(-1, 1, n)))
+    requests = [
+        ObservationRequest(name, int(rng.integers(1, 6)), float(rng.choice([5, 10, 20, 30])),
+                           None, 30.0 if i % 3 == 0 else None)
+        for i, name in enumerate(names)
+    ]
+    location = EarthLocation(lat=-23.55 * u.deg, lon=-46.63 * u.deg, height=760 * u.m)
+
+    start = time.perf_counter()
+    plan = plan_night(Time('2024-03-20 23:00'), Time('2024-03-21 08:00'), location, (names, ra, dec),
+                      requests, accuracy='fast')
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < SCHEDULER_TIME_BUDGET_SECONDS, f"planejamento levou {elapsed:.2f} s"
+    assert len(plan) > 10
+    assert (plan['start_time'].iloc[1:].to_numpy() >= plan['end_time'].iloc[:-1].to_numpy()).all()
+    assert (plan['mean_altitude'] >= 30).all()
+    assert plan['target'].is_unique
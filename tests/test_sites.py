@@ -0,0 +1,88 @@
+# tests/test_sites.py
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+from astropy import units as u
+from astropy.coordinates import EarthLocation, SkyCoord
+
+from src.analysis import compute_night_events_table, _evaluate_target_on_nights
+from src.sites import as_site_arrays, compute_sites_night_events, analyze_sites_visibility
+
+START, END = date(2024, 6, 1), date(2024, 6, 10)
+
+@pytest.fixture(scope="module")
+def sites():
+    """Fixture com locais fixos nos dois hemisférios, incluindo um sem noite astronômica em junho."""
+    return {
+        'São Paulo': EarthLocation(lat=-23.55 * u.deg, lon=-46.63 * u.deg, height=760 * u.m),
+        'La Palma': EarthLocation(lat=28.76 * u.deg, lon=-17.88 * u.deg, height=2396 * u.m),
+        'Siding Spring': EarthLocation(lat=-31.27 * u.deg, lon=149.06 * u.deg, height=1165 * u.m),
+        'Oslo': EarthLocation(lat=59.91 * u.deg, lon=10.75 * u.deg),
+    }
+
+@pytest.fixture(scope="module")
+def targets():
+    """Fixture com coordenadas fixas (ICRS) de alguns alvos, sem consulta ao SIMBAD."""
+    return {
+        'Antares': SkyCoord(ra=247.3519 * u.deg, dec=-26.4320 * u.deg),
+        'Vega': SkyCoord(ra=279.2347 * u.deg, dec=38.7837 * u.deg),
+    }
+
+def test_night_events_match_single_site_tables(sites):
+    """
+    Testa se os eventos de todos os locais numa passada coincidem com as tabelas local a local
+    (as grades do Sol começam em instantes diferentes, então sobra uma diferença de segundos
+    na meia-noite, cujo mínimo é muito achatado, e de microssegundos nos crepúsculos).
+    """
+    table = compute_sites_night_events(START, END, sites)
+    assert table.index.names == ['site', 'date']
+    assert list(table.index.get_level_values('site').unique()) == list(sites)
+
+    for name, location in sites.items():
+        expected = compute_night_events_table(START, END, location)
+        got = table.loc[name]
+        assert got.index.equals(expected.index)
+        for column in expected.columns:
+            tolerance = pd.Timedelta('2s' if column == 'meia_noite_real' else '1ms')
+            assert (got[column].isna() == expected[column].isna()).all()
+            assert ((got[column] - expected[column]).abs().dropna() < tolerance).all()
+    assert table.loc['Oslo']['inicio_noite'].isna().all()
+
+def test_windows_match_single_site_engine(sites, targets):
+    """
+    Testa se as janelas de todos os locais x alvos coincidem com o motor vetorizado de um local.
+    """
+    windows = analyze_sites_visibility(START, END, sites, targets, 30 * u.deg)
+    assert windows.index.name == 'site'
+    assert 'Oslo' not in windows.index
+
+    for name, location in sites.items():
+        night_events = compute_night_events_table(START, END, location)
+        for target, coord in targets.items():
+            expected = _evaluate_target_on_nights(night_events, location, coord, 30 * u.deg)
+            got = windows[(windows.index == name) & (windows['target'] == target)]
+            assert len(got) == len(expected)
+            for column in ('start_time', 'end_time'):
+                difference = pd.to_datetime(got[column]).to_numpy() - pd.to_datetime(expected[column]).to_numpy()
+                assert (np.abs(difference) < np.timedelta64(1, 'ms')).all()
+            assert (got['max_altitude'] >= 30).all()
+
+def test_fast_accuracy_and_site_arrays(sites, targets):
+    """
+    Testa o modo 'fast' contra o 'exact' e a entrada em arrays (nomes, lat, lon, altitude).
+    """
+    names, locations = as_site_arrays(sites)
+    arrays = (names, locations.lat.deg, locations.lon.deg, locations.height.to_value(u.m))
+    exact = analyze_sites_visibility(START, END, sites, targets, 30 * u.deg)
+    fast = analyze_sites_visibility(START, END, arrays, targets, 30 * u.deg, accuracy='fast')
+
+    assert list(fast.index) == list(exact.index)
+    step = pd.Timedelta('5min')
+    assert (abs(fast['start_time'] - exact['start_time']) <= step).all()
+    assert (abs(fast['end_time'] - exact['end_time']) <= step).all()
+
+    with pytest.raises(ValueError):
+        as_site_arrays((['A', 'A'], [0.0, 1.0], [0.0, 1.0], 0.0))
@@ -0,0 +1,67 @@
+# tests/test_skyindex.py
+
+import numpy as np
+import pytest
+from astropy import units as u
+from astropy.coordinates import EarthLocation
+from astropy.time import Time
+
+from src.analysis import compute_sky_positions
+from src.catalog import TargetCatalog
+from src.horizon import compute_altaz
+from src.skyindex import SkyIndex
+
+@pytest.fixture(scope="module")
+def random_sky():
+    """Fixture com 200 mil posições uniformes na esfera (RA, Dec em graus)."""
+    rng = np.random.default_rng(7)
+    n = 200_000
+    return rng.uniform(0, 360, n), np.degrees(np.arcsin(rng.uniform(-1, 1, n)))
+
+def _brute_force_cap(ra, dec, ra0, dec0, radius):
+    ra, dec, ra0, dec0 = map(np.radians, (ra, dec, ra0, dec0))
+    cos_sep = np.sin(dec) * np.sin(dec0) + np.cos(dec) * np.cos(dec0) * np.cos(ra - ra0)
+    return np.nonzero(cos_sep >= np.cos(np.radians(radius)))[0]
+
+@pytest.mark.parametrize('ra0, dec0, radius', [
+    (0.0, 0.0, 10.0),      # calota comum
+    (359.5, 20.0, 30.0),   # cruza RA = 0/360
+    (5.0, -89.5, 3.0),     # contém o polo sul
+    (180.0, 88.0, 5.0),    # contém o polo norte
+    (100.0, -23.0, 66.0),  # calota visível típica (30° de elevação)
+    (200.0, 0.0, 120.0),   # maior que um hemisfério
+    (10.0, 50.0, 0.05),    # quase vazia
+])
+def test_cap_query_matches_brute_force(random_sky, ra0, dec0, radius):
+    """
+    Testa se a consulta por calota devolve exatamente os mesmos alvos da busca exaustiva.
+    """
+    ra, dec = random_sky
+    index = SkyIndex(ra, dec)
+    np.testing.assert_array_equal(index.query_cap(ra0, dec0, radius), _brute_force_cap(ra, dec, ra0, dec0, radius))
+
+def test_visible_candidates_cover_every_visible_target(random_sky):
+    """
+    Testa se os candidatos da calota visível incluem todos os alvos realmente acima da
+    elevação mínima e se `compute_sky_positions(min_altitude=...)` dá o mesmo resultado
+    que transformar o catálogo inteiro e filtrar depois.
+    """
+    ra, dec = random_sky
+    catalog = TargetCatalog([f"Alvo {i}" for i in range(ra.size)], ra, dec)
+    location = EarthLocation(lat=-23.55 * u.deg, lon=-46.63 * u.deg, height=760 * u.m)
+    time = Time('2024-07-15 03:00:00')
+
+    candidates = catalog.sky_index().query_visible(location, time, 30.0)
+    altitude = compute_altaz(catalog.to_skycoord(), time, location)[0][:, 0]
+    visible = np.nonzero(altitude >= 30.0)[0]
+    assert np.isin(visible, candidates).all()
+    assert candidates.size < 0.3 * ra.size
+
+    positions = compute_sky_positions(catalog, location, time, min_altitude=30 * u.deg)
+    assert positions['names'] == [catalog.names[row] for row in visible]
+    np.testing.assert_allclose(positions['altitude'], altitude[visible])
+
+    small = catalog[:50]
+    as_dict = compute_sky_positions(dict(small.items()), location, time, min_altitude=30 * u.deg)
+    as_catalog = compute_sky_positions(small, location, time, min_altitude=30 * u.deg)
+    assert as_dict['names'] == as_catalog['names']
@@ -1,10 +1,60 @@
 # tests/test_targets.py
 
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import pytest
 from astropy.coordinates import SkyCoord
+from astropy.coordinates.name_resolve import sesame_url
+from astropy.table import MaskedColumn, Table
 from astropy import units as u
 
-from src.targets import get_target_skycoords, registrar_alvos_sistema_solar
+from src.targets import (
+    get_target_skycoords,
+    registrar_alvos_sistema_solar,
+    resolve_targets,
+    DEEP_SKY_TARGETS_PRESET
+)
+from src.resolver import TargetCache, lookup_offline, normalize_target_name
+
+@pytest.fixture
+def sesame_stand_in():
+    """
+    Fixture com um serviço Sesame local (HTTP) usado pelo fallback `SkyCoord.from_name`.
+
+    'Alvo Lento' demora mais que o prazo usado nos testes; nomes desconhecidos não resolvem.
+    """
+    known = {'Alvo Fallback': (201.365, -43.019), 'Alvo Lento': (10.0, 10.0)}
+    requests_seen = []
+
+    class SesameHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            name = urllib.parse.unquote(urllib.parse.urlparse(self.path).query)
+            requests_seen.append(name)
+            if name == 'Alvo Lento':
+                time.sleep(1.5)
+            body = f"# {name}\n"
+            if name in known:
+                body += "%J {:.6f} {:+.6f} = ...\n".format(*known[name])
+            else:
+                body += "#! *** Nothing found *** \n"
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain')
+            self.end_headers()
+            self.wfile.write(body.encode())
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SesameHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    with sesame_url.set([f"http://127.0.0.1:{server.server_port}/"]):
+        yield requests_seen
+    server.shutdown()
 
 def test_get_target_skycoords_single_target():
     """
@@ -53,3 +103,116 @@ def test_registrar_alvos_sistema_solar():
     assert 'Mars' in ss_targets  # Verificar se um planeta conhecido está presente
     assert 'Moon' in ss_targets
     assert isinstance(ss_targets['Mars'], SkyCoord)
+
+def test_normalize_target_name():
+    """
+    Testa se variações de escrita de um mesmo alvo são normalizadas para a mesma chave.
+    """
+    assert normalize_target_name('m 31') == normalize_target_name('M31') == normalize_target_name('M031')
+    assert normalize_target_name('NGC 0224') == 'NGC224'
+    assert normalize_target_name('Ômega  Centauri') == normalize_target_name('omega-centauri')
+
+def test_separator_between_digits_keeps_designations_apart(tmp_path):
+    """
+    Testa se "M2-9" (Minkowski 2-9) não vira M29, nem no catálogo offline nem no cache persistente.
+    """
+    assert normalize_target_name('M2-9') == normalize_target_name('m 2-9') == 'M2-9'
+    assert normalize_target_name('M2-9') != normalize_target_name('M29')
+    assert normalize_target_name('NGC-224') == 'NGC224'
+    assert lookup_offline('M2-9') is None
+    assert lookup_offline('M29') is not None
+
+    cache = TargetCache(str(tmp_path / 'targets.sqlite'))
+    cache.put('M29', 305.99, 38.51)
+    assert cache.get('M2-9') is None
+
+def test_presets_resolve_offline(monkeypatch, tmp_path):
+    """
+    Testa se todos os alvos predefinidos são resolvidos sem rede e em milissegundos.
+    """
+    def no_network(*args, **kwargs):
+        raise AssertionError("A rede não deveria ser usada para alvos do catálogo offline.")
+
+    monkeypatch.setattr('astroquery.simbad.Simbad', no_network)
+    monkeypatch.setattr(SkyCoord, 'from_name', no_network)
+    cache = TargetCache(str(tmp_path / 'targets.sqlite'))
+
+    get_target_skycoords(['M31'], cache=cache)  # Carrega o catálogo offline
+    start = time.perf_counter()
+    targets = get_target_skycoords(DEEP_SKY_TARGETS_PRESET, cache=cache)
+    elapsed = time.perf_counter() - start
+
+    assert list(targets) == DEEP_SKY_TARGETS_PRESET
+    assert elapsed < 0.5
+    assert u.isclose(targets['M31'].ra, 10.68 * u.deg, atol=0.1 * u.deg)
+    assert u.isclose(targets['Sirius'].dec, -16.71 * u.deg, atol=0.1 * u.deg)
+    assert u.isclose(get_target_skycoords(['m 42'], cache=cache)['m 42'].dec, -5.39 * u.deg, atol=0.1 * u.deg)
+
+def test_network_results_are_cached(monkeypatch, tmp_path):
+    """
+    Testa se um alvo resolvido pela rede é guardado no cache e não volta a ser buscado.
+    """
+    calls = []
+
+    class FakeSimbad:
+        def query_objects(self, names):
+            calls.extend(names)
+            return Table({'main_id': names, 'ra': [150.0], 'dec': [-20.0], 'user_specified_id': names})
+
+    cache = TargetCache(str(tmp_path / 'targets.sqlite'))
+
+    first = get_target_skycoords(['Alvo Remoto 1'], cache=cache, simbad=FakeSimbad())
+    second = get_target_skycoords(['alvo remoto-1'], cache=cache, simbad=FakeSimbad())
+
+    assert calls == ['Alvo Remoto 1']
+    assert u.isclose(first['Alvo Remoto 1'].ra, 150 * u.deg)
+    assert u.isclose(second['alvo remoto-1'].dec, -20 * u.deg)
+
+def test_target_cache_ttl(tmp_path):
+    """
+    Testa se as entradas do cache expiram após o TTL e sobrevivem à reabertura do arquivo.
+    """
+    path = str(tmp_path / 'targets.sqlite')
+    cache = TargetCache(path, ttl_seconds=60)
+    cache.put('NGC 9999', 10.0, 20.0, now=1000)
+    cache.close()
+
+    cache = TargetCache(path, ttl_seconds=60)
+    assert cache.get('ngc9999', now=1030) == (10.0, 20.0)
+    assert cache.get('ngc9999', now=1061) is None
+    assert cache.purge_expired(now=1061) == 1
+    assert len(cache) == 0
+
+def test_bulk_simbad_with_concurrent_fallback(tmp_path, sesame_stand_in):
+    """
+    Testa a resolução em lote: uma consulta ao SIMBAD para todos os pendentes e fallback
+    concorrente (com prazo por requisição) só para os nomes que voltaram vazios.
+    """
+    bulk_calls = []
+
+    class StandInSimbad:
+        def query_objects(self, names):
+            bulk_calls.append(list(names))
+            found = {'Alvo Simbad': (150.0, -20.0)}
+            return Table({
+                'main_id': names,
+                'ra': MaskedColumn([found.get(n, (0, 0))[0] for n in names], mask=[n not in found for n in names]),
+                'dec': MaskedColumn([found.get(n, (0, 0))[1] for n in names], mask=[n not in found for n in names]),
+                'user_specified_id': names,
+            })
+
+    names = ['Sirius', 'Alvo Simbad', 'Alvo Fallback', 'Alvo Lento', 'Alvo Inexistente']
+    coords, report = resolve_targets(names, cache=TargetCache(str(tmp_path / 't.sqlite')),
+                                     simbad=StandInSimbad(), max_workers=4, timeout=0.5)
+
+    assert bulk_calls == [['Alvo Simbad', 'Alvo Fallback', 'Alvo Lento', 'Alvo Inexistente']]
+    assert sorted(sesame_stand_in) == ['Alvo Fallback', 'Alvo Inexistente', 'Alvo Lento']
+    assert list(coords) == ['Sirius', 'Alvo Simbad', 'Alvo Fallback']
+    assert u.isclose(coords['Alvo Fallback'].ra, 201.365 * u.deg)
+
+    sources = dict(zip(report['name'], report['source']))
+    assert sources == {'Sirius': 'offline', 'Alvo Simbad': 'simbad', 'Alvo Fallback': 'fallback',
+                       'Alvo Lento': 'failed', 'Alvo Inexistente': 'failed'}
+    latency = dict(zip(report['name'], report['latency_s']))
+    assert 0.5 <= latency['Alvo Lento'] < 1.5
+    assert (report['latency_s'] >= 0).all()
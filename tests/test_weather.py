@@ -0,0 +1,140 @@
+# tests/test_weather.py
+
+import json
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+import pytest
+import pytz
+from astropy.time import Time
+
+from src.weather import WeatherClient
+from src.analysis import get_weather_forecast
+
+HOURS = pd.date_range('2024-03-20 00:00', periods=72, freq='h')
+CLOUD_COVER = np.arange(72, dtype=float)
+
+class StandInOpenMeteo(BaseHTTPRequestHandler):
+    """Servidor local que imita a resposta horária do Open-Meteo."""
+    requests_seen = []
+    delay = 0.0
+
+    def do_GET(self):
+        type(self).requests_seen.append(parse_qs(urlparse(self.path).query))
+        time.sleep(type(self).delay)
+        body = json.dumps({'hourly': {
+            'time': [t.strftime('%Y-%m-%dT%H:%M') for t in HOURS],
+            'cloudcover': CLOUD_COVER.tolist(),
+        }}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    """Fixture que sobe o servidor local numa porta livre e devolve a URL."""
+    StandInOpenMeteo.requests_seen = []
+    StandInOpenMeteo.delay = 0.0
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StandInOpenMeteo)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/v1/forecast"
+    httpd.shutdown()
+    httpd.server_close()
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def test_cloud_cover_is_resampled_onto_the_night_grid(server):
+    """
+    Testa se a série horária é interpolada na grade de 5 min da análise, com NaN fora da previsão.
+    """
+    client = WeatherClient(base_url=server)
+    grid = pd.date_range('2024-03-20 22:00', '2024-03-21 08:00', freq='5min')
+    cover = client.cloud_cover_on_grid(-23.5505, -46.6333, grid)
+
+    expected = (grid - HOURS[0]) / pd.Timedelta(hours=1)
+    np.testing.assert_allclose(cover, expected)
+    assert np.isnan(client.cloud_cover_on_grid(-23.55, -46.63, pd.DatetimeIndex(['2024-03-25 00:00']))).all()
+
+    params = StandInOpenMeteo.requests_seen[0]
+    assert params['latitude'] == ['-23.55'] and params['hourly'] == ['cloudcover']
+
+def test_cache_by_rounded_position_and_forecast_hour(server):
+    """
+    Testa se consultas na mesma região e hora reaproveitam a resposta e se a validade expira.
+    """
+    clock = FakeClock(1_710_000_000.0)
+    client = WeatherClient(base_url=server, ttl=600, clock=clock)
+
+    client.hourly_cloud_cover(-23.5505, -46.6333)
+    client.hourly_cloud_cover(-23.5532, -46.6301)
+    assert len(StandInOpenMeteo.requests_seen) == 1 and client.hits == 1
+
+    clock.now += 601
+    client.hourly_cloud_cover(-23.5505, -46.6333)
+    assert len(StandInOpenMeteo.requests_seen) == 2
+
+    client.hourly_cloud_cover(40.0, -3.7)
+    assert len(StandInOpenMeteo.requests_seen) == 3
+
+def test_slow_server_hits_the_timeout(server):
+    """
+    Testa se o prazo de leitura é respeitado e a falha não entra no cache.
+    """
+    import requests
+
+    StandInOpenMeteo.delay = 1.0
+    client = WeatherClient(base_url=server, timeout=(1.0, 0.2), max_retries=0)
+    start = time.perf_counter()
+    with pytest.raises(requests.Timeout):
+        client.hourly_cloud_cover(-23.55, -46.63)
+    assert time.perf_counter() - start < 1.0
+    assert client.hits == 0 and not client._cache
+
+def test_nightly_forecast_uses_the_night_window(server):
+    """
+    Testa o resumo em texto da noite e o "N/A" quando o serviço não responde.
+    """
+    client = WeatherClient(base_url=server)
+    summary = get_weather_forecast(-23.55, -46.63, Time('2024-03-20 23:00'), Time('2024-03-21 01:00'), client=client)
+    assert summary == "24.0%"
+
+    offline = WeatherClient(base_url="http://127.0.0.1:9/v1/forecast", timeout=(0.2, 0.2), max_retries=0)
+    assert get_weather_forecast(-23.55, -46.63, Time('2024-03-20 23:00'), Time('2024-03-21 01:00'),
+                                client=offline) == "N/A"
+
+def test_tonight_forecast_uses_the_local_night(monkeypatch, server):
+    """
+    Testa se, sem horários, a noite de hoje é a do fuso do local e se uma falha no
+    cálculo dos eventos vira "N/A" sem consultar o serviço.
+    """
+    calls = []
+
+    def stand_in_events(analysis_date, location, timezone):
+        calls.append((analysis_date, timezone))
+        return {}
+
+    monkeypatch.setattr('src.analysis.calculate_nightly_events', stand_in_events)
+    client = WeatherClient(base_url=server)
+    assert get_weather_forecast(35.68, 139.69, client=client, observer_timezone=pytz.timezone('Asia/Tokyo')) == "N/A"
+    assert StandInOpenMeteo.requests_seen == []
+    assert calls[-1][1].zone == 'Asia/Tokyo'
+    assert calls[-1][0] == datetime.now(pytz.timezone('Asia/Tokyo')).date()
+
+    get_weather_forecast(-23.55, -46.63, client=client)
+    assert calls[-1][1].zone == 'America/Sao_Paulo'
@@ -0,0 +1,130 @@
+# tests/test_yearstore.py
+
+from datetime import date
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import pytest
+from astropy import units as u
+
+from src.parallel import SiteSpec, TargetSpec, analyze_date_range_parallel
+from src.plotting import plot_yearly_visibility
+from src.yearstore import YearStore
+
+def _calendar(year, hours, moon=False):
+    """Calendário sintético no formato de `analyze_year_visibility` (uma noite a cada 3 dias)."""
+    dates = pd.date_range(f'{year}-01-01', f'{year}-12-31', freq='3D').astype('datetime64[s]')
+    start = dates + pd.Timedelta(hours=22, minutes=7, microseconds=123)
+    frame = pd.DataFrame({
+        'date': dates,
+        'start_time': start,
+        'end_time': start + pd.Timedelta(hours=hours),
+        'duration_hours': np.full(len(dates), float(hours)),
+    })
+    if moon:
+        frame['moon_illumination'] = np.linspace(0, 100, len(dates))
+        frame['moon_separation'] = 45.0
+    return frame
+
+@pytest.fixture
+def store():
+    """Fixture com dois alvos em dois anos, acrescentados ano a ano."""
+    store = YearStore(min_altitude_deg=30)
+    for year in (2023, 2024):
+        store.append('Sirius', _calendar(year, 5.5))
+        store.append('Vega', _calendar(year, 2.25, moon=True))
+    store.append('Nunca Visível', pd.DataFrame(columns=['date', 'start_time', 'end_time', 'duration_hours']))
+    return store
+
+def test_append_and_frames_round_trip(store):
+    """
+    Testa se os DataFrames de volta coincidem com os originais e se as colunas são compactas.
+    """
+    assert store.targets == ['Sirius', 'Vega', 'Nunca Visível']
+    assert len(store) == 4 * len(_calendar(2023, 1))
+
+    sirius = store.to_frame('Sirius', year=2024)
+    expected = _calendar(2024, 5.5)
+    pd.testing.assert_frame_equal(sirius, expected)
+    assert list(store.to_frame('Vega').columns)[-2:] == ['moon_illumination', 'moon_separation']
+    assert store.to_frame('Nunca Visível').empty
+
+    data = store.columns()
+    assert data['date'].dtype == np.int32 and data['duration_hours'].dtype == np.float32
+    assert store.nbytes == len(store) * (4 + 4 + 8 + 8 + 4 + 4 + 4)
+
+@pytest.mark.parametrize('suffix', ['npz', 'parquet'])
+def test_save_and_load_with_projection(tmp_path, store, suffix):
+    """
+    Testa a gravação em .npz e Parquet e a leitura só de algumas colunas e alvos.
+    """
+    if suffix == 'parquet':
+        pytest.importorskip('pyarrow')
+    path = store.save(tmp_path / f'calendario.{suffix}')
+
+    full = YearStore.load(path)
+    assert full.targets == store.targets and full.min_altitude_deg == 30
+    pd.testing.assert_frame_equal(full.to_frame('Vega'), store.to_frame('Vega'))
+
+    projected = YearStore.load(path, columns=['date', 'duration_hours'], targets=['Vega'])
+    assert set(projected.columns()) == {'target', 'date', 'duration_hours'}
+    assert len(projected) == len(store.select('Vega')['date'])
+    assert list(projected.to_frame('Vega').columns) == ['date', 'duration_hours']
+    with pytest.raises(ValueError):
+        projected.columns(['start_time'])
+    with pytest.raises(ValueError):
+        projected.append('Vega', _calendar(2025, 1))
+
+def test_yearly_plot_reads_the_store_directly(store):
+    """
+    Testa se o gráfico anual a partir do armazenamento é igual ao gráfico a partir do DataFrame.
+    """
+    from_store = plot_yearly_visibility(store, 'Sirius', 2024)
+    from_frame = plot_yearly_visibility(store.to_frame('Sirius', year=2024), 'Sirius', 2024)
+    store_cells = from_store.axes[0].collections[0].get_array()
+    frame_cells = from_frame.axes[0].collections[0].get_array()
+    np.testing.assert_array_equal(np.ma.getmaskarray(store_cells), np.ma.getmaskarray(frame_cells))
+    np.testing.assert_allclose(store_cells.compressed(), frame_cells.compressed())
+    assert '30°' in from_store.axes[0].get_title()
+    plt.close('all')
+
+    assert plot_yearly_visibility(store, 'Nunca Visível', 2024) is None
+
+def test_parallel_runner_fills_the_store():
+    """
+    Testa se `analyze_date_range_parallel(store=...)` acrescenta os blocos ao armazenamento.
+    """
+    site = SiteSpec(lat_deg=-23.55, lon_deg=-46.63, height_m=760.0, timezone='America/Sao_Paulo')
+    targets = [TargetSpec('Sirius', 101.2872, -16.7161), TargetSpec('Polaris', 37.9546, 89.2641)]
+    results = analyze_date_range_parallel(date(2024, 1, 1), date(2024, 2, 29), site, targets, 30 * u.deg,
+                                          max_workers=1)
+    store = analyze_date_range_parallel(date(2024, 1, 1), date(2024, 2, 29), site, targets, 30 * u.deg,
+                                        max_workers=1, store=YearStore(30))
+
+    assert store.targets == ['Sirius', 'Polaris']
+    assert store.to_frame('Polaris').empty
+    frame = store.to_frame('Sirius')
+    assert list(frame['date']) == list(results['Sirius']['date'])
+    assert (frame['start_time'] == results['Sirius']['start_time']).all()
+
+def test_yearly_plot_keeps_only_the_requested_year():
+    """
+    Testa se um DataFrame com dois anos só desenha as noites do ano pedido, como o armazenamento.
+    """
+    two_years = pd.concat([_calendar(2023, 1.0), _calendar(2024, 7.0)], ignore_index=True)
+    store = YearStore.from_frames({'Sirius': two_years}, min_altitude_deg=30)
+
+    for year, hours in ((2023, 1.0), (2024, 7.0)):
+        from_frame = plot_yearly_visibility(two_years, 'Sirius', year)
+        from_store = plot_yearly_visibility(store, 'Sirius', year)
+        frame_cells = from_frame.axes[0].collections[0].get_array()
+        store_cells = from_store.axes[0].collections[0].get_array()
+        np.testing.assert_allclose(frame_cells.compressed(), hours)
+        assert frame_cells.count() == len(_calendar(year, hours))
+        np.testing.assert_array_equal(np.ma.getmaskarray(frame_cells), np.ma.getmaskarray(store_cells))
+        plt.close('all')
+
+    assert plot_yearly_visibility(two_years, 'Sirius', 2025) is None